@@ -1,212 +1,146 @@
+import time
+
 import streamlit as st
-import boto3
-import json
-import base64
-from PIL import Image
-import io
-import os
 import pyperclip
-import re
 
-def get_bedrock_client():
-    return boto3.client(
-        service_name="bedrock-runtime",
-        region_name='us-east-1'
-    )
+from inference import (
+    ANALYSIS_TASKS,
+    RewriteCandidates,
+    STYLES,
+    analyze_data,
+    change_related,
+    check_grammar,
+    extract_figures,
+    format_value,
+    generate_seo_title,
+    get_response_cache,
+    get_single_flight,
+    get_task,
+    prepare_image,
+    regenerate_text,
+    rewrite_text,
+    run_all,
+)
+from inference.client import BEDROCK_BACKEND
+from inference.history import compare_versions, document_key, get_history_store
+from inference.jobs import DONE, get_job_queue
+from inference.models import MODEL_CHOICES, model_label, selected_model_id
+from inference.ui import (
+    current_session_id,
+    render_candidates,
+    render_job,
+    render_job_list,
+    run_cancel_token,
+)
 
-def process_image_for_bedrock(image):
-    # RGBA 이미지를 RGB로 변환
-    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
-        background = Image.new('RGB', image.size, (255, 255, 255))
-        if image.mode == 'P':
-            image = image.convert('RGBA')
-        background.paste(image, mask=image.split()[-1])
-        image = background
-    elif image.mode != 'RGB':
-        image = image.convert('RGB')
-
-    # 이미지를 바이트로 변환
-    buffered = io.BytesIO()
-    image.save(buffered, format="JPEG")
-    img_bytes = buffered.getvalue()
-    return img_bytes
-
-def invoke_model(client, prompt, image_b64=None, model_id="us.anthropic.claude-3-5-sonnet-20241022-v2:0"):
-    try:
-        bedrock_runtime = boto3.client(
-            service_name="bedrock-runtime",
-            region_name='us-east-1'
-        )
+# 입력창을 바꾸는 생성 작업 (백그라운드 작업 종류)
+WRITE_JOBS = ("rewrite", "change_related", "regenerate", "data_analysis", "grammar", "seo_title")
+# 이 페이지가 쓰는 세션 상태. 다른 페이지도 같은 이름 (current_text, text_input) 을 쓰므로 옮겨 갈 때 지운다
+WRITE_PAGE_KEYS = ("current_text", "current_image", "text_input", "result", "candidates", "document_id")
 
-        system_prompt = f"""[분석 요청]
-당신은 기사를 작성하는 전문가입니다."""
+def document_id():
+    # 편집 기록을 묶는 문서 ID. 제목을 적었으면 제목, 아니면 처음 기록한 글의 해시로 정해 이 세션 동안 유지한다.
+    # 새로고침하면 세션이 바뀌지만 같은 제목을 적거나 마지막 버전과 같은 글을 열면 기록을 이어 쓴다.
+    # 글이 비어 있으면 아직 문서가 없으므로 이 세션만의 빈 기록을 쓴다
+    title = st.session_state.get('document_title', "")
+    if title.strip():
+        return document_key(title=title)
+    if st.session_state.get('document_id'):
+        return st.session_state.document_id
+    text = st.session_state.get('text_input') or st.session_state.get('current_text', "")
+    if not text:
+        return f"session:{current_session_id()}"
+    st.session_state.document_id = get_history_store().find(text) or document_key(text=text)
+    return st.session_state.document_id
 
-        # 기본 텍스트 콘텐츠
-        content = [{"text": prompt}]
-        
-        # 이미지가 있는 경우 추가
-        if image_b64:
-            content.append({
-                "image": {
-                    "format": "jpeg",
-                    "source": {
-                        "bytes": image_b64
-                    }
-                }
-            })
-
-        # Call Bedrock
-        response = bedrock_runtime.converse(
-            modelId=model_id,
-            system=[{"text": system_prompt}],
-            messages=[{
-                "role": "user",
-                "content": content
-            }],
-            inferenceConfig={
-                "maxTokens": 3000,
-                "temperature": 0.3,
-            }
-        )
 
-        try:
-            response_text = response['output']['content'][0]['text']
-        except:
-            try:
-                response_text = response['output']['content']['text']
-            except:
-                try:
-                    response_text = response['output']['message']['content'][0]['text']
-                except:
-                    try:
-                        response_text = response['output']['message']['text']
-                    except:
-                        response_text = str(response)
-
-        return response_text
-            
-    except Exception as e:
-        st.error(f"모델 호출 중 오류 발생: {str(e)}")
-        print(f"상세 오류: {str(e)}")
-        return None
+def edit_history():
+    # 문서별 편집 기록 (탭을 옮기거나 새로고침해도 남는다)
+    return get_history_store().get(document_id())
+
+
+def record_version(before, after=None):
+    # 바뀌기 전 글과 바뀐 글을 차례로 편집 기록에 남긴다
+    history = edit_history()
+    history.push(before)
+    if after is not None:
+        history.push(after)
+    get_history_store().save(document_id())
+
+
+def show_version(text):
+    st.session_state.current_text = text
+    # 입력창 위젯 상태를 지워서 다음 실행에서 current_text 로 다시 채워지게 한다
+    st.session_state.pop('text_input', None)
+    get_history_store().save(document_id())
+
+
+def undo_edit():
+    show_version(edit_history().undo(st.session_state.get('text_input')))
 
-def check_facts(text, image_b64=None):
-    client = get_bedrock_client()
-    prompt = f"""
-    다음 텍스트의 사실 관계를 검증하고 신뢰할 수 있는 정보와 검증이 필요한 정보를 구분해서 분석해주세요:
-    
-    {text}
-    
-    [분석 형식]
-    1. 신뢰할 수 있는 정보:
-    - (정보 1)
-    - (정보 2)
-    
-    2. 검증이 필요한 정보:
-    - (정보 1): (검증 필요 이유)
-    - (정보 2): (검증 필요 이유)
-    """
-    return invoke_model(client, prompt, image_b64)
-
-def analyze_data(text, image_b64=None):
-    client = get_bedrock_client()
-    prompt = f"""
-    다음 텍스트에 포함된 데이터를 분석하고 주요 인사이트를 도출해주세요:
-    
-    {text}
-    
-    [분석 형식]
-    1. 주요 데이터 포인트:
-    - (데이터 1)
-    - (데이터 2)
-    
-    2. 인사이트:
-    - (인사이트 1)
-    - (인사이트 2)
-    
-    3. 추천 사항:
-    - (추천 1)
-    - (추천 2)
-    """
-    return invoke_model(client, prompt, image_b64)
-
-def check_grammar(text, image_b64=None):
-    client = get_bedrock_client()
-    prompt = f"""
-    다음 텍스트의 맞춤법과 문법을 검사하고 수정 사항을 제안해주세요:
-    
-    {text}
-    
-    [분석 형식]
-    1. 맞춤법 오류:
-    - (오류 1) → (수정안)
-    - (오류 2) → (수정안)
-    
-    2. 문법 개선사항:
-    - (개선 1)
-    - (개선 2)
-    
-    3. 수정된 전체 텍스트:
-    (수정된 텍스트)
-    """
-    return invoke_model(client, prompt, image_b64)
-
-def generate_seo_title(text, image_b64=None):
-    client = get_bedrock_client()
-    prompt = f"""
-    다음 텍스트를 바탕으로 SEO에 최적화된 제목을 5개 생성해주세요:
-    
-    {text}
-    
-    [생성 형식]
-    1. (제목 1) - (SEO 최적화 포인트)
-    2. (제목 2) - (SEO 최적화 포인트)
-    3. (제목 3) - (SEO 최적화 포인트)
-    4. (제목 4) - (SEO 최적화 포인트)
-    5. (제목 5) - (SEO 최적화 포인트)
-    """
-    return invoke_model(client, prompt, image_b64)
-
-def rewrite_text(text, style, use_emoji=False, image_b64=None):
-    client = get_bedrock_client()
-    emoji_instruction = "이모티콘을 적절히 사용하여 " if use_emoji else ""
-    style_instructions = {
-        "권위있는 기사체": """
-        - 객관적이고 공식적인 톤 유지
-        - 정확한 사실과 데이터 중심
-        - 전문가적인 분석과 통찰 포함
-        - 격식있는 어휘 사용
-        """,
-        "르포 기사체": """
-        - 현장감 있는 묘사
-        - 구체적인 디테일 포함
-        - 인터뷰와 증언 활용
-        - 생생한 스토리텔링
-        """,
-        "세련된 뉴스레터체": """
-        - 친근하고 대화체적인 톤
-        - 핵심 포인트 강조
-        - 간결하고 명확한 문장
-        - 독자와 공감대 형성
-        """,
-        "AXIOS 기사체": """
-        - 핵심 정보 먼저 제시
-        - 짧고 명확한 문단
-        - 불렛 포인트 활용
-        - Why it matters 섹션 포함
-        """
-    }
-
-    prompt = f"""
-    다음 텍스트를 {emoji_instruction}{style} 스타일로 다시 작성해주세요:
-    
-    [스타일 가이드라인]
-    {style_instructions[style]}
 
-    [원문]
-    {text}
-    """
-    return invoke_model(client, prompt, image_b64)
+def redo_edit():
+    show_version(edit_history().redo())
+
+
+def restore_version(index):
+    history = edit_history()
+    # 저장하지 않은 입력창 수정도 버전으로 남긴 뒤 이동한다
+    history.push(st.session_state.get('text_input', ""))
+    show_version(history.goto(index))
+
+
+def pick_candidate(index):
+    # 고른 후보를 현재 텍스트로 올리고 나머지 후보 생성은 취소한다 (위젯이 그려지기 전 콜백에서 실행)
+    candidates = st.session_state.candidates
+    if not candidates.candidates[index].text:
+        return
+    text = candidates.pick(index)
+    record_version(st.session_state.get('text_input', ""), text)
+    show_version(text)
+    st.session_state.candidates = None
+
+
+def leave_write_page():
+    # 이 페이지의 상태만 지운다. 다른 페이지의 상태 (예: 맞춤법 교정의 변경 문단 검사 기록) 는 남긴다
+    candidates = st.session_state.get('candidates')
+    if candidates:
+        candidates.cancel()
+    for key in WRITE_PAGE_KEYS:
+        st.session_state.pop(key, None)
+
+
+def show_figures(container, text):
+    # 데이터 분석에서 모델에 넘긴 수치 표 (로컬에서 추출/계산)
+    figures = extract_figures(text)
+    if not figures.empty:
+        with container.expander(f"추출한 수치 {len(figures)}개"):
+            st.dataframe(figures.assign(값=figures["값"].map(format_value)), use_container_width=True, hide_index=True)
+
+
+def submit_write_job(kind, label, fn, text, *args, **options):
+    # 생성은 백그라운드 작업으로 실행해서 다른 탭에 다녀와도 결과가 남게 한다
+    session_id = current_session_id()
+    return get_job_queue().submit(session_id, kind, fn, text, *args, label=label, source=text,
+                                  session_id=session_id, **options)
+
+
+def apply_finished_job():
+    # 끝났지만 아직 반영하지 않은 생성 작업이 있으면 결과를 현재 텍스트로 올린다 (입력창이 그려지기 전에 실행)
+    job = get_job_queue().latest(current_session_id(), WRITE_JOBS)
+    if job is None or not job.finished or job.consumed:
+        return None
+    job.consumed = True
+    if job.status == DONE and job.text:
+        if job.kind == "regenerate":
+            record_version(job.source)
+            st.session_state.result = job.text
+            st.session_state.current_text = ""
+        else:
+            record_version(job.source, job.text)
+            show_version(job.text)
+    return job
+
 
 def main():
     st.set_page_config(page_title="AI Writing Assistant", layout="wide")
@@ -252,42 +186,42 @@ def main():
     # Initialize session state
     if 'current_text' not in st.session_state:
         st.session_state.current_text = ""
-    if 'history' not in st.session_state:
-        st.session_state.history = []
     if 'current_image' not in st.session_state:
         st.session_state.current_image = None
 
     # 상단 탭
-    tabs = ["기사 작성", "팩트 체크", "데이터 분석", "맞춤법 교정"]
+    tabs = ["기사 작성", "팩트 체크", "데이터 분석", "맞춤법 교정", "일괄 처리", "사용량"]
     selected_tab = st.radio("메뉴", tabs, horizontal=True, label_visibility="collapsed")
 
     if selected_tab == "팩트 체크":
-    # 세션 상태 초기화
-        for key in list(st.session_state.keys()):
-            del st.session_state[key]
+        leave_write_page()
         st.switch_page("pages/1_fact_check.py")
         return
     elif selected_tab == "데이터 분석":
-        # 세션 상태 초기화
-        for key in list(st.session_state.keys()):
-            del st.session_state[key]
+        leave_write_page()
         st.switch_page("pages/2_data_analysis.py")
         return
     elif selected_tab == "맞춤법 교정":
-        # 세션 상태 초기화
-        for key in list(st.session_state.keys()):
-            del st.session_state[key]
+        leave_write_page()
         st.switch_page("pages/3_grammar_check.py")
         return
+    elif selected_tab == "일괄 처리":
+        st.switch_page("pages/4_batch_processing.py")
+        return
+    elif selected_tab == "사용량":
+        st.switch_page("pages/5_usage_dashboard.py")
+        return
+    applied_job = apply_finished_job()
+
     # 서브 메뉴 컨테이너
     with st.container():
         col1, col2, col3, col4, col5 = st.columns(5)
         
         with col1:
-            model = st.selectbox("모델", ["Nova-Pro"], label_visibility="collapsed")
+            model_id = selected_model_id(st.selectbox("모델", MODEL_CHOICES, format_func=model_label, label_visibility="collapsed"))
         
         with col2:
-            style = st.selectbox("스타일", ["권위있는 기사체", "르포 기사체", "세련된 뉴스레터체", "AXIOS 기사체"], label_visibility="collapsed")
+            style = st.selectbox("스타일", STYLES, label_visibility="collapsed")
             
         with col3:
             tone = st.selectbox("어조", ["경어체", "반말체", "중립적"], label_visibility="collapsed")
@@ -306,13 +240,44 @@ def main():
         key="text_input"
     )
 
+    # 편집 기록: 되돌리기 / 다시 실행 / 버전 비교
+    st.text_input("문서 제목", key="document_title", placeholder="제목을 적으면 새로고침한 뒤에도 같은 편집 기록을 이어 씁니다",
+                  label_visibility="collapsed")
+    history = edit_history()
+    col_undo, col_redo, col_versions = st.columns([1, 1, 6])
+    with col_undo:
+        st.button("↶ 되돌리기", on_click=undo_edit, disabled=not (history.can_undo or text_input != history.text()),
+                  use_container_width=True)
+    with col_redo:
+        st.button("↷ 다시 실행", on_click=redo_edit, disabled=not history.can_redo, use_container_width=True)
+    with col_versions:
+        if len(history):
+            st.caption(f"버전 {history.position + 1}/{len(history)} · 기록 {history.size / 1024:.1f}KB")
+    if len(history) > 1:
+        with st.expander("버전 비교"):
+            versions = history.versions()
+            labels = {i: f"버전 {i + 1} · {time.strftime('%H:%M:%S', time.localtime(saved_at))} · {chars}자"
+                      for i, saved_at, chars in versions}
+            col_old, col_new = st.columns(2)
+            with col_old:
+                old = st.selectbox("이전 버전", list(labels), index=max(0, history.position - 1), format_func=labels.get)
+            with col_new:
+                new = st.selectbox("비교할 버전", list(labels), index=history.position, format_func=labels.get)
+            diff = compare_versions(history.text(old), history.text(new))
+            if diff:
+                st.code(diff, language="diff")
+            else:
+                st.caption("두 버전이 같습니다.")
+            st.button("비교할 버전 불러오기", on_click=restore_version, args=(new,))
+
     # 이미지 업로드 영역
     uploaded_image = st.file_uploader("이미지 업로드", type=["png", "jpg", "jpeg"])
     if uploaded_image:
-        image = Image.open(uploaded_image)
-        st.image(image, caption="업로드된 이미지")
-        # 이미지를 base64로 변환하여 세션 상태에 저장
-        st.session_state.current_image = process_image_for_bedrock(image)
+        st.image(uploaded_image, caption="업로드된 이미지")
+        # 축소/재압축한 이미지를 세션 상태에 저장 (같은 업로드는 캐시에서 재사용)
+        prepared = prepare_image(uploaded_image.getvalue())
+        st.session_state.current_image = prepared.data
+        st.caption(prepared.savings_caption())
 
     # 하단 기능 버튼들과 카운터
     col_buttons = st.columns([1, 6, 1, 1, 1])
@@ -323,51 +288,33 @@ def main():
     with col_buttons[1]:
         if st.button("작성하기", use_container_width=True):
             if text_input.strip():
-                with st.spinner('처리 중...'):
-                    result = None
-                    image_b64 = st.session_state.get('current_image')
-                    if selected_tab == "기사 작성":
-                        result = rewrite_text(text_input, style, use_emoji, image_b64)
-                    elif selected_tab == "데이터 분석":
-                        result = analyze_data(text_input, image_b64)
-                    elif selected_tab == "맞춤법 교정":
-                        result = check_grammar(text_input, image_b64)
-                    elif selected_tab == "SEO 제목":
-                        result = generate_seo_title(text_input, image_b64)
-                    
-                    if result:
-                        st.session_state.history.append(text_input)
-                        st.session_state.current_text = result
-                        st.markdown("### 결과")
-                        st.write(result)
+                image_b64 = st.session_state.get('current_image')
+                if selected_tab == "기사 작성":
+                    submit_write_job("rewrite", "기사 작성", rewrite_text, text_input, style, use_emoji, image_b64,
+                                     stream=True, model_id=model_id)
+                elif selected_tab == "데이터 분석":
+                    submit_write_job("data_analysis", "데이터 분석", analyze_data, text_input, image_b64,
+                                     stream=True, model_id=model_id)
+                elif selected_tab == "맞춤법 교정":
+                    submit_write_job("grammar", "맞춤법 교정", check_grammar, text_input, image_b64,
+                                     stream=True, model_id=model_id)
+                elif selected_tab == "SEO 제목":
+                    submit_write_job("seo_title", "SEO 제목", generate_seo_title, text_input, image_b64,
+                                     stream=True, model_id=model_id)
     
     with col_buttons[2]:
         if st.button("관련 변경", use_container_width=True):
             if text_input.strip():
-                with st.spinner('처리 중...'):
-                    client = get_bedrock_client()
-                    prompt = f"다음 텍스트와 관련된 다른 주제나 관점으로 변경해서 작성해주세요:\n\n{text_input}"
-                    image_b64 = st.session_state.get('current_image')
-                    response = invoke_model(client, prompt, image_b64)
-                    if response:
-                        st.session_state.history.append(text_input)
-                        st.session_state.current_text = response
-                        st.markdown("### 결과")
-                        st.write(response)
+                image_b64 = st.session_state.get('current_image')
+                submit_write_job("change_related", "관련 변경", change_related, text_input, image_b64,
+                                 stream=True, model_id=model_id)
     
     with col_buttons[3]:
         if st.button("재작성", use_container_width=True):
             if text_input.strip():
-                with st.spinner('처리 중...'):
-                    client = get_bedrock_client()
-                    prompt = f"다음 텍스트를 완전히 새로운 방식으로 재작성해주세요:\n\n{text_input}"
-                    image_b64 = st.session_state.get('current_image')
-                    response = invoke_model(client, prompt, image_b64)
-                    if response:
-                        st.session_state.history.append(text_input)
-                        st.session_state.result = response
-                        st.session_state.current_text = ""
-                        st.rerun()
+                image_b64 = st.session_state.get('current_image')
+                submit_write_job("regenerate", "재작성", regenerate_text, text_input, image_b64,
+                                 stream=True, model_id=model_id)
     
     with col_buttons[4]:
         if st.button("복사", use_container_width=True):
@@ -377,9 +324,81 @@ def main():
             except Exception as e:
                 st.error(f"복사 중 오류가 발생했습니다: {str(e)}")
 
+    # 생성 결과 영역 (내용은 페이지 맨 끝에서 작업이 끝날 때까지 갱신한다)
+    result_area = st.container()
+
+    # 스타일 비교: 모든 스타일 (이모티콘 사용/미사용) 을 동시에 생성해 나란히 보여주고 하나를 고른다
+    if st.button("스타일 한 번에 비교", use_container_width=True):
+        if text_input.strip():
+            if st.session_state.get('candidates'):
+                st.session_state.candidates.cancel()
+            st.session_state.candidates = RewriteCandidates(
+                text_input,
+                image_b64=st.session_state.get('current_image'),
+                model_id=model_id,
+                session_id=current_session_id(),
+            ).start()
+    if st.session_state.get('candidates'):
+        st.markdown("### 스타일 후보")
+        render_candidates(st.session_state.candidates, pick_candidate)
+
+    # 전체 분석: 팩트 체크 / 데이터 분석 / 맞춤법 / SEO 제목을 동시에 실행
+    if st.button("전체 분석", use_container_width=True):
+        if text_input.strip():
+            image_b64 = st.session_state.get('current_image')
+            boxes = {}
+            grid = st.columns(2)
+            for i, name in enumerate(ANALYSIS_TASKS):
+                with grid[i % 2]:
+                    st.markdown(f"### {get_task(name).label}")
+                    boxes[name] = st.empty()
+                    boxes[name].info("처리 중...")
+
+            # 끝나는 순서대로 결과 표시
+            for result in run_all(text_input, image_b64, session_id=current_session_id(),
+                                  cancel_token=run_cancel_token(), model_id=model_id):
+                box = boxes[result.task].container()
+                if result.timed_out:
+                    box.warning(f"응답 시간 초과 ({result.elapsed_ms / 1000:.0f}초)")
+                elif result.error:
+                    box.error(f"모델 호출 중 오류 발생: {str(result.error)}")
+                else:
+                    box.write(result.text)
+                    box.caption(f"{result.elapsed_ms / 1000:.2f}초")
+                    if result.task == "data_analysis":
+                        show_figures(box, text_input)
+
     # 글자 수 카운터
     current_chars = len(text_input)
     st.markdown(f'<p class="word-counter">{current_chars}자/3,000자</p>', unsafe_allow_html=True)
 
+    # 응답 캐시 적중/미스 카운터
+    cache_stats = get_response_cache().stats()
+    st.sidebar.caption(
+        f"응답 캐시: 적중 {cache_stats['hits']} (디스크 {cache_stats['disk_hits']}) / "
+        f"미스 {cache_stats['misses']} · 적중률 {cache_stats['hit_rate']:.0%}"
+    )
+    if BEDROCK_BACKEND != "live":
+        st.sidebar.caption(f"Bedrock 백엔드: {BEDROCK_BACKEND}")
+    flight_stats = get_single_flight().stats()
+    if flight_stats["joined"]:
+        st.sidebar.caption(
+            f"같은 요청 합치기: 아낀 호출 {flight_stats['joined']} / 실제 호출 {flight_stats['started']} · "
+            f"아낀 토큰 {flight_stats['saved_tokens']:,}"
+        )
+    render_job_list()
+
+    # 진행 중인 생성 작업은 끝날 때까지 도착한 내용을 보여주고, 끝나면 rerun 해서 입력창에 반영한다.
+    # 다른 탭으로 가도 작업은 계속되고, 돌아오면 끝난 결과가 반영된다.
+    job = get_job_queue().latest(current_session_id(), WRITE_JOBS)
+    if job and (not job.finished or job is applied_job):
+        with result_area:
+            st.markdown("### 결과")
+            if job.kind == "data_analysis":
+                show_figures(st, job.source)
+            render_job(job)
+        if not job.consumed:
+            st.rerun()
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,52 @@
+import argparse
+import os
+import sys
+import time
+
+from inference.batch import OPERATIONS, read_articles, run_batch
+from inference.models import AUTO, MODEL_CHOICES, selected_model_id
+from inference.tools import STYLES
+
+# 일괄 처리 CLI
+#   python batch.py articles.csv results.jsonl --operation grammar --concurrency 8 --rpm 120
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CSV/JSONL 기사 일괄 처리")
+    parser.add_argument("input", help="입력 파일 (.csv 또는 .jsonl)")
+    parser.add_argument("output", help="결과 JSONL 파일 (체크포인트 겸용)")
+    parser.add_argument("--operation", choices=list(OPERATIONS), default="grammar")
+    parser.add_argument("--style", choices=STYLES, default=STYLES[0], help="rewrite 작업의 스타일")
+    parser.add_argument("--emoji", action="store_true", help="rewrite 작업에서 이모티콘 사용")
+    parser.add_argument("--model", choices=MODEL_CHOICES, default=AUTO, help="사용할 모델 (기본: 작업별 추천 모델)")
+    parser.add_argument("--text-column", default="text")
+    parser.add_argument("--id-column", default="id")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rpm", type=int, default=60, help="분당 최대 요청 수 (0 이면 제한 없음)")
+    parser.add_argument("--no-resume", action="store_true", help="결과 파일을 덮어쓰고 처음부터 실행")
+    args = parser.parse_args(argv)
+
+    articles = read_articles(args.input, text_column=args.text_column, id_column=args.id_column)
+    counts = {"processed": 0, "failed": 0, "skipped": 0}
+    start = time.monotonic()
+    for record in run_batch(articles, args.operation, args.output,
+                            concurrency=args.concurrency, requests_per_minute=args.rpm,
+                            resume=not args.no_resume, style=args.style, use_emoji=args.emoji,
+                            model_id=selected_model_id(args.model)):
+        if record.get("skipped"):
+            counts["skipped"] += 1
+            continue
+        counts["processed"] += 1
+        if record["error"]:
+            counts["failed"] += 1
+            print(f"[실패] {record['id']}: {record['error']}", file=sys.stderr)
+        if counts["processed"] % 10 == 0:
+            print(f"{counts['processed']}건 처리 ({time.monotonic() - start:.0f}초)", file=sys.stderr)
+
+    print(f"완료: 처리 {counts['processed']}건, 실패 {counts['failed']}건, "
+          f"건너뜀 {counts['skipped']}건 → {os.path.abspath(args.output)}")
+    return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
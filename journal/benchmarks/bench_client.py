@@ -0,0 +1,78 @@
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import boto3
+
+from benchmarks.stub_bedrock import StubBedrockServer, use_fake_credentials
+from inference import get_bedrock_client
+
+# 호출당 오버헤드 비교: 매 호출마다 boto3.client 생성 (기존) vs 공유 풀 클라이언트
+# 스텁은 평문 HTTP 이므로 TLS 핸드셰이크 비용은 포함되지 않는다 (실제 차이는 더 크다).
+
+MODEL_ID = "us.anthropic.claude-3-5-sonnet-20241022-v2:0"
+
+
+def converse(client):
+    client.converse(
+        modelId=MODEL_ID,
+        system=[{"text": "벤치마크"}],
+        messages=[{"role": "user", "content": [{"text": "안녕하세요"}]}],
+        inferenceConfig={"maxTokens": 3000, "temperature": 0.3},
+    )
+
+
+def per_call_client(endpoint_url):
+    client = boto3.client(
+        service_name="bedrock-runtime",
+        region_name="us-east-1",
+        endpoint_url=endpoint_url,
+    )
+    converse(client)
+
+
+def shared_client(endpoint_url):
+    converse(get_bedrock_client(endpoint_url=endpoint_url))
+
+
+def measure(fn, endpoint_url, iterations):
+    fn(endpoint_url)  # 워밍업
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn(endpoint_url)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(name, samples):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{name:<16} mean {statistics.mean(samples):8.2f} ms   "
+          f"p50 {statistics.median(samples):8.2f} ms   p95 {p95:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bedrock 클라이언트 생성 오버헤드 벤치마크")
+    parser.add_argument("-n", "--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    use_fake_credentials()
+    server = StubBedrockServer().start()
+    try:
+        before = measure(per_call_client, server.endpoint_url, args.iterations)
+        after = measure(shared_client, server.endpoint_url, args.iterations)
+    finally:
+        server.stop()
+
+    report("per-call client", before)
+    report("shared client", after)
+    print(f"speedup          {statistics.mean(before) / statistics.mean(after):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
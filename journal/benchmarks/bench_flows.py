@@ -0,0 +1,138 @@
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inference import analyze_content, analyze_data, check_facts, check_grammar, generate_seo_title, rewrite_text
+from inference.backends import BACKENDS, backend_stats, configure_backend
+from inference.parallel import run_all
+from inference.ratelimit import configure_rate_limiter
+from inference.structured import analyze_content_structured, check_facts_structured, check_grammar_structured
+
+# 흐름별 지연 / 처리량 벤치마크 (Bedrock 백엔드를 골라서)
+#   synthetic (기본): 자격 증명 없이 지연/토큰 속도 분포를 흉내 낸 응답으로 측정
+#   record: 실제 Bedrock 으로 한 번 측정하면서 응답을 녹화, replay: 녹화한 응답을 녹화된 시각대로 재생
+# 입력 글은 (흐름, 클라이언트, 요청) 번호로 정해지므로 record 로 녹화한 뒤 같은 옵션으로 replay 하면 같은 요청이 된다.
+
+ARTICLE = (
+    "서울시는 3일 기자회견을 열고 내년 예산안 48조 원을 발표했다. "
+    "시는 대중교통 분야에 2조 원을 투입해 버스 노선을 개편하고, 청년 주거 지원 예산을 지난해보다 12% 늘린다고 밝혔다. "
+    "시의회는 다음 달 본회의에서 예산안을 심의할 예정이다."
+)
+
+
+def drain(result):
+    # 스트림 (TextStream) 이면 끝까지 읽고 첫 토큰까지 초를 돌려준다. 스트림이 아니면 None
+    if not hasattr(result, "latency_caption"):
+        return None
+    for _ in result:
+        pass
+    return result.ttft_ms / 1000 if result.ttft_ms is not None else None
+
+
+def streamed(fn, *args):
+    return lambda text: fn(text, *args, stream=True)
+
+
+def analyze_all(text):
+    for _ in run_all(text):
+        pass
+
+
+FLOWS = {
+    "rewrite": streamed(rewrite_text, "권위있는 기사체", False, None),
+    "fact_check": streamed(check_facts),
+    "grammar": streamed(check_grammar),
+    "data_analysis": streamed(analyze_data),
+    "seo_title": streamed(generate_seo_title),
+    "content_analysis": streamed(analyze_content),
+    "fact_check_structured": check_facts_structured,
+    "grammar_structured": check_grammar_structured,
+    "content_structured": analyze_content_structured,
+    "analyze_all": analyze_all,
+}
+
+
+def run_flow(name, clients, requests_per_client):
+    # (첫 토큰 초 목록, 전체 초 목록, 실패 수, 걸린 시간)
+    firsts, totals, failures = [], [], []
+    lock = threading.Lock()
+
+    def client(index):
+        for i in range(requests_per_client):
+            # 흐름마다 다른 글이어야 앞 흐름의 응답 캐시에 걸리지 않는다 ("전체 분석" 은 다른 흐름과 같은 프롬프트를 쓴다)
+            text = f"[{name} {index}-{i}] {ARTICLE}"
+            start = time.perf_counter()
+            try:
+                first = drain(FLOWS[name](text))
+            except Exception as e:
+                with lock:
+                    failures.append(e)
+                continue
+            with lock:
+                totals.append(time.perf_counter() - start)
+                if first is not None:
+                    firsts.append(first)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return firsts, totals, failures, time.perf_counter() - start
+
+
+def percentile(values, q):
+    values = sorted(values)
+    if not values:
+        return float("nan")
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="흐름별 지연 / 처리량 벤치마크")
+    parser.add_argument("--backend", choices=BACKENDS, default="synthetic")
+    parser.add_argument("--flows", nargs="+", choices=list(FLOWS), default=list(FLOWS))
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=3, help="클라이언트당 요청 수")
+    parser.add_argument("--ttft-ms", type=float, help="synthetic 첫 토큰 지연 중앙값")
+    parser.add_argument("--tokens-per-second", type=float, help="synthetic 토큰 속도 중앙값")
+    parser.add_argument("--seed", type=int, default=0, help="synthetic 난수 시드")
+    parser.add_argument("--speed", type=float, help="replay 재생 속도 배율 (0 이면 지연 없이)")
+    parser.add_argument("--no-rate-limit", action="store_true", help="요청 제한기를 끈다")
+    args = parser.parse_args()
+
+    options = {}
+    if args.backend == "synthetic":
+        options["seed"] = args.seed
+        if args.ttft_ms is not None:
+            options["ttft_ms"] = args.ttft_ms
+        if args.tokens_per_second is not None:
+            options["tokens_per_second"] = args.tokens_per_second
+    if args.backend == "replay" and args.speed is not None:
+        options["speed"] = args.speed
+    configure_backend(args.backend, **options)
+    if args.no_rate_limit:
+        configure_rate_limiter(0, 0)
+
+    print(f"백엔드 {args.backend}, 클라이언트 {args.clients} x 요청 {args.requests}")
+    for name in args.flows:
+        firsts, totals, failures, elapsed = run_flow(name, args.clients, args.requests)
+        print(f"{name:<22} 성공 {len(totals):4d}/{len(totals) + len(failures):<4d} {len(totals) / elapsed:6.1f} req/s  "
+              f"첫 토큰 p50 {percentile(firsts, 0.5) * 1000:6.0f}ms  "
+              f"전체 p50 {percentile(totals, 0.5) * 1000:6.0f}ms p95 {percentile(totals, 0.95) * 1000:6.0f}ms  "
+              f"평균 {statistics.fmean(totals) * 1000 if totals else float('nan'):6.0f}ms")
+        if failures:
+            print(f"  실패 예: {type(failures[0]).__name__}: {failures[0]}")
+    if args.backend == "synthetic":
+        stats = backend_stats()
+        print(f"synthetic 호출 {stats['requests']}, 스로틀링 {stats['throttled']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import inference.client
+from benchmarks.stub_bedrock import StubBedrockServer, use_fake_credentials
+from inference import InferenceRequest, invoke
+from inference.models import TIER_MODELS, get_model
+from inference.ratelimit import configure_rate_limiter
+from inference.usage import response_cost
+
+# 등급별 모델 비교: 같은 입력을 작업마다 quality / balanced / fast 등급 모델로 보내 지연과 비용을 잰다.
+# 기본은 실제 Bedrock (자격 증명 필요). --stub 이면 모델별 지연을 흉내 내는 로컬 스텁으로 측정 흐름만 확인한다.
+
+ARTICLE = (
+    "서울시는 3일 기자회견을 열고 내년 예산안 48조 원을 발표했다. "
+    "시는 대중교통 분야에 2조 원을 투입해 버스 노선을 개편하고, 청년 주거 지원 예산을 지난해보다 12% 늘린다고 밝혔다. "
+    "시의회는 다음 달 본회의에서 예산안을 심의할 예정이다."
+)
+
+PROMPTS = {
+    "seo_title": "다음 기사에 맞는 SEO 제목을 3개 만들어주세요:\n\n{text}",
+    "grammar": "다음 텍스트의 맞춤법과 문법을 검사하고 수정된 전체 텍스트를 보여주세요:\n\n{text}",
+    "fact_check": "다음 텍스트의 사실 관계를 검증하고 검증이 필요한 정보를 구분해주세요:\n\n{text}",
+    "rewrite": "다음 텍스트를 권위있는 기사체로 다시 작성해주세요:\n\n{text}",
+}
+
+# --stub 에서 쓰는 모델별 응답 지연 (초)
+STUB_LATENCY = {"quality": 1.2, "balanced": 0.6, "fast": 0.3}
+
+
+def run(task, model_id, repeats):
+    samples, cost = [], 0.0
+    for _ in range(repeats):
+        request = InferenceRequest(task=task, prompt=PROMPTS[task].format(text=ARTICLE), model_id=model_id,
+                                   use_cache=False, allow_fallback=False)
+        start = time.perf_counter()
+        response = invoke(request)
+        samples.append((time.perf_counter() - start) * 1000)
+        cost += response_cost(response)
+    return samples, cost / repeats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="작업별 모델 등급 지연/비용 비교")
+    parser.add_argument("-n", "--repeats", type=int, default=3)
+    parser.add_argument("--tasks", nargs="+", choices=list(PROMPTS), default=list(PROMPTS))
+    parser.add_argument("--stub", action="store_true", help="실제 Bedrock 대신 로컬 스텁 사용")
+    args = parser.parse_args()
+
+    server = None
+    if args.stub:
+        use_fake_credentials()
+        latency = {get_model(key).model_id: STUB_LATENCY[tier] for tier, key in TIER_MODELS.items()}
+        server = StubBedrockServer(model_latency=latency, reply_text="벤치마크 응답 " * 40).start()
+        inference.client.DEFAULT_ENDPOINT_URL = server.endpoint_url
+    configure_rate_limiter(0, 0)
+
+    try:
+        print(f"{'작업':<12}{'등급':<10}{'모델':<20}{'평균 ms':>10}{'p50 ms':>10}{'호출당 USD':>12}")
+        for task in args.tasks:
+            for tier, key in TIER_MODELS.items():
+                model = get_model(key)
+                samples, cost = run(task, model.model_id, args.repeats)
+                print(f"{task:<12}{tier:<10}{model.label:<20}{statistics.mean(samples):>10.0f}"
+                      f"{statistics.median(samples):>10.0f}{cost:>12.5f}")
+    finally:
+        if server:
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
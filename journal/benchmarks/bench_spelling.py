@@ -0,0 +1,62 @@
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inference.spelling import check_spelling
+
+# 로컬 맞춤법 사전 검사 처리량 (초당 글자 수)
+# 자주 틀리는 표기를 섞은 기사 문단을 반복해 큰 말뭉치를 만들고, 문단 단위 / 전체 한 번에 검사한다.
+
+SAMPLE_PARAGRAPHS = [
+    "서울시는 3일 기자회견을 열고 내년 예산안을 발표했다. 시는 교통 분야에 2조 원을 투입할수있다고 밝혔다.",
+    "시민들은 금새 반응했다. 한 시민은 \"이렇게 하면 안되요\"라며 우려를 나타냈다.",
+    "전문가들은 몇일 안에 결론이 나지 안을 것이라고 전망했다. 정책의 역활이 중요하다는 지적이다.",
+    "정부 관계자는 \"예산을를 효율적으로 집행하는것이 핵심\"이라고 말했다.  다만 구체적인 일정은 공개하지 않았다 .",
+    "올해 1분기 수출은 전년 동기 대비 8.3% 늘었다. 반도체와 자동차가 증가세를 이끌었다.",
+]
+
+
+def build_corpus(chars):
+    paragraphs, total = [], 0
+    while total < chars:
+        paragraph = SAMPLE_PARAGRAPHS[len(paragraphs) % len(SAMPLE_PARAGRAPHS)]
+        paragraphs.append(paragraph)
+        total += len(paragraph) + 2
+    return paragraphs
+
+
+def measure(fn, repeats):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 맞춤법 사전 검사 처리량 벤치마크")
+    parser.add_argument("--chars", type=int, default=2_000_000, help="말뭉치 크기 (글자 수)")
+    parser.add_argument("-r", "--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    paragraphs = build_corpus(args.chars)
+    document = "\n\n".join(paragraphs)
+    check_spelling(paragraphs[0])  # 워밍업
+
+    elapsed, results = measure(lambda: [check_spelling(p) for p in paragraphs], args.repeats)
+    fixes = sum(len(r.corrections) for r in results)
+    print(f"문단 단위   {len(paragraphs):>8,}개 문단  {elapsed:6.2f} s  "
+          f"{len(document) / elapsed:>12,.0f} 자/s  수정 {fixes:,}건")
+
+    elapsed, result = measure(lambda: check_spelling(document), args.repeats)
+    print(f"전체 한 번  {len(document):>8,}자      {elapsed:6.2f} s  "
+          f"{len(document) / elapsed:>12,.0f} 자/s  수정 {len(result.corrections):,}건")
+
+
+if __name__ == "__main__":
+    main()
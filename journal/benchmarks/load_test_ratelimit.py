@@ -0,0 +1,98 @@
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import inference.client
+from benchmarks.stub_bedrock import StubBedrockServer, use_fake_credentials
+from inference import InferenceRequest, invoke
+from inference.ratelimit import configure_rate_limiter
+
+# 스로틀링하는 스텁 엔드포인트에 여러 세션이 동시에 요청을 보낼 때의 처리량 측정
+# - 제한기 없음: botocore 재시도만으로 버티다 실패하는 요청 수
+# - 제한기 사용: 대기열/백오프로 모든 요청 완료, 세션 간 완료 시간 편차 (공정성)
+
+
+def run_sessions(sessions, requests_per_session, tag):
+    results = {}
+    lock = threading.Lock()
+
+    def session(index):
+        session_id = f"{tag}-{index}"
+        done, failed, finished_at = 0, 0, []
+        for i in range(requests_per_session):
+            request = InferenceRequest(task="grammar", prompt=f"{session_id} 요청 {i}",
+                                       use_cache=False, session_id=session_id)
+            try:
+                invoke(request)
+                done += 1
+            except Exception:
+                failed += 1
+            finished_at.append(time.monotonic())
+        with lock:
+            results[session_id] = (done, failed, finished_at[-1])
+
+    start = time.monotonic()
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - start
+
+    done = sum(r[0] for r in results.values())
+    failed = sum(r[1] for r in results.values())
+    finish_times = [r[2] - start for r in results.values()]
+    return {
+        "elapsed": elapsed,
+        "done": done,
+        "failed": failed,
+        "throughput": done / elapsed,
+        "finish_spread": max(finish_times) - min(finish_times),
+        "finish_mean": statistics.mean(finish_times),
+    }
+
+
+def report(name, result, server_throttled, limiter_stats=None):
+    line = (f"{name:<18} 완료 {result['done']:4d}  실패 {result['failed']:4d}  "
+            f"{result['throughput']:6.1f} req/s  소요 {result['elapsed']:5.1f}s  "
+            f"세션 완료 편차 {result['finish_spread']:4.1f}s  서버 스로틀 {server_throttled:4d}")
+    if limiter_stats:
+        line += f"  제한기 스로틀 {limiter_stats['throttled']}"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="요청 제한기 부하 테스트 (스텁 Bedrock)")
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=15, help="세션당 요청 수")
+    parser.add_argument("--server-rpm", type=int, default=1200, help="스텁이 허용하는 분당 요청 수")
+    parser.add_argument("--limiter-rpm", type=int, default=1500,
+                        help="제한기 설정 (서버 한도보다 높으면 적응형 감속이 동작한다)")
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    use_fake_credentials()
+    server = StubBedrockServer(latency=args.latency, reply_text="ok", max_rpm=args.server_rpm,
+                               burst_seconds=1.0).start()
+    inference.client.DEFAULT_ENDPOINT_URL = server.endpoint_url
+    try:
+        configure_rate_limiter(0, 0)
+        result = run_sessions(args.sessions, args.requests, "off")
+        report("제한기 없음", result, server.throttled)
+
+        server.throttled = 0
+        time.sleep(2)  # 스텁 버킷 회복
+        limiter = configure_rate_limiter(args.limiter_rpm, 0, burst_seconds=1.0)
+        result = run_sessions(args.sessions, args.requests, "on")
+        report("제한기 사용", result, server.throttled, limiter.stats())
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
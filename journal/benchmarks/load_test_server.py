@@ -0,0 +1,133 @@
+import argparse
+import http.client
+import json
+import os
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import inference.client
+from benchmarks.stub_bedrock import StubBedrockServer, use_fake_credentials
+from inference.api import create_app
+from inference.ratelimit import configure_rate_limiter
+from inference.singleflight import get_single_flight
+
+# HTTP API 서버 부하 테스트 (스텁 Bedrock)
+# - 고유 요청 (JSON / SSE): 처리량, 지연 p50/p95, SSE 첫 토큰 지연
+# - 같은 요청 동시: 여러 클라이언트가 같은 글을 동시에 보낼 때 합쳐진 호출 수
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_api(concurrency):
+    import uvicorn
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(create_app(concurrency), host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, port
+
+
+def post(connection, tool, body):
+    # (상태 코드, 첫 토큰까지 초, 전체 초)
+    start = time.perf_counter()
+    connection.request("POST", f"/v1/{tool}", json.dumps(body), {"Content-Type": "application/json"})
+    response = connection.getresponse()
+    if not body.get("stream"):
+        response.read()
+        elapsed = time.perf_counter() - start
+        return response.status, elapsed, elapsed
+    first = None
+    for line in response:
+        if first is None and line.startswith(b"event: token"):
+            first = time.perf_counter() - start
+    return response.status, first, time.perf_counter() - start
+
+
+def run_clients(port, clients, requests_per_client, make_body, barrier=False):
+    results = []
+    lock = threading.Lock()
+    rounds = threading.Barrier(clients) if barrier else None
+
+    def client(index):
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+        for i in range(requests_per_client):
+            if rounds:
+                rounds.wait()
+            result = post(connection, "grammar", make_body(index, i))
+            with lock:
+                results.append(result)
+        connection.close()
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, time.perf_counter() - start
+
+
+def percentile(values, q):
+    values = sorted(v for v in values if v is not None)
+    if not values:
+        return float("nan")
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def report(name, results, elapsed, stub_requests):
+    ok = [r for r in results if r[0] == 200]
+    totals = [r[2] for r in ok]
+    firsts = [r[1] for r in ok]
+    print(f"{name:<16} 성공 {len(ok):4d}/{len(results):<4d} {len(ok) / elapsed:7.1f} req/s  "
+          f"지연 p50 {percentile(totals, 0.5) * 1000:6.0f}ms p95 {percentile(totals, 0.95) * 1000:6.0f}ms  "
+          f"첫 토큰 p50 {percentile(firsts, 0.5) * 1000:6.0f}ms  스텁 호출 {stub_requests:4d}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP API 서버 부하 테스트 (스텁 Bedrock)")
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=10, help="클라이언트당 요청 수")
+    parser.add_argument("--concurrency", type=int, default=50, help="서버 동시 모델 호출 수")
+    parser.add_argument("--latency", type=float, default=0.2, help="스텁 첫 토큰 지연 (초)")
+    parser.add_argument("--chunk-delay", type=float, default=0.01, help="스텁 스트리밍 조각 사이 지연 (초)")
+    args = parser.parse_args()
+
+    use_fake_credentials()
+    stub = StubBedrockServer(latency=args.latency, chunk_delay=args.chunk_delay,
+                             reply_text="교정된 문장입니다. " * 20).start()
+    inference.client.DEFAULT_ENDPOINT_URL = stub.endpoint_url
+    configure_rate_limiter(0, 0)
+    api, port = start_api(args.concurrency)
+    try:
+        run = f"{time.time():.0f}"  # 응답 캐시에 걸리지 않도록 실행마다 다른 글
+
+        def unique(stream):
+            return lambda c, i: {"text": f"{run} {stream} 클라이언트 {c} 요청 {i} 의 기사 본문입니다.", "stream": stream}
+
+        for name, make_body, barrier in (
+            ("고유 요청 JSON", unique(False), False),
+            ("고유 요청 SSE", unique(True), False),
+            ("같은 요청 동시", lambda c, i: {"text": f"{run} 공유된 초안 {i} 입니다."}, True),
+        ):
+            before = stub.requests
+            results, elapsed = run_clients(port, args.clients, args.requests, make_body, barrier)
+            report(name, results, elapsed, stub.requests - before)
+        print("합쳐진 요청:", api.config.app.state.coalescer.stats())
+        print("합쳐진 모델 호출:", get_single_flight().stats())
+    finally:
+        api.should_exit = True
+        stub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+import json
+import os
+import re
+import struct
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inference.backends import estimate_usage
+
+# 로컬 Bedrock Runtime 스텁 서버 (벤치마크/부하 테스트용)
+# boto3 클라이언트를 endpoint_url=http://127.0.0.1:<port> 로 생성해서 사용한다.
+
+CONVERSE_PATH = re.compile(r"^/model/(?P<model_id>[^/]+)/(?P<operation>converse|converse-stream)$")
+
+
+def encode_event(event_type, payload):
+    # application/vnd.amazon.eventstream 메시지 인코딩 (converse_stream 응답 형식)
+    headers = b""
+    for name, value in ((":event-type", event_type), (":content-type", "application/json"),
+                        (":message-type", "event")):
+        name, value = name.encode(), value.encode()
+        headers += struct.pack("B", len(name)) + name + b"\x07" + struct.pack(">H", len(value)) + value
+    body = json.dumps(payload).encode("utf-8")
+    prelude = struct.pack(">II", 12 + len(headers) + len(body) + 4, len(headers))
+    message = prelude + struct.pack(">I", zlib.crc32(prelude)) + headers + body
+    return message + struct.pack(">I", zlib.crc32(message))
+
+
+class StubBedrockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive 허용
+    disable_nagle_algorithm = True  # 헤더/본문 분할 전송 시 delayed ACK 지연 방지
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        match = CONVERSE_PATH.match(self.path)
+        if not match:
+            self._send(404, {"message": f"unknown path {self.path}"})
+            return
+
+        server = self.server
+        server.count_request()
+        if not server.admit():
+            self._send(429, {"message": "Too many requests, please wait before trying again."},
+                       error_type="ThrottlingException")
+            return
+        latency = server.model_latency.get(unquote(match.group("model_id")), server.latency)
+        if latency:
+            time.sleep(latency)
+
+        content = body["messages"][-1]["content"]
+        prompt = "".join(block.get("text", "") for block in content)
+        text = server.reply_text or f"stub response ({len(prompt)} chars)"
+        usage = server.usage(unquote(match.group("model_id")), body, text)
+        metrics = {"latencyMs": int(latency * 1000)}
+        if match.group("operation") == "converse-stream":
+            self._send_stream(text, usage, metrics)
+            return
+        tools = (body.get("toolConfig") or {}).get("tools") or []
+        if tools and server.tool_input is not None:
+            # 구조화 출력 요청: 첫 번째 도구를 호출한 것처럼 응답한다
+            self._send(200, {
+                "output": {"message": {"role": "assistant", "content": [{"toolUse": {
+                    "toolUseId": "stub-tool-use",
+                    "name": tools[0]["toolSpec"]["name"],
+                    "input": server.tool_input,
+                }}]}},
+                "stopReason": "tool_use",
+                "usage": usage,
+                "metrics": metrics,
+            })
+            return
+        self._send(200, {
+            "output": {"message": {"role": "assistant", "content": [{"text": text}]}},
+            "stopReason": "end_turn",
+            "usage": usage,
+            "metrics": metrics,
+        })
+
+    def _send_stream(self, text, usage, metrics):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/vnd.amazon.eventstream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        self._write_chunk(encode_event("messageStart", {"role": "assistant"}))
+        size = self.server.chunk_size
+        for i in range(0, len(text), size):
+            if i and self.server.chunk_delay:
+                time.sleep(self.server.chunk_delay)
+            self._write_chunk(encode_event("contentBlockDelta", {
+                "contentBlockIndex": 0, "delta": {"text": text[i:i + size]}}))
+        self._write_chunk(encode_event("contentBlockStop", {"contentBlockIndex": 0}))
+        self._write_chunk(encode_event("messageStop", {"stopReason": "end_turn"}))
+        self._write_chunk(encode_event("metadata", {"usage": usage, "metrics": metrics}))
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _send(self, status, payload, error_type=None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if error_type:
+            self.send_header("x-amzn-ErrorType", error_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class StubBedrockServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, reply_text=None,
+                 chunk_size=8, chunk_delay=0.0, max_rpm=0, burst_seconds=10.0, tool_input=None,
+                 model_latency=None):
+        super().__init__((host, port), StubBedrockHandler)
+        # max_rpm 을 넘으면 ThrottlingException (429) 으로 응답한다 (토큰 버킷)
+        self.max_rpm = max_rpm
+        self.burst = max(1.0, max_rpm / 60.0 * burst_seconds)
+        self.allowance = self.burst
+        self.allowance_updated = time.monotonic()
+        self.throttled = 0
+        self.latency = latency  # converse: 전체 응답 지연, converse-stream: 첫 토큰 지연
+        self.reply_text = reply_text
+        self.model_latency = model_latency or {}  # 모델 ID 별 지연 (없으면 latency)
+        self.tool_input = tool_input  # toolConfig 가 있는 converse 요청에 돌려줄 도구 입력 (dict)
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay  # 스트리밍 조각 사이 지연 (초)
+        self.requests = 0
+        self.cached_prefixes = set()
+        self._count_lock = threading.Lock()
+
+    def usage(self, model_id, body, text):
+        with self._count_lock:
+            return estimate_usage({**body, "modelId": model_id}, len(text), self.cached_prefixes)
+
+    def count_request(self):
+        with self._count_lock:
+            self.requests += 1
+
+    def admit(self):
+        if not self.max_rpm:
+            return True
+        with self._count_lock:
+            now = time.monotonic()
+            self.allowance = min(self.burst, self.allowance + (now - self.allowance_updated) * self.max_rpm / 60.0)
+            self.allowance_updated = now
+            if self.allowance < 1:
+                self.throttled += 1
+                return False
+            self.allowance -= 1
+            return True
+
+    def handle_error(self, request, client_address):
+        # 클라이언트가 스트림을 중간에 끊는 경우 (취소) 는 정상 동작이다
+        if not isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            super().handle_error(request, client_address)
+
+    @property
+    def endpoint_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def use_fake_credentials():
+    # 스텁 서버는 서명을 검사하지 않지만 boto3 는 자격 증명이 있어야 요청을 보낸다
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "stub")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "stub")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="로컬 Bedrock Runtime 스텁 서버")
+    parser.add_argument("--port", type=int, default=8599)
+    parser.add_argument("--latency", type=float, default=0.0, help="응답 지연 (초)")
+    parser.add_argument("--chunk-delay", type=float, default=0.0, help="스트리밍 조각 사이 지연 (초)")
+    parser.add_argument("--max-rpm", type=int, default=0, help="초과 시 ThrottlingException (0 이면 제한 없음)")
+    args = parser.parse_args()
+
+    server = StubBedrockServer(port=args.port, latency=args.latency, chunk_delay=args.chunk_delay,
+                               max_rpm=args.max_rpm)
+    print(f"stub bedrock listening on {server.endpoint_url}")
+    server.serve_forever()
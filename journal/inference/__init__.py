@@ -0,0 +1,146 @@
+import importlib
+
+# 패키지 공개 이름 -> 정의된 하위 모듈
+# 하위 모듈은 처음 쓸 때 불러온다. 페이지마다 쓰는 도구만 불러오게 해서
+# (pandas / numpy / sqlite3 를 쓰는 모듈까지 매번 불러오지 않게) 페이지 시작 시간을 줄인다.
+_EXPORTS = {
+    # cache
+    "ResponseCache": "cache",
+    "cache_key": "cache",
+    "get_response_cache": "cache",
+    # client
+    "get_bedrock_client": "client",
+    "build_bedrock_client": "client",
+    # backends
+    "RecordingNotFound": "backends",
+    "RecordingStore": "backends",
+    "ReplayBackend": "backends",
+    "SyntheticBackend": "backends",
+    "configure_backend": "backends",
+    "get_backend": "backends",
+    # cancel
+    "CallCancelled": "cancel",
+    "CancelToken": "cancel",
+    "DeadlineExceeded": "cancel",
+    # core
+    "InferenceRequest": "core",
+    "InferenceResponse": "core",
+    "extract_text": "core",
+    "invoke": "core",
+    # images
+    "PreparedImage": "images",
+    "prepare_image": "images",
+    "process_image_for_bedrock": "images",
+    # metrics
+    "latency_summary": "metrics",
+    "record_latency": "metrics",
+    # streaming
+    "STREAMING_ENABLED": "streaming",
+    "TextStream": "streaming",
+    "invoke_stream": "streaming",
+    # singleflight
+    "SINGLE_FLIGHT_ENABLED": "singleflight",
+    "SingleFlight": "singleflight",
+    "flight_key": "singleflight",
+    "get_single_flight": "singleflight",
+    # models
+    "MODEL_CHOICES": "models",
+    "MODELS": "models",
+    "TIER_MODELS": "models",
+    "Model": "models",
+    "get_model": "models",
+    "selected_model_id": "models",
+    # tasks
+    "TASKS": "tasks",
+    "Task": "tasks",
+    "get_task": "tasks",
+    # tools
+    "STYLES": "tools",
+    "analyze_content": "tools",
+    "analyze_data": "tools",
+    "change_related": "tools",
+    "check_facts": "tools",
+    "check_grammar": "tools",
+    "generate_seo_title": "tools",
+    "regenerate_text": "tools",
+    "rewrite_text": "tools",
+    "run_task": "tools",
+    # parallel
+    "ANALYSIS_TASKS": "parallel",
+    "TaskResult": "parallel",
+    "run_all": "parallel",
+    # batch
+    "OPERATIONS": "batch",
+    "read_articles": "batch",
+    "run_batch": "batch",
+    # usage
+    "MODEL_PRICING": "usage",
+    "UsageStore": "usage",
+    "estimate_cost": "usage",
+    "get_usage_store": "usage",
+    "response_cost": "usage",
+    # chunking
+    "check_facts_long": "chunking",
+    "check_grammar_long": "chunking",
+    "chunk_text": "chunking",
+    "is_long_document": "chunking",
+    # incremental
+    "IncrementalGrammarChecker": "incremental",
+    # structured
+    "Claim": "structured",
+    "ContentAnalysisResult": "structured",
+    "Correction": "structured",
+    "FactCheckResult": "structured",
+    "GrammarResult": "structured",
+    "Keyword": "structured",
+    "analyze_content_structured": "structured",
+    "check_facts_structured": "structured",
+    "check_grammar_structured": "structured",
+    "load_json": "structured",
+    # claims
+    "ClaimIndex": "claims",
+    "check_facts_indexed": "claims",
+    "get_claim_index": "claims",
+    # spelling
+    "SpellingResult": "spelling",
+    "check_spelling": "spelling",
+    "apply_corrections": "spelling",
+    # candidates
+    "Candidate": "candidates",
+    "RewriteCandidates": "candidates",
+    # jobs
+    "Job": "jobs",
+    "JobQueue": "jobs",
+    "get_job_queue": "jobs",
+    # keywords
+    "CorpusIndex": "keywords",
+    "analyze_content_local": "keywords",
+    "content_insights": "keywords",
+    "get_corpus_index": "keywords",
+    "tokenize": "keywords",
+    # figures
+    "extract_figures": "figures",
+    "figures_table": "figures",
+    "format_value": "figures",
+    # history
+    "EditHistory": "history",
+    "HistoryStore": "history",
+    "compare_versions": "history",
+    "document_key": "history",
+    "get_history_store": "history",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,289 @@
+import asyncio
+import base64
+import binascii
+import hashlib
+import json
+import os
+import time
+from dataclasses import asdict, is_dataclass
+
+import anyio
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from .cache import get_response_cache
+from .cancel import CancelToken, DeadlineExceeded
+from .client import CLIENT_CONFIG
+from .images import prepare_image
+from .models import MODEL_CHOICES, selected_model_id
+from .ratelimit import get_rate_limiter, is_throttling_error
+from .singleflight import get_single_flight
+from .structured import check_facts_structured, check_grammar_structured
+from .tools import STYLES, analyze_data, check_facts, check_grammar, generate_seo_title, rewrite_text
+
+# CMS 연동용 HTTP API (ASGI, Streamlit 없이 실행)
+#   POST /v1/<도구>  {"text": ..., "model": "auto", "image": "<base64>", "stream": false, ...}
+# stream 이면 text/event-stream 으로 조각마다 token 이벤트, 끝나면 done 이벤트를 보낸다.
+# 모델 호출은 동기 (boto3) 이므로 작업자 스레드에서 실행하고, 동시에 실행하는 호출 수는
+# Bedrock 연결 풀 크기 (API_CONCURRENCY) 로 제한해 연결을 기다리며 막히는 스레드가 없게 한다.
+# 같은 요청 (도구 + 입력) 이 동시에 여러 번 들어오면 호출은 하나만 하고 결과 (스트림 조각 포함) 를 함께 받는다.
+# (API 요청끼리는 여기서 합쳐 작업자 스레드도 아끼고, 앱 화면 등 다른 경로와의 중복은 모델 호출 단계의 singleflight 가 합친다)
+# API_KEY 를 지정하면 Authorization: Bearer <키> 또는 X-API-Key 헤더가 있어야 한다.
+API_CONCURRENCY = int(os.environ.get("API_CONCURRENCY", CLIENT_CONFIG["max_pool_connections"]))
+API_KEY = os.environ.get("API_KEY", "")
+API_MAX_TEXT_CHARS = int(os.environ.get("API_MAX_TEXT_CHARS", "50000"))
+
+
+class BadRequest(ValueError):
+    pass
+
+
+# 도구 이름 -> (텍스트 결과 함수, 구조화 결과 함수)
+TOOLS = {
+    "rewrite": (rewrite_text, None),
+    "fact-check": (check_facts, check_facts_structured),
+    "grammar": (check_grammar, check_grammar_structured),
+    "data-analysis": (analyze_data, None),
+    "seo-title": (generate_seo_title, None),
+}
+
+
+def parse_body(tool, body):
+    # JSON 본문 -> (함수, 위치 인자, 키워드 인자, 구조화 결과인지)
+    if not isinstance(body, dict):
+        raise BadRequest("JSON 객체를 보내야 합니다")
+    text = body.get("text")
+    if not isinstance(text, str) or not text.strip():
+        raise BadRequest("text 가 비어 있습니다")
+    if len(text) > API_MAX_TEXT_CHARS:
+        raise BadRequest(f"text 는 {API_MAX_TEXT_CHARS:,}자를 넘을 수 없습니다")
+    model = body.get("model") or "auto"
+    if model not in MODEL_CHOICES:
+        raise BadRequest(f"알 수 없는 model: {model} (가능: {', '.join(MODEL_CHOICES)})")
+
+    image = None
+    if body.get("image"):
+        try:
+            image = prepare_image(base64.b64decode(body["image"], validate=True)).data
+        except (binascii.Error, OSError, ValueError):
+            raise BadRequest("image 는 base64 로 인코딩한 이미지여야 합니다")
+
+    structured = bool(body.get("structured"))
+    text_fn, structured_fn = TOOLS[tool]
+    if structured and structured_fn is None:
+        raise BadRequest(f"{tool} 은 structured 를 지원하지 않습니다")
+    if structured and body.get("stream"):
+        raise BadRequest("structured 와 stream 은 함께 쓸 수 없습니다")
+    args = (text,)
+    if tool == "rewrite":
+        style = body.get("style") or STYLES[0]
+        if style not in STYLES:
+            raise BadRequest(f"알 수 없는 style: {style} (가능: {', '.join(STYLES)})")
+        args += (style, bool(body.get("use_emoji")))
+    fn = structured_fn if structured else text_fn
+    return fn, args + (image,), {"model_id": selected_model_id(model)}, structured
+
+
+def request_key(tool, args, options, structured):
+    # 스트림 여부는 키에 넣지 않는다 (텍스트 결과는 어느 쪽이든 스트림으로 받아 나눠준다)
+    payload = repr((tool, args[:-1], hashlib.sha256(args[-1] or b"").hexdigest(), sorted(options.items()), structured))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def to_json(result):
+    return asdict(result) if is_dataclass(result) else result
+
+
+def stream_info(stream):
+    response = stream.response
+    return {
+        "model_id": response.model_id if response else None,
+        "cached": stream.cached,
+        "shared": bool(response and response.shared),
+        "streamed": stream.streamed,
+        "fallback_from": stream.fallback_from,
+        "ttft_ms": round(stream.ttft_ms, 1) if stream.ttft_ms is not None else None,
+        "total_ms": round(stream.total_ms, 1) if stream.total_ms is not None else None,
+        "usage": response.usage if response else {},
+    }
+
+
+def error_status(error):
+    if isinstance(error, BadRequest):
+        return 400
+    if isinstance(error, DeadlineExceeded):
+        return 504
+    if is_throttling_error(error):
+        return 429
+    return 502
+
+
+class Flight:
+    # 진행 중인 호출 하나. 같은 요청을 보낸 클라이언트들이 함께 구독한다.
+    # 구독자가 모두 떠나면 호출도 취소한다
+    def __init__(self):
+        self.chunks = []
+        self.result = None
+        self.info = {}
+        self.error = None
+        self.done = False
+        self.subscribers = 0
+        self.token = CancelToken()
+        self._changed = asyncio.Event()
+
+    def notify(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def wait(self):
+        await self._changed.wait()
+
+    def leave(self):
+        self.subscribers -= 1
+        if self.subscribers == 0 and not self.done:
+            self.token.cancel()
+
+
+class Coalescer:
+
+    def __init__(self, concurrency):
+        # 호출 하나는 끝날 때까지 (스트림을 다 읽을 때까지) 자리 하나와 연결 하나를 쓴다
+        self.slots = anyio.CapacityLimiter(concurrency)
+        self.threads = anyio.CapacityLimiter(concurrency)
+        self.started = 0
+        self.joined = 0  # 진행 중인 같은 호출에 합류해서 따로 호출하지 않은 요청 수
+        self._flights = {}
+
+    def join(self, key, fn, args, options, structured):
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = Flight()
+            self._flights[key] = flight
+            self.started += 1
+            asyncio.get_running_loop().create_task(self._run(key, flight, fn, args, options, structured))
+        else:
+            self.joined += 1
+        flight.subscribers += 1
+        return flight
+
+    async def _run(self, key, flight, fn, args, options, structured):
+        try:
+            async with self.slots:
+                if not structured:
+                    # 텍스트 결과는 스트림으로 받아 조각을 바로 나눠주고 지연/사용량 정보도 남긴다
+                    # (analyze_data 처럼 호출 전에 로컬 계산을 하는 도구도 있어 만드는 것도 작업자 스레드에서 한다)
+                    text_stream = await anyio.to_thread.run_sync(
+                        lambda: fn(*args, stream=True, cancel_token=flight.token, **options), limiter=self.threads)
+                    iterator = iter(text_stream)
+                    while True:
+                        chunk = await anyio.to_thread.run_sync(next, iterator, None, limiter=self.threads)
+                        if chunk is None:
+                            break
+                        flight.chunks.append(chunk)
+                        flight.notify()
+                    flight.result = "".join(flight.chunks)
+                    flight.info = stream_info(text_stream)
+                else:
+                    flight.result = await anyio.to_thread.run_sync(
+                        lambda: fn(*args, cancel_token=flight.token, **options), limiter=self.threads)
+        except Exception as e:
+            flight.error = e
+        finally:
+            flight.done = True
+            self._flights.pop(key, None)
+            flight.notify()
+
+    def stats(self):
+        return {"in_flight": len(self._flights), "started": self.started, "joined": self.joined}
+
+
+async def subscribe(flight):
+    # 지금까지 온 조각부터 끝날 때까지 차례로 내보낸다
+    sent = 0
+    while True:
+        while sent < len(flight.chunks):
+            yield flight.chunks[sent]
+            sent += 1
+        if flight.done:
+            return
+        await flight.wait()
+
+
+def sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def authorized(request):
+    if not API_KEY:
+        return True
+    header = request.headers.get("authorization", "")
+    return request.headers.get("x-api-key") == API_KEY or header == f"Bearer {API_KEY}"
+
+
+def create_app(concurrency=API_CONCURRENCY):
+    coalescer = Coalescer(concurrency)
+
+    async def run_tool(request):
+        if not authorized(request):
+            return JSONResponse({"error": "인증이 필요합니다"}, status_code=401)
+        tool = request.path_params["tool"]
+        if tool not in TOOLS:
+            return JSONResponse({"error": f"알 수 없는 도구: {tool}", "tools": list(TOOLS)}, status_code=404)
+        try:
+            body = await request.json()
+        except ValueError:
+            return JSONResponse({"error": "본문이 올바른 JSON 이 아닙니다"}, status_code=400)
+        try:
+            # 이미지 축소/재압축은 CPU 를 쓰므로 이벤트 루프를 막지 않게 작업자 스레드에서 한다
+            fn, args, options, structured = await anyio.to_thread.run_sync(
+                parse_body, tool, body, limiter=coalescer.threads)
+        except BadRequest as e:
+            return JSONResponse({"error": str(e)}, status_code=400)
+        # 사용량 대시보드에서 호출한 CMS 를 구분할 수 있게 한다
+        options["session_id"] = request.headers.get("x-client-id") or "api"
+        start = time.perf_counter()
+        flight = coalescer.join(request_key(tool, args, options, structured), fn, args, options, structured)
+
+        if body.get("stream"):
+            async def events():
+                try:
+                    async for chunk in subscribe(flight):
+                        yield sse("token", {"text": chunk})
+                    if flight.error is not None:
+                        yield sse("error", {"error": str(flight.error), "status": error_status(flight.error)})
+                    else:
+                        yield sse("done", {"text": flight.result, **flight.info})
+                finally:
+                    flight.leave()
+
+            return StreamingResponse(events(), media_type="text/event-stream",
+                                     headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+        try:
+            async for _ in subscribe(flight):
+                pass
+        finally:
+            flight.leave()
+        if flight.error is not None:
+            return JSONResponse({"error": str(flight.error)}, status_code=error_status(flight.error))
+        payload = {"tool": tool, "result": to_json(flight.result), **flight.info,
+                   "elapsed_ms": round((time.perf_counter() - start) * 1000, 1)}
+        return JSONResponse(payload)
+
+    async def health(request):
+        return JSONResponse({
+            "status": "ok",
+            "tools": list(TOOLS),
+            "coalescing": coalescer.stats(),
+            "response_cache": get_response_cache().stats(),
+            "single_flight": get_single_flight().stats(),
+            "rate_limiter": get_rate_limiter().stats(),
+        })
+
+    app = Starlette(routes=[
+        Route("/health", health, methods=["GET"]),
+        Route("/v1/{tool}", run_tool, methods=["POST"]),
+    ])
+    app.state.coalescer = coalescer
+    return app
@@ -0,0 +1,396 @@
+import json
+import os
+import random
+import re
+import threading
+import time
+
+from botocore.exceptions import ClientError, ReadTimeoutError
+
+from . import client as bedrock_client
+from .models import MODELS_BY_ID
+from .singleflight import flight_key
+
+# Bedrock 백엔드 (BEDROCK_BACKEND)
+#   live       실제 Bedrock Runtime (기본)
+#   record     실제 Bedrock 을 호출하고 응답을 BEDROCK_RECORDINGS_DIR 에 저장한다 (스트림은 이벤트마다 도착 시각까지)
+#   replay     저장해 둔 응답을 녹화된 시각대로 돌려준다. 자격 증명과 네트워크 없이 같은 결과를 다시 낼 수 있다
+#   synthetic  모델을 호출하지 않고 첫 토큰 지연 / 토큰 속도 분포를 흉내 낸 응답을 만든다
+# 모두 boto3 클라이언트와 같은 converse / converse_stream 을 제공하므로 호출하는 쪽 (요청 제한기, 취소, 스트리밍,
+# 캐시, 사용량 기록) 은 그대로 돈다. 앱과 페이지, 벤치마크를 오프라인에서 실행하고 지연/처리량을 잴 수 있다.
+BEDROCK_RECORDINGS_DIR = os.path.expanduser(os.environ.get("BEDROCK_RECORDINGS_DIR", "~/.journal/recordings"))
+REPLAY_SPEED = float(os.environ.get("BEDROCK_REPLAY_SPEED", "1"))  # 녹화된 지연에 곱할 배율 (0 이면 지연 없이)
+
+# synthetic: 첫 토큰 지연과 토큰 속도는 중앙값에 로그정규 배율 (sigma = JITTER) 을 곱해 호출마다 뽑는다
+SYNTHETIC_TTFT_MS = float(os.environ.get("BEDROCK_SYNTHETIC_TTFT_MS", "600"))
+SYNTHETIC_TOKENS_PER_SECOND = float(os.environ.get("BEDROCK_SYNTHETIC_TOKENS_PER_SECOND", "60"))
+SYNTHETIC_JITTER = float(os.environ.get("BEDROCK_SYNTHETIC_JITTER", "0.3"))
+SYNTHETIC_OUTPUT_TOKENS = int(os.environ.get("BEDROCK_SYNTHETIC_OUTPUT_TOKENS", "300"))
+SYNTHETIC_THROTTLE_RATE = float(os.environ.get("BEDROCK_SYNTHETIC_THROTTLE_RATE", "0"))  # ThrottlingException 비율
+SYNTHETIC_SEED = os.environ.get("BEDROCK_SYNTHETIC_SEED") or None
+CHUNK_TOKENS = 4  # 스트림 조각 하나의 토큰 수
+
+# 모델별 대략적인 상대 속도 (첫 토큰 지연은 나누고 토큰 속도는 곱한다)
+MODEL_SPEED = {
+    "claude-3-5-sonnet": 1.0,
+    "claude-3-sonnet": 1.0,
+    "claude-3-5-haiku": 1.8,
+    "claude-3-haiku": 2.5,
+    "nova-pro": 1.5,
+    "nova-lite": 2.2,
+    "nova-micro": 3.0,
+}
+
+WORD = re.compile(r"[^\s]+")
+
+
+class RecordingNotFound(LookupError):
+    pass
+
+
+def estimate_usage(converse_request, output_chars, cached_prefixes):
+    # 토큰 수는 글자 수 / 2 로 어림한다. cachePoint 앞부분은 처음 보면 캐시 쓰기, 다시 보면 캐시 읽기로 센다.
+    # cached_prefixes 는 호출자가 잠금을 잡고 넘기는 (모델, 앞부분) 집합
+    blocks = list(converse_request.get("system") or []) + [
+        block for message in converse_request.get("messages", []) for block in message["content"]]
+    prefix, cached_chars = "", 0
+    for block in blocks:
+        if "cachePoint" in block:
+            cached_chars = len(prefix)
+        else:
+            prefix += block.get("text", "")
+    total, cached = len(prefix) // 2, cached_chars // 2
+    key = hash((converse_request.get("modelId"), prefix[:cached_chars]))
+    hit = cached and key in cached_prefixes
+    if cached:
+        cached_prefixes.add(key)
+    output = max(1, output_chars // 2)
+    usage = {"inputTokens": max(1, total - cached), "outputTokens": output}
+    if cached:
+        usage["cacheReadInputTokens" if hit else "cacheWriteInputTokens"] = cached
+    usage["totalTokens"] = usage["inputTokens"] + cached + output
+    return usage
+
+
+class EventStream:
+    # converse_stream 응답의 "stream" 자리에 들어가는 이벤트 목록. [(도착 시각 초, 이벤트), ...] 를 시각에 맞춰 내보낸다.
+    # close() 하면 다음 이벤트를 기다리던 중이라도 바로 끝난다
+    def __init__(self, events, speed=1.0):
+        self.events = events
+        self.speed = speed
+        self._closed = threading.Event()
+
+    def __iter__(self):
+        start = time.monotonic()
+        for offset, event in self.events:
+            delay = start + offset * self.speed - time.monotonic()
+            if (delay > 0 and self._closed.wait(delay)) or self._closed.is_set():
+                return
+            yield event
+
+    def close(self):
+        self._closed.set()
+
+
+def text_events(text, usage, stop_reason, ttft, tokens_per_second):
+    # 텍스트를 CHUNK_TOKENS 토큰 (2자당 1토큰) 씩 나눠 첫 토큰 지연 뒤 토큰 속도대로 도착하는 이벤트로 만든다
+    size = CHUNK_TOKENS * 2
+    events = [(0.0, {"messageStart": {"role": "assistant"}})]
+    offset = ttft
+    for i in range(0, len(text), size):
+        if i:
+            offset += CHUNK_TOKENS / tokens_per_second
+        events.append((offset, {"contentBlockDelta": {"contentBlockIndex": 0, "delta": {"text": text[i:i + size]}}}))
+    events += [
+        (offset, {"contentBlockStop": {"contentBlockIndex": 0}}),
+        (offset, {"messageStop": {"stopReason": stop_reason}}),
+        (offset, {"metadata": {"usage": usage, "metrics": {"latencyMs": int(offset * 1000)}}}),
+    ]
+    return events
+
+
+def response_from_events(events):
+    # 녹화된 스트림 이벤트로 converse 응답을 만든다 (스트리밍으로 녹화하고 일반 호출로 재생할 때)
+    text, stop_reason, metadata = "", None, {}
+    for _, event in events:
+        if "contentBlockDelta" in event:
+            text += event["contentBlockDelta"]["delta"].get("text", "")
+        elif "messageStop" in event:
+            stop_reason = event["messageStop"].get("stopReason")
+        elif "metadata" in event:
+            metadata = event["metadata"]
+    return {
+        "output": {"message": {"role": "assistant", "content": [{"text": text}]}},
+        "stopReason": stop_reason,
+        "usage": metadata.get("usage") or {},
+        "metrics": metadata.get("metrics") or {},
+    }
+
+
+def _wait_or_time_out(seconds, read_timeout, endpoint_url):
+    # 실제 클라이언트처럼 read_timeout 안에 응답이 없으면 ReadTimeoutError (작은 모델로 넘어가는 조건)
+    if read_timeout and seconds > read_timeout:
+        time.sleep(read_timeout)
+        raise ReadTimeoutError(endpoint_url=endpoint_url)
+    time.sleep(seconds)
+
+
+class RecordingStore:
+    # 요청 하나 = JSON 파일 하나. 파일 이름은 호출 종류와 요청 해시 (모델, 프롬프트, 이미지 해시, toolConfig)
+
+    def __init__(self, directory=BEDROCK_RECORDINGS_DIR):
+        self.directory = directory
+
+    def path(self, operation, converse_request):
+        return os.path.join(self.directory, f"{operation}-{flight_key(converse_request)}.json")
+
+    def load(self, operation, converse_request):
+        try:
+            with open(self.path(operation, converse_request), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save(self, operation, converse_request, recording):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(operation, converse_request)
+        prompt = "".join(block.get("text", "") for block in converse_request["messages"][-1]["content"])
+        recording = {"operation": operation, "model_id": converse_request["modelId"], "prompt": prompt[:200],
+                     "recorded_at": time.time(), **recording}
+        # 같은 요청을 동시에 녹화해도 반쯤 쓴 파일을 읽지 않게 임시 파일에 쓰고 바꿔 넣는다
+        temp = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump(recording, f, ensure_ascii=False)
+        os.replace(temp, path)
+
+    def __len__(self):
+        if not os.path.isdir(self.directory):
+            return 0
+        return sum(name.endswith(".json") for name in os.listdir(self.directory))
+
+
+class RecordingStream:
+    # 실제 스트림을 그대로 넘겨주면서 이벤트와 도착 시각을 모으고, 끝까지 읽으면 저장한다 (중간에 닫히면 저장하지 않는다)
+    def __init__(self, stream, start, on_complete):
+        self.stream = stream
+        self.start = start
+        self.on_complete = on_complete
+
+    def __iter__(self):
+        events = []
+        for event in self.stream:
+            events.append((time.monotonic() - self.start, event))
+            yield event
+        self.on_complete(events)
+
+    def close(self):
+        self.stream.close()
+
+
+class RecordBackend:
+
+    def __init__(self, client, store):
+        self.client = client
+        self.store = store
+
+    def converse(self, **converse_request):
+        start = time.monotonic()
+        response = self.client.converse(**converse_request)
+        response = {key: value for key, value in response.items() if key != "ResponseMetadata"}
+        self.store.save("converse", converse_request, {"latency": time.monotonic() - start, "response": response})
+        return response
+
+    def converse_stream(self, **converse_request):
+        start = time.monotonic()
+        response = self.client.converse_stream(**converse_request)
+        return {**response, "stream": RecordingStream(
+            response["stream"], start, lambda events: self.store.save("converse_stream", converse_request,
+                                                                      {"events": events}))}
+
+
+class ReplayBackend:
+    endpoint_url = "replay://bedrock"
+
+    def __init__(self, store, speed=REPLAY_SPEED, read_timeout=None):
+        self.store = store
+        self.speed = speed
+        self.read_timeout = read_timeout
+
+    def _load(self, converse_request):
+        # 같은 호출 종류로 녹화한 것이 없으면 다른 종류의 녹화를 바꿔 쓴다
+        for operation in ("converse", "converse_stream"):
+            recording = self.store.load(operation, converse_request)
+            if recording is not None:
+                return recording
+        raise RecordingNotFound(f"녹화된 응답이 없습니다: {self.store.path('converse', converse_request)} "
+                                f"(BEDROCK_BACKEND=record 로 먼저 녹화하세요)")
+
+    def converse(self, **converse_request):
+        recording = self._load(converse_request)
+        if "events" in recording:
+            response = response_from_events(recording["events"])
+            latency = recording["events"][-1][0] if recording["events"] else 0.0
+        else:
+            response, latency = recording["response"], recording["latency"]
+        _wait_or_time_out(latency * self.speed, self.read_timeout, self.endpoint_url)
+        return response
+
+    def converse_stream(self, **converse_request):
+        recording = self.store.load("converse_stream", converse_request)
+        if recording is None:
+            recording = self._load(converse_request)
+            response = recording["response"]
+            text = "".join(block.get("text", "") for block in response["output"]["message"]["content"])
+            events = text_events(text, response.get("usage") or {}, response.get("stopReason"),
+                                 recording["latency"], float("inf"))
+        else:
+            events = recording["events"]
+        first = next((offset for offset, event in events if "contentBlockDelta" in event), 0.0)
+        _wait_or_time_out(first * self.speed, self.read_timeout, self.endpoint_url)
+        # 첫 토큰까지는 이미 기다렸으므로 나머지 시각만 재생한다
+        return {"stream": EventStream([(max(0.0, offset - first), event) for offset, event in events], self.speed)}
+
+
+def schema_example(schema, words):
+    # toolConfig 의 JSON 스키마를 만족하는 예시 값 (문자열은 프롬프트의 낱말을 차례로 쓴다)
+    if "enum" in schema:
+        return schema["enum"][0]
+    kind = schema.get("type")
+    if kind == "object":
+        return {name: schema_example(prop, words) for name, prop in (schema.get("properties") or {}).items()}
+    if kind == "array":
+        return [schema_example(schema.get("items") or {}, words) for _ in range(2)]
+    if kind in ("number", "integer"):
+        low, high = schema.get("minimum", 0), schema.get("maximum", 1)
+        return (low + high) / 2 if kind == "number" else int(high)
+    if kind == "boolean":
+        return False
+    return next(words, "")
+
+
+class SyntheticBackend:
+    endpoint_url = "synthetic://bedrock"
+
+    def __init__(self, ttft_ms=SYNTHETIC_TTFT_MS, tokens_per_second=SYNTHETIC_TOKENS_PER_SECOND,
+                 jitter=SYNTHETIC_JITTER, output_tokens=SYNTHETIC_OUTPUT_TOKENS,
+                 throttle_rate=SYNTHETIC_THROTTLE_RATE, seed=SYNTHETIC_SEED, read_timeout=None):
+        self.ttft_ms = ttft_ms
+        self.tokens_per_second = tokens_per_second
+        self.jitter = jitter
+        self.output_tokens = output_tokens
+        self.throttle_rate = throttle_rate
+        self.read_timeout = read_timeout
+        self.requests = 0
+        self.throttled = 0
+        self.cached_prefixes = set()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _sample(self, model_id, operation):
+        # (첫 토큰 지연 초, 초당 토큰 수). 스로틀링으로 뽑히면 바로 ThrottlingException
+        model = MODELS_BY_ID.get(model_id)
+        speed = MODEL_SPEED.get(model.key, 1.0) if model else 1.0
+        with self._lock:
+            self.requests += 1
+            if self._random.random() < self.throttle_rate:
+                self.throttled += 1
+                raise ClientError({"Error": {"Code": "ThrottlingException", "Message": "Too many requests"}},
+                                  operation)
+            ttft = self.ttft_ms / 1000 / speed * self._random.lognormvariate(0, self.jitter)
+            tokens_per_second = self.tokens_per_second * speed / self._random.lognormvariate(0, self.jitter)
+        return ttft, tokens_per_second
+
+    def _reply(self, converse_request):
+        # 응답 텍스트는 프롬프트 낱말을 되풀이해 만든다 (같은 요청이면 같은 응답). 도구가 있으면 도구 입력 (JSON)
+        prompt = "".join(block.get("text", "") for block in converse_request["messages"][-1]["content"])
+        words = WORD.findall(prompt) or ["응답"]
+        tools = (converse_request.get("toolConfig") or {}).get("tools") or []
+        if tools:
+            spec = tools[0]["toolSpec"]
+            tool_input = schema_example(spec["inputSchema"]["json"], iter(words))
+            return json.dumps(tool_input, ensure_ascii=False), {"toolUse": {
+                "toolUseId": "synthetic-tool-use", "name": spec["name"], "input": tool_input}}
+        max_tokens = (converse_request.get("inferenceConfig") or {}).get("maxTokens") or self.output_tokens
+        chars = min(self.output_tokens, max_tokens) * 2
+        text, i = "", 0
+        while len(text) < chars:
+            text += words[i % len(words)] + " "
+            i += 1
+        text = text[:chars].rstrip()
+        return text, {"text": text}
+
+    def _usage(self, converse_request, text):
+        with self._lock:
+            return estimate_usage(converse_request, len(text), self.cached_prefixes)
+
+    def converse(self, **converse_request):
+        ttft, tokens_per_second = self._sample(converse_request["modelId"], "Converse")
+        text, block = self._reply(converse_request)
+        usage = self._usage(converse_request, text)
+        latency = ttft + usage["outputTokens"] / tokens_per_second
+        _wait_or_time_out(latency, self.read_timeout, self.endpoint_url)
+        return {
+            "output": {"message": {"role": "assistant", "content": [block]}},
+            "stopReason": "tool_use" if "toolUse" in block else "end_turn",
+            "usage": usage,
+            "metrics": {"latencyMs": int(latency * 1000)},
+        }
+
+    def converse_stream(self, **converse_request):
+        ttft, tokens_per_second = self._sample(converse_request["modelId"], "ConverseStream")
+        text, _ = self._reply(converse_request)
+        events = text_events(text, self._usage(converse_request, text), "end_turn", ttft, tokens_per_second)
+        _wait_or_time_out(ttft, self.read_timeout, self.endpoint_url)
+        return {"stream": EventStream([(max(0.0, offset - ttft), event) for offset, event in events])}
+
+
+_backends = {}
+_backend_options = {}
+_lock = threading.Lock()
+BACKENDS = ("live", "record", "replay", "synthetic")
+
+
+def configure_backend(name, **options):
+    # 벤치마크/테스트에서 백엔드를 바꾼다. options 는 백엔드 생성 인자 (synthetic 의 ttft_ms, replay 의 speed 등)
+    if name not in BACKENDS:
+        raise ValueError(f"알 수 없는 BEDROCK_BACKEND: {name} (가능: {', '.join(BACKENDS)})")
+    with _lock:
+        bedrock_client.BEDROCK_BACKEND = name
+        _backend_options.clear()
+        _backend_options.update(options)
+        _backends.clear()
+
+
+def _build_backend(name, region_name, endpoint_url, read_timeout, options):
+    options = dict(options)
+    if name == "synthetic":
+        return SyntheticBackend(read_timeout=read_timeout, **options)
+    store = RecordingStore(options.pop("directory", BEDROCK_RECORDINGS_DIR))
+    if name == "replay":
+        return ReplayBackend(store, read_timeout=read_timeout, **options)
+    if name == "record":
+        return RecordBackend(bedrock_client.get_live_client(region_name, endpoint_url, read_timeout), store)
+    raise ValueError(f"알 수 없는 BEDROCK_BACKEND: {name} (가능: {', '.join(BACKENDS)})")
+
+
+def get_backend(name, region_name=None, endpoint_url=None, read_timeout=None):
+    # 백엔드와 read_timeout 별로 하나씩 만들어 프로세스 전체가 같이 쓴다
+    key = (name, region_name, endpoint_url, read_timeout)
+    backend = _backends.get(key)
+    if backend is None:
+        with _lock:
+            backend = _backends.get(key)
+            if backend is None:
+                backend = _build_backend(name, region_name, endpoint_url, read_timeout, _backend_options)
+                _backends[key] = backend
+    return backend
+
+
+def backend_stats():
+    # synthetic 백엔드들의 호출 / 스로틀링 수 합계 (read_timeout 별로 따로 있다)
+    with _lock:
+        backends = list(_backends.values())
+    return {
+        "requests": sum(getattr(backend, "requests", 0) for backend in backends),
+        "throttled": sum(getattr(backend, "throttled", 0) for backend in backends),
+    }
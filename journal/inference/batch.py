@@ -0,0 +1,145 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .tools import STYLES, check_facts, check_grammar, generate_seo_title, rewrite_text
+
+# 기사 일괄 처리: CSV/JSONL 을 청크 단위로 읽고, 동시 실행 수와 분당 요청 수를 제한해서
+# 결과를 JSONL 파일에 한 줄씩 바로 기록한다. 결과 파일이 곧 체크포인트이므로
+# 같은 결과 파일로 다시 실행하면 이미 성공한 행은 건너뛴다.
+
+BATCH_OUTPUT_DIR = os.environ.get("BATCH_OUTPUT_DIR") or os.path.join(tempfile.gettempdir(), "journal-batch")
+READ_CHUNK_SIZE = 500
+
+OPERATIONS = {
+    "rewrite": "기사 재작성",
+    "grammar": "맞춤법 교정",
+    "fact_check": "팩트 체크",
+    "seo_title": "SEO 제목",
+}
+
+
+def get_operation(operation, style=STYLES[0], use_emoji=False, **options):
+    if operation == "rewrite":
+        return lambda text: rewrite_text(text, style, use_emoji, **options)
+    if operation == "grammar":
+        return lambda text: check_grammar(text, **options)
+    if operation == "fact_check":
+        return lambda text: check_facts(text, **options)
+    if operation == "seo_title":
+        return lambda text: generate_seo_title(text, **options)
+    raise ValueError(f"알 수 없는 작업: {operation}")
+
+
+def detect_format(name):
+    return "jsonl" if str(name).lower().endswith((".jsonl", ".json", ".ndjson")) else "csv"
+
+
+def read_articles(source, fmt=None, text_column="text", id_column="id", chunksize=READ_CHUNK_SIZE):
+    # (기사 id, 본문) 을 하나씩 내보낸다. 파일 전체를 메모리에 올리지 않는다.
+    import pandas as pd
+
+    fmt = fmt or detect_format(getattr(source, "name", source))
+    if fmt == "csv":
+        reader = pd.read_csv(source, chunksize=chunksize, dtype=str, keep_default_na=False)
+    else:
+        reader = pd.read_json(source, lines=True, chunksize=chunksize, dtype=False)
+
+    index = 0
+    for chunk in reader:
+        if text_column not in chunk.columns:
+            raise ValueError(f"'{text_column}' 열이 없습니다: {list(chunk.columns)}")
+        has_id = id_column in chunk.columns
+        for row in chunk.to_dict("records"):
+            article_id = str(row[id_column]) if has_id else str(index)
+            yield article_id, str(row[text_column] or "")
+            index += 1
+
+
+def completed_ids(output_path):
+    # 결과 파일에서 이미 성공한 기사 id 를 읽는다
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # 중단 시 잘린 마지막 줄
+            if record.get("error") is None:
+                done.add(record["id"])
+    return done
+
+
+class RateLimiter:
+    # 작업 단위 분당 요청 수 상한 (요청 간 최소 간격). 프로세스 전역 제한은 inference.ratelimit
+    def __init__(self, requests_per_minute):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            delay = max(0.0, self._next - now)
+            self._next = max(now, self._next) + self.interval
+        if delay:
+            time.sleep(delay)
+
+
+def _process(fn, article_id, text, operation):
+    start = time.perf_counter()
+    record = {"id": article_id, "operation": operation, "result": None, "error": None}
+    try:
+        record["result"] = fn(text)
+    except Exception as e:
+        record["error"] = str(e)
+    record["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    return record
+
+
+def run_batch(articles, operation, output_path, concurrency=4, requests_per_minute=60,
+              resume=True, style=STYLES[0], use_emoji=False, session_id=None, model_id=None):
+    # 처리한 행마다 결과 레코드를 내보낸다 (건너뛴 행은 skipped=True)
+    # 전역 요청 제한기에서 일괄 작업 전체가 하나의 세션으로 취급되어 화면 사용자와 번갈아 처리된다
+    session_id = session_id or f"batch:{os.path.basename(output_path)}"
+    fn = get_operation(operation, style, use_emoji, session_id=session_id, model_id=model_id)
+    done = completed_ids(output_path) if resume else set()
+    limiter = RateLimiter(requests_per_minute)
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+
+    with open(output_path, "a" if resume else "w", encoding="utf-8") as out, \
+            ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="batch") as executor:
+
+        def write(record):
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            return record
+
+        pending = set()
+        for article_id, text in articles:
+            if article_id in done or not text.strip():
+                yield {"id": article_id, "operation": operation, "skipped": True}
+                continue
+            # 대기 중인 작업 수를 제한해서 입력이 커도 메모리 사용량이 일정하게 유지되도록 한다
+            while len(pending) >= concurrency * 2:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    yield write(future.result())
+            limiter.acquire()
+            pending.add(executor.submit(_process, fn, article_id, text, operation))
+
+        while pending:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                yield write(future.result())
+
+
+def default_output_path(key, operation):
+    return os.path.join(BATCH_OUTPUT_DIR, f"{key}_{operation}.jsonl")
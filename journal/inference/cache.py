@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# 동일 프롬프트 응답 캐시 (메모리 LRU + 선택적 SQLite 디스크 계층)
+CACHE_MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_SIZE", "512"))
+CACHE_TTL_SECONDS = float(os.environ.get("RESPONSE_CACHE_TTL", str(24 * 60 * 60)))
+# 지정하면 앱을 재시작해도 유지되는 디스크 캐시를 사용한다
+CACHE_DB_PATH = os.environ.get("RESPONSE_CACHE_PATH") or None
+
+
+def _canonical_content(block):
+    # 이미지 바이트는 해시로 대체해서 키에 반영
+    if "image" in block:
+        data = block["image"]["source"]["bytes"]
+        return {"image": {"format": block["image"].get("format"),
+                          "sha256": hashlib.sha256(data).hexdigest()}}
+    return block
+
+
+def cache_key(request):
+    # (model_id, 시스템 프롬프트, 프롬프트, 이미지 바이트, inferenceConfig, toolConfig) 의 해시
+    # 구조화 출력은 같은 프롬프트라도 도구 정의가 다르면 응답 형태가 다르므로 toolConfig 도 넣는다
+    canonical = {
+        "modelId": request["modelId"],
+        "system": request.get("system"),
+        "messages": [
+            {"role": m["role"], "content": [_canonical_content(b) for b in m["content"]]}
+            for m in request["messages"]
+        ],
+        "inferenceConfig": request.get("inferenceConfig"),
+        "toolConfig": request.get("toolConfig"),
+    }
+    payload = json.dumps(canonical, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, db_path=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (저장 시각, 응답 텍스트)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, created REAL NOT NULL, text TEXT NOT NULL)"
+            )
+            self._db.execute("DELETE FROM responses WHERE created < ?", (time.time() - ttl,))
+            self._db.commit()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry[0] <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT created, text FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and now - row[0] <= self.ttl:
+                    # 디스크 적중은 메모리 계층으로 승격
+                    self._remember(key, row[0], row[1])
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return row[1]
+
+            self.misses += 1
+            return None
+
+    def set(self, key, text):
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, text)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, created, text) VALUES (?, ?, ?)",
+                    (key, now, text),
+                )
+                self._db.commit()
+
+    def _remember(self, key, created, text):
+        self._entries[key] = (created, text)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    # 프로세스 전역 캐시 (Streamlit 세션 간 공유)
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache(db_path=CACHE_DB_PATH)
+    return _cache
@@ -0,0 +1,136 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+
+from .client import CLIENT_CONFIG
+
+# 모델 호출 취소와 마감 시간
+# CancelToken 은 호출 하나 (또는 함께 취소할 호출 묶음) 의 취소 신호와 마감 시각을 들고 다닌다.
+# converse 호출과 스트림 읽기는 별도 스레드 풀에서 돌리고, 호출한 스레드는 짧은 간격으로 토큰을 확인하며 기다린다.
+# 그래서 취소되거나 마감이 지나면 호출한 스레드 (Streamlit 스크립트 스레드 등) 는 곧바로 CallCancelled 로 풀려나고,
+# 스트림은 다음 조각에서 닫혀 남은 토큰 생성을 더 받지 않는다.
+POLL_INTERVAL = 0.1
+
+# 응답 대기 + 스트림 읽기 스레드. 연결 풀보다 넉넉하게 잡는다 (취소된 호출이 끝나기를 기다리는 스레드 포함)
+_executor = ThreadPoolExecutor(max_workers=CLIENT_CONFIG["max_pool_connections"] * 2,
+                               thread_name_prefix="bedrock-call")
+
+
+class CallCancelled(Exception):
+    pass
+
+
+class DeadlineExceeded(CallCancelled, TimeoutError):
+    pass
+
+
+class CancelToken:
+
+    def __init__(self, timeout=None, parent=None, should_cancel=None):
+        self.parent = parent
+        self.should_cancel = should_cancel  # 외부 취소 조건 (예: Streamlit rerun 요청)
+        self.deadline = time.monotonic() + timeout if timeout else None
+        if parent is not None and parent.deadline is not None:
+            self.deadline = parent.deadline if self.deadline is None else min(self.deadline, parent.deadline)
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        if self._event.is_set():
+            return True
+        if (self.should_cancel and self.should_cancel()) or (self.parent is not None and self.parent.cancelled):
+            self._event.set()
+            return True
+        return False
+
+    def remaining(self):
+        return None if self.deadline is None else self.deadline - time.monotonic()
+
+    @property
+    def expired(self):
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def check(self):
+        if self.cancelled:
+            raise CallCancelled("모델 호출이 취소되었습니다")
+        if self.expired:
+            raise DeadlineExceeded("모델 응답 제한 시간을 넘겼습니다")
+
+    def child(self, timeout=None):
+        # 부모가 취소되면 같이 취소되고, 마감은 둘 중 이른 쪽을 따른다
+        return CancelToken(timeout, parent=self)
+
+    def sleep(self, seconds):
+        end = time.monotonic() + seconds
+        while True:
+            self.check()
+            left = end - time.monotonic()
+            if left <= 0:
+                return
+            self._event.wait(min(left, POLL_INTERVAL))
+
+
+def call_cancellable(call, token, on_abandoned=None):
+    # call() 을 호출 스레드 풀에서 실행하고 결과를 기다린다.
+    # 기다리는 중에 취소되면 바로 CallCancelled 를 올린다. 이미 시작한 호출은 스레드에서 끝까지 돌고 (과금도 된다)
+    # 시작 전이면 시작하지 않는다. 어느 쪽이든 CallCancelled 를 올렸으면 호출이 정말 끝난 뒤
+    # on_abandoned(future) 가 한 번 불린다 (결과 정리, 요청 제한기 예약 정산 등)
+    if token.cancelled or token.expired:
+        future = Future()
+        future.cancel()
+    else:
+        future = _executor.submit(call)
+    try:
+        token.check()
+        while not wait([future], timeout=POLL_INTERVAL).done:
+            token.check()
+    except CallCancelled:
+        future.cancel()
+        if on_abandoned is not None:
+            future.add_done_callback(on_abandoned)
+        raise
+    return future.result()
+
+
+_END = object()
+
+
+def iterate_cancellable(iterable, token, close=None):
+    # iterable 을 호출 스레드 풀에서 읽어 넘겨준다. 다음 조각을 기다리는 중에도 취소/마감이면 바로 풀려나고,
+    # 소비자가 그만두면 읽는 쪽은 다음 조각에서 멈춘 뒤 close() 한다
+    reader = token.child()
+    items = queue.Queue()
+
+    def read():
+        try:
+            for item in iterable:
+                if reader.cancelled:
+                    return
+                items.put((item, None))
+            items.put((_END, None))
+        except Exception as e:
+            items.put((_END, e))
+        finally:
+            if close is not None:
+                close()
+
+    _executor.submit(read)
+    try:
+        while True:
+            token.check()
+            try:
+                item, error = items.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                continue
+            if error is not None:
+                raise error
+            if item is _END:
+                return
+            yield item
+    finally:
+        reader.cancel()
@@ -0,0 +1,109 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from .cancel import CallCancelled, CancelToken
+from .tasks import get_task
+from .tools import STYLES, rewrite_text
+from .usage import estimate_cost, response_cost
+
+# 스타일 후보 동시 생성
+# 기자가 스타일을 하나씩 바꿔 가며 기다리지 않도록 모든 스타일 (이모티콘 사용/미사용) 을 한꺼번에 스트리밍한다.
+# 동시 실행 수와 예상 최대 비용 (입력 + maxTokens 기준) 으로 후보 수를 제한하고,
+# 하나를 고르면 아직 생성 중이거나 시작하지 않은 나머지는 취소한다.
+CANDIDATE_CONCURRENCY = int(os.environ.get("REWRITE_CANDIDATE_CONCURRENCY", "4"))
+CANDIDATE_BUDGET_USD = float(os.environ.get("REWRITE_CANDIDATE_BUDGET_USD", "0.5"))
+
+
+@dataclass
+class Candidate:
+    style: str
+    use_emoji: bool
+    text: str = ""
+    done: bool = False
+    cancelled: bool = False
+    error: object = None
+    stream: object = None  # TextStream (지연 시간 / 사용량 확인용)
+
+    @property
+    def label(self):
+        return f"{self.style} + 이모티콘" if self.use_emoji else self.style
+
+
+def worst_case_cost(text, model_id=None):
+    # 입력은 대략 2자당 1토큰, 출력은 maxTokens 를 다 쓴다고 본다
+    task = get_task("rewrite")
+    return estimate_cost(model_id or task.model_id, len(text) // 2 + 200, task.inference_config["maxTokens"])
+
+
+class RewriteCandidates:
+
+    def __init__(self, text, styles=None, emoji_variants=(False, True), image_b64=None,
+                 concurrency=CANDIDATE_CONCURRENCY, budget_usd=CANDIDATE_BUDGET_USD, **options):
+        self.text = text
+        self.image_b64 = image_b64
+        self.options = options
+        self.concurrency = max(1, concurrency)
+        variants = [(style, emoji) for emoji in emoji_variants for style in (styles or STYLES)]
+        # 예산 안에서 최소 한 개는 만든다
+        self.cost_per_candidate = worst_case_cost(text, options.get("model_id"))
+        limit = max(1, int(budget_usd // self.cost_per_candidate)) if self.cost_per_candidate else len(variants)
+        self.candidates = [Candidate(style, emoji) for style, emoji in variants[:limit]]
+        self.skipped = len(variants) - len(self.candidates)
+        self.picked = None
+        self._cancel = CancelToken()
+        self._executor = None
+        self._futures = []
+
+    @property
+    def max_cost(self):
+        return self.cost_per_candidate * len(self.candidates)
+
+    @property
+    def finished(self):
+        return all(c.done for c in self.candidates)
+
+    def spent(self):
+        # 지금까지 끝난 후보들의 실제 비용
+        total = 0.0
+        for c in self.candidates:
+            response = c.stream.response if c.stream else None
+            if response and not response.cached:
+                total += response_cost(response)
+        return total
+
+    def start(self):
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="candidate")
+        self._futures = [self._executor.submit(self._run, c) for c in self.candidates]
+        self._executor.shutdown(wait=False)
+        return self
+
+    def _run(self, candidate):
+        if self._cancel.cancelled:
+            candidate.cancelled = candidate.done = True
+            return
+        try:
+            candidate.stream = rewrite_text(self.text, candidate.style, candidate.use_emoji, self.image_b64,
+                                            stream=True, cancel_token=self._cancel, **self.options)
+            for chunk in candidate.stream:
+                candidate.text += chunk
+        except Exception as e:
+            # 고르기로 취소된 것만 취소로 보고, 제한 시간 초과는 오류로 보여준다
+            if isinstance(e, CallCancelled) and self._cancel.cancelled:
+                candidate.cancelled = True
+            else:
+                candidate.error = e
+        finally:
+            candidate.done = True
+
+    def pick(self, index):
+        self.picked = self.candidates[index]
+        self.cancel()
+        return self.picked.text
+
+    def cancel(self):
+        # 시작하지 않은 후보는 대기열에서 빼고, 대기 중이거나 생성 중인 후보는 바로 멈춘다 (연결도 닫힌다)
+        self._cancel.cancel()
+        for future, candidate in zip(self._futures, self.candidates):
+            if future.cancel():
+                candidate.cancelled = candidate.done = True
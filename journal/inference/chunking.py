@@ -0,0 +1,204 @@
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .tools import run_task, tracks_article
+
+# 긴 문서 분할 처리: 문단/문장 경계에서 나눠 조각별로 동시에 모델을 호출하고 결과를 합친다.
+# 조각 수만큼 병렬로 처리하므로 문서가 길어져도 지연 시간은 거의 한 조각 분량으로 유지된다.
+LONG_DOCUMENT_CHARS = int(os.environ.get("LONG_DOCUMENT_CHARS", "3000"))
+CHUNK_CHARS = int(os.environ.get("CHUNK_CHARS", "1500"))
+CHUNK_CONCURRENCY = int(os.environ.get("CHUNK_CONCURRENCY", "8"))
+
+# 문단: 줄바꿈까지 포함해서 자른다 (조각을 이어 붙이면 원문과 정확히 같아야 한다)
+PARAGRAPH = re.compile(r"[^\n]*\n*")
+# 문장: 마침표/물음표/느낌표/말줄임표 (+ 닫는 따옴표·괄호) 뒤 공백까지. "3.5%" 같은 소수점은 자르지 않는다
+SENTENCE = re.compile(r".*?(?:[.!?…。]+[\"'”’)\]」』]*\s+|$)", re.S)
+
+
+def split_paragraphs(text):
+    return [p for p in PARAGRAPH.findall(text) if p]
+
+
+def split_sentences(text):
+    return [s for s in SENTENCE.findall(text) if s]
+
+
+def _pieces(text, max_chars):
+    for paragraph in split_paragraphs(text):
+        if len(paragraph) <= max_chars:
+            yield paragraph
+            continue
+        for sentence in split_sentences(paragraph):
+            # 한 문장이 조각 크기보다 길면 어쩔 수 없이 글자 수로 자른다
+            for i in range(0, len(sentence), max_chars):
+                yield sentence[i:i + max_chars]
+
+
+def chunk_text(text, max_chars=CHUNK_CHARS):
+    # 문단 (필요하면 문장) 단위로 max_chars 이하의 조각을 만든다. "".join(조각) == text
+    chunks, current = [], ""
+    for piece in _pieces(text, max_chars):
+        if current and len(current) + len(piece) > max_chars:
+            chunks.append(current)
+            current = ""
+        current += piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def is_long_document(text):
+    return len(text) > LONG_DOCUMENT_CHARS
+
+
+def map_chunks(task, prompts, on_progress=None, **options):
+    # 조각별 프롬프트를 동시에 실행하고 원래 순서대로 (결과, 오류) 를 돌려준다.
+    # 일부 조각이 실패해도 나머지 결과는 살린다.
+    results = [(None, None)] * len(prompts)
+    with ThreadPoolExecutor(max_workers=min(CHUNK_CONCURRENCY, len(prompts)) or 1,
+                            thread_name_prefix="chunk") as executor:
+        futures = {executor.submit(run_task, task, prompt, **options): i for i, prompt in enumerate(prompts)}
+        for done, future in enumerate(as_completed(futures), 1):
+            try:
+                results[futures[future]] = (future.result(), None)
+            except Exception as e:
+                results[futures[future]] = (None, e)
+            if on_progress:
+                on_progress(done, len(prompts))
+    return results
+
+
+def split_whitespace(chunk):
+    # 조각의 앞뒤 공백/줄바꿈은 모델에 보내지 않고 다시 붙일 때 그대로 복원한다
+    body = chunk.strip()
+    if not body:
+        return chunk, "", ""
+    start = chunk.index(body)
+    return chunk[:start], body, chunk[start + len(body):]
+
+
+GRAMMAR_CHUNK_PROMPT = """
+    다음은 긴 기사의 일부입니다. 이 부분의 맞춤법과 문법을 검사해주세요:
+    
+    [원문]
+    {text}
+    
+    [응답 형식]
+    [수정 사항]
+    - (오류) → (수정안): (이유)
+    
+    [수정된 텍스트]
+    (수정사항이 반영된 이 부분의 전체 텍스트만, 다른 설명 없이)
+    """
+
+
+def parse_grammar_chunk(result, original):
+    if not result or "[수정된 텍스트]" not in result:
+        return [], original
+    corrections, corrected = result.split("[수정된 텍스트]", 1)
+    corrections = corrections.replace("[수정 사항]", "")
+    items = [line.strip() for line in corrections.splitlines() if line.strip().startswith("-")]
+    return items, corrected.strip() or original
+
+
+@tracks_article
+def check_grammar_long(text, on_progress=None, **options):
+    # 조각별 교정 결과를 원래 순서대로 이어 붙여 전체 수정본을 만든다
+    parts = [split_whitespace(chunk) for chunk in chunk_text(text)]
+    prompts = [GRAMMAR_CHUNK_PROMPT.format(text=body) for _, body, _ in parts if body]
+    results = iter(map_chunks("grammar", prompts, on_progress, **options))
+
+    corrections, corrected = [], []
+    for index, (leading, body, trailing) in enumerate(parts, 1):
+        if not body:
+            corrected.append(leading)
+            continue
+        result, error = next(results)
+        if error is not None:
+            corrections.append(f"- 조각 {index} 검사 실패 (원문 유지): {str(error)}")
+        items, fixed = parse_grammar_chunk(result, body)
+        corrections.extend(f"{item} (조각 {index})" for item in items)
+        corrected.append(leading + fixed + trailing)
+
+    return format_grammar_report(corrections, "".join(corrected))
+
+
+def format_grammar_report(corrections, corrected_text):
+    lines = ["1. 맞춤법 및 문법 수정 사항:"]
+    lines += corrections or ["- 수정할 부분이 없습니다."]
+    lines += ["", "2. 수정된 전체 텍스트:", corrected_text]
+    return "\n".join(lines)
+
+
+FACT_CHECK_CHUNK_PROMPT = """
+    다음은 긴 기사의 일부입니다. 이 부분에 나오는 사실 관계를 검증하고 신뢰할 수 있는 정보와 검증이 필요한 정보를 구분해주세요:
+    
+    {text}
+    
+    [응답 형식]
+    [신뢰할 수 있는 정보]
+    - (정보)
+    
+    [검증이 필요한 정보]
+    - (정보): (검증 필요 이유)
+    """
+
+
+def _parse_fact_chunk(result):
+    reliable, unverified, current = [], [], None
+    for line in (result or "").splitlines():
+        line = line.strip()
+        if "신뢰할 수 있는 정보" in line:
+            current = reliable
+        elif "검증이 필요한 정보" in line:
+            current = unverified
+        elif line.startswith("-") and current is not None:
+            current.append(line.lstrip("- ").strip())
+    return reliable, unverified
+
+
+def _claim_key(item):
+    # "(정보): (이유)" 에서 정보 부분만, 검증 색인과 같은 방식으로 정규화해서 비교한다 (숫자가 다르면 다른 주장)
+    from .claims import normalize_claim
+
+    claim = item.split(":", 1)[0]
+    return normalize_claim(claim) if re.search(r"\w", claim) else ""
+
+
+def dedupe_claims(items):
+    # 여러 조각에서 같은 주장이 반복되면 한 번만 남긴다 (정규화한 형태가 똑같을 때만 같은 주장으로 본다)
+    kept, keys = [], set()
+    for item in items:
+        key = _claim_key(item)
+        if not key or key in keys:
+            continue
+        kept.append(item)
+        keys.add(key)
+    return kept
+
+
+@tracks_article
+def check_facts_long(text, on_progress=None, **options):
+    prompts = [FACT_CHECK_CHUNK_PROMPT.format(text=chunk.strip())
+               for chunk in chunk_text(text) if chunk.strip()]
+    reliable, unverified, failed = [], [], []
+    for index, (result, error) in enumerate(map_chunks("fact_check", prompts, on_progress, **options), 1):
+        if error is not None:
+            failed.append(f"- 조각 {index} 검증 실패: {str(error)}")
+        chunk_reliable, chunk_unverified = _parse_fact_chunk(result)
+        reliable.extend(chunk_reliable)
+        unverified.extend(chunk_unverified)
+
+    unverified = dedupe_claims(unverified)
+    # 검증이 필요한 정보로 분류된 주장은 신뢰할 수 있는 정보에서 뺀다
+    unverified_keys = {_claim_key(item) for item in unverified}
+    reliable = [item for item in dedupe_claims(reliable) if _claim_key(item) not in unverified_keys]
+
+    lines = ["1. 신뢰할 수 있는 정보:"]
+    lines += [f"- {item}" for item in reliable] or ["- 없음"]
+    lines += ["", "2. 검증이 필요한 정보:"]
+    lines += [f"- {item}" for item in unverified] or ["- 없음"]
+    if failed:
+        lines += ["", "3. 처리하지 못한 부분:"] + failed
+    return "\n".join(lines)
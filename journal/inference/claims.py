@@ -0,0 +1,209 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from .chunking import split_paragraphs, split_sentences
+from .structured import VERDICTS, Claim, FactCheckResult, load_json, objects, parse_claim, tool_config
+from .tools import run_task, tracks_article
+
+# 검증된 주장 색인 (로컬 SQLite)
+# 기사마다 반복되는 문장 (직함, 통계, 날짜 등) 의 판정을 기억해 두고, 다시 나오면 모델을 부르지 않고 바로 답한다.
+# 문장 단위로 색인하며, 공백/문장부호만 다른 같은 문장일 때만 판정을 다시 쓴다.
+# 비슷한 문장은 쓰지 않는다: 사람 이름, 기관 (보건복지부/기획재정부), 서술어 (발표했다/부인했다) 하나만 달라도
+# 판정이 뒤집히는데 글자 유사도로는 구분할 수 없다.
+# CLAIM_INDEX_PATH 를 빈 문자열로 두면 디스크에 남기지 않는다
+CLAIM_INDEX_PATH = os.environ.get(
+    "CLAIM_INDEX_PATH", os.path.join(os.path.expanduser("~"), ".journal", "claims.sqlite3")
+)
+# 직함, 통계는 바뀌므로 오래된 판정은 다시 검증한다
+CLAIM_INDEX_TTL = float(os.environ.get("CLAIM_INDEX_TTL", 7 * 86400))  # 판정 유효 기간 (초)
+
+NUMBER = re.compile(r"[-−]?\d+(?:[.,]\d+)*")
+
+
+def normalize_claim(sentence):
+    # 공백/문장부호 차이는 무시한다. 문장부호를 지우면 3.5 와 35 가 같아지므로 숫자는 따로 붙인다
+    text = re.sub(r"[^\w%]+", "", sentence).lower()
+    return f"{text}|{','.join(numbers(sentence))}"
+
+
+def numbers(sentence):
+    # 나온 순서대로 (천 단위 쉼표는 없애고 소수점과 부호는 남긴다)
+    return [n.replace(",", "").replace("−", "-") for n in NUMBER.findall(sentence)]
+
+
+def is_checkable(sentence):
+    # 검증할 내용이 거의 없는 짧은 문장 (제목 조각, 인사말 등) 은 건너뛴다
+    return len(re.sub(r"[^\w%]+", "", sentence)) >= 8
+
+
+def extract_sentences(text):
+    sentences = []
+    for paragraph in split_paragraphs(text):
+        for sentence in split_sentences(paragraph):
+            sentence = sentence.strip()
+            if is_checkable(sentence) and sentence not in sentences:
+                sentences.append(sentence)
+    return sentences
+
+
+class ClaimIndex:
+    def __init__(self, db_path=CLAIM_INDEX_PATH, ttl=CLAIM_INDEX_TTL):
+        if db_path and db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.db_path = db_path or ":memory:"
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        if self.db_path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS claims ("
+            "id INTEGER PRIMARY KEY, normalized TEXT UNIQUE NOT NULL, sentence TEXT NOT NULL, "
+            "claims TEXT NOT NULL, updated_at REAL NOT NULL, hits INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._db.execute("DELETE FROM claims WHERE updated_at < ?", (time.time() - ttl,))
+        self._db.commit()
+
+    def lookup(self, sentence):
+        # 색인에 있으면 Claim 목록, 없으면 None
+        key = normalize_claim(sentence)
+        since = time.time() - self.ttl
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, claims FROM claims WHERE normalized = ? AND updated_at >= ?", (key, since)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._db.execute("UPDATE claims SET hits = hits + 1 WHERE id = ?", (row[0],))
+            self._db.commit()
+        return [Claim(**claim, source="색인") for claim in json.loads(row[1])]
+
+    def add(self, sentence, claims):
+        key = normalize_claim(sentence)
+        payload = json.dumps(
+            [{"claim": c.claim, "verdict": c.verdict, "reason": c.reason, "confidence": c.confidence}
+             for c in claims],
+            ensure_ascii=False,
+        )
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO claims (normalized, sentence, claims, updated_at) VALUES (?, ?, ?, ?)",
+                (key, sentence, payload, time.time()),
+            )
+            self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM claims")
+            self._db.commit()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM claims").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": entries,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_claim_index():
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = ClaimIndex()
+    return _index
+
+
+INDEXED_FACT_CHECK_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "claims": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "sentence": {"type": "integer", "description": "주장이 나온 문장 번호"},
+                    "claim": {"type": "string", "description": "문장에 나온 주장 (짧게)"},
+                    "verdict": {"type": "string", "enum": VERDICTS},
+                    "reason": {"type": "string", "description": "판정 근거 또는 검증이 필요한 이유 (한 문장)"},
+                    "confidence": {"type": "number", "minimum": 0, "maximum": 1},
+                },
+                "required": ["sentence", "claim", "verdict"],
+            },
+        },
+    },
+    "required": ["claims"],
+}
+
+
+def parse_indexed_claims(text, count):
+    # 문장 번호별 Claim 목록. 번호가 없거나 범위를 벗어난 주장은 버린다
+    by_sentence = {i: [] for i in range(1, count + 1)}
+    for item in objects(load_json(text), "claims"):
+        try:
+            number = int(item.get("sentence"))
+        except (TypeError, ValueError):
+            continue
+        claim = parse_claim(item)
+        if number in by_sentence and claim:
+            by_sentence[number].append(claim)
+    return by_sentence
+
+
+@tracks_article
+def check_facts_indexed(text, image_b64=None, on_error=None, index=None, **options):
+    # 문장별로 색인을 먼저 찾고, 처음 보는 문장만 모아 한 번에 모델에 보낸다
+    index = index or get_claim_index()
+    sentences = extract_sentences(text)
+    known, novel = {}, []
+    for sentence in sentences:
+        claims = index.lookup(sentence)
+        if claims is None:
+            novel.append(sentence)
+        else:
+            known[sentence] = claims
+
+    if novel:
+        numbered = "\n".join(f"{i}. {sentence}" for i, sentence in enumerate(novel, 1))
+        prompt = f"""
+        다음은 기사에서 뽑은 문장들입니다. 문장마다 나오는 주장의 사실 관계를 검증해 판정해주세요.
+        검증할 주장이 없는 문장은 건너뛰고, 결과는 submit_fact_check 도구로 문장 번호와 함께 제출하세요.
+
+        {numbered}
+        """
+        config = tool_config("submit_fact_check", "문장별 사실 검증 결과를 제출한다", INDEXED_FACT_CHECK_SCHEMA)
+        try:
+            by_sentence = parse_indexed_claims(
+                run_task("fact_check", prompt, image_b64, tool_config=config, **options), len(novel)
+            )
+        except Exception as e:
+            if on_error is None:
+                raise
+            on_error(e)
+            return None
+        for number, sentence in enumerate(novel, 1):
+            # 주장이 없다고 판정된 문장도 기억해 두어야 다음에 다시 묻지 않는다
+            # (이미지가 함께 온 경우에는 이미지에 따라 판정이 달라질 수 있어 색인하지 않는다)
+            if not image_b64:
+                index.add(sentence, by_sentence[number])
+            known[sentence] = by_sentence[number]
+
+    claims = [claim for sentence in sentences for claim in known[sentence]]
+    return FactCheckResult(claims=claims, sentences=len(sentences), from_index=len(sentences) - len(novel))
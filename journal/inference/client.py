@@ -0,0 +1,70 @@
+import os
+import threading
+
+import boto3
+from botocore.config import Config
+
+DEFAULT_REGION = os.environ.get("BEDROCK_REGION", "us-east-1")
+DEFAULT_ENDPOINT_URL = os.environ.get("BEDROCK_ENDPOINT_URL") or None
+# live | record | replay | synthetic (backends.py). live 가 아니면 boto3 대신 같은 인터페이스의 백엔드를 돌려준다
+BEDROCK_BACKEND = os.environ.get("BEDROCK_BACKEND", "live")
+
+# 연결 풀 / keep-alive / 재시도 설정
+# Streamlit 세션이 여러 개여도 프로세스당 하나의 클라이언트를 공유하므로
+# 풀 크기는 동시 사용자 수에 맞춰 넉넉하게 잡는다.
+CLIENT_CONFIG = {
+    "max_pool_connections": int(os.environ.get("BEDROCK_MAX_POOL_CONNECTIONS", "50")),
+    "connect_timeout": 5,
+    "read_timeout": int(os.environ.get("BEDROCK_READ_TIMEOUT", "120")),
+    "tcp_keepalive": True,
+    # 스로틀링 재시도는 inference.ratelimit 가 백오프와 공정 대기열로 처리하므로
+    # botocore 재시도는 일시적인 연결 오류용으로 최소한만 둔다
+    "retries": {
+        "mode": "standard",
+        "max_attempts": int(os.environ.get("BEDROCK_MAX_ATTEMPTS", "2")),
+    },
+}
+
+_clients = {}
+_lock = threading.Lock()
+
+
+def build_bedrock_client(region_name=None, endpoint_url=None, **config_overrides):
+    # 매번 새 클라이언트를 만든다 (벤치마크/테스트용). 앱에서는 get_bedrock_client 사용
+    config = Config(**{**CLIENT_CONFIG, **config_overrides})
+    # 기본 세션은 스레드 안전하지 않으므로 별도 세션에서 생성
+    session = boto3.session.Session()
+    return session.client(
+        service_name="bedrock-runtime",
+        region_name=region_name or DEFAULT_REGION,
+        endpoint_url=endpoint_url or DEFAULT_ENDPOINT_URL,
+        config=config,
+    )
+
+
+def get_bedrock_client(region_name=None, endpoint_url=None, read_timeout=None):
+    # converse / converse_stream 을 제공하는 클라이언트. 기본은 실제 Bedrock (get_live_client)
+    if BEDROCK_BACKEND != "live":
+        from .backends import get_backend
+
+        return get_backend(BEDROCK_BACKEND, region_name, endpoint_url, read_timeout)
+    return get_live_client(region_name, endpoint_url, read_timeout)
+
+
+def get_live_client(region_name=None, endpoint_url=None, read_timeout=None):
+    # 프로세스 전역 캐시: 모듈은 한 번만 import 되므로 Streamlit rerun/세션 간에 공유된다.
+    # boto3 클라이언트는 스레드 안전하므로 여러 스크립트 스레드에서 같이 써도 된다.
+    # read_timeout 을 주면 그 시간 안에 응답이 없을 때 재시도 없이 바로 실패하는 클라이언트를 따로 둔다
+    # (더 작은 모델로 넘어갈 수 있는 호출용).
+    key = (region_name or DEFAULT_REGION, endpoint_url or DEFAULT_ENDPOINT_URL, read_timeout)
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                overrides = {}
+                if read_timeout:
+                    overrides = {"read_timeout": read_timeout, "retries": {"mode": "standard", "total_max_attempts": 1}}
+                client = build_bedrock_client(key[0], key[1], **overrides)
+                _clients[key] = client
+    return client
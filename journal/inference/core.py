@@ -0,0 +1,204 @@
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+
+from .cache import cache_key, get_response_cache
+from .cancel import CancelToken
+from .images import IMAGE_FORMAT
+from .client import get_bedrock_client
+from .metrics import record_latency
+from .models import FALLBACK_AFTER_THROTTLES, cache_min_tokens, fallback_model_id, fallback_request
+from .ratelimit import call_with_rate_limit, get_rate_limiter
+from .singleflight import SINGLE_FLIGHT_ENABLED, flight_key, get_single_flight
+from .usage import record_usage
+from .tasks import get_task
+
+logger = logging.getLogger(__name__)
+
+CACHE_POINT = {"cachePoint": {"type": "default"}}
+
+
+@dataclass
+class InferenceRequest:
+    task: str
+    prompt: str
+    prefix: str = None  # prompt 앞에 붙는 바뀌지 않는 부분 (원문 등), 프롬프트 캐시 대상
+    image_bytes: bytes = None
+    image_format: str = IMAGE_FORMAT
+    model_id: str = None  # None 이면 작업 기본 모델
+    system_prompt: str = None  # None 이면 작업 기본 시스템 프롬프트
+    inference_config: dict = None  # 작업 기본 설정에 덮어쓸 값
+    use_cache: bool = None  # None 이면 작업 기본값
+    session_id: str = None  # 요청 제한기의 공정 대기열 단위
+    on_queue: object = None  # 대기열 위치 알림 콜백 (position, 예상 대기 초)
+    article_id: str = None  # 사용량 집계용 기사 키
+    tool_config: dict = None  # 구조화 출력용 Bedrock toolConfig
+    allow_fallback: bool = True  # 스로틀링/시간 초과 시 더 작은 모델로 넘어갈지
+    cancel_token: object = None  # CancelToken (화면 rerun, 후보 고르기 등으로 취소)
+
+    @property
+    def resolved_model_id(self):
+        return self.model_id or get_task(self.task).model_id
+
+    @property
+    def cacheable(self):
+        if self.use_cache is not None:
+            return self.use_cache
+        return get_task(self.task).use_cache
+
+    def call_options(self):
+        # 작은 모델로 넘어갈 수 있으면 기본 모델은 작업 제한 시간의 절반까지만 기다리고 (나머지는 작은 모델 몫)
+        # 스로틀링도 몇 번만 재시도한다
+        if self.allow_fallback and fallback_model_id(self.resolved_model_id):
+            return get_task(self.task).timeout / 2, FALLBACK_AFTER_THROTTLES
+        return None, None
+
+    def deadline(self):
+        # 작업별 제한 시간 (작은 모델로 넘어가는 것까지 포함) 과 호출자의 취소 신호를 함께 따르는 토큰
+        return CancelToken(get_task(self.task).timeout, parent=self.cancel_token)
+
+    def to_converse(self):
+        task = get_task(self.task)
+        model_id = self.resolved_model_id
+        system_prompt = self.system_prompt or task.system_prompt
+        # 프롬프트 캐시: 시스템 프롬프트 -> prefix 순서로 바뀌지 않는 부분을 앞에 두고, 누적 길이가 모델의 최소 토큰 수를
+        # 넘는 지점에만 캐시 지점을 둔다 (그보다 짧은 앞부분은 캐시되지 않는다). 토큰 수는 2자당 1토큰으로 어림한다
+        min_tokens = cache_min_tokens(model_id)
+        cached_chars = len(system_prompt)
+        system = [{"text": system_prompt}]
+        if min_tokens and cached_chars // 2 >= min_tokens:
+            system.append(CACHE_POINT)
+        content = []
+        if self.prefix:
+            content.append({"text": self.prefix})
+            cached_chars += len(self.prefix)
+            if min_tokens and cached_chars // 2 >= min_tokens:
+                content.append(CACHE_POINT)
+        # 기본 텍스트 콘텐츠
+        content.append({"text": self.prompt})
+        # 이미지가 있는 경우 추가
+        if self.image_bytes:
+            content.append({
+                "image": {
+                    "format": self.image_format,
+                    "source": {"bytes": self.image_bytes},
+                }
+            })
+        converse_request = {
+            "modelId": model_id,
+            "system": system,
+            "messages": [{"role": "user", "content": content}],
+            "inferenceConfig": {**task.inference_config, **(self.inference_config or {})},
+        }
+        if self.tool_config:
+            converse_request["toolConfig"] = self.tool_config
+        return converse_request
+
+
+@dataclass
+class InferenceResponse:
+    text: str
+    model_id: str
+    task: str = None
+    usage: dict = field(default_factory=dict)
+    latency_ms: float = None
+    stop_reason: str = None
+    cached: bool = False
+    fallback_from: str = None  # 작은 모델로 넘어간 경우 원래 모델
+    shared: bool = False  # 진행 중인 같은 호출의 결과를 함께 받은 경우 (cached 도 True)
+
+
+def extract_text(response):
+    # converse 응답: output.message.content 의 text 블록들을 이어 붙인다
+    # 도구 호출 (구조화 출력) 응답이면 도구 입력을 JSON 문자열로 돌려준다
+    content = response["output"]["message"]["content"]
+    for block in content:
+        if "toolUse" in block:
+            return json.dumps(block["toolUse"].get("input") or {}, ensure_ascii=False)
+    return "".join(block["text"] for block in content if "text" in block)
+
+
+def invoke(request, client=None, token=None):
+    # 작업 제한 시간이 지나거나 취소되면 CallCancelled (DeadlineExceeded) 를 올린다
+    token = token or request.deadline()
+    try:
+        return _invoke(request, client, token)
+    except Exception as e:
+        fallback = fallback_request(request, e)
+        if fallback is None:
+            raise
+        logger.warning("%s 호출 실패, %s 로 전환: %s", request.resolved_model_id, fallback.model_id, e)
+    response = invoke(fallback, client, token)
+    # 여러 단계를 넘어가도 처음 요청한 모델을 남긴다 (바깥 호출이 마지막에 덮어쓴다)
+    response.fallback_from = request.resolved_model_id
+    return response
+
+
+def _invoke(request, client=None, token=None):
+    converse_request = request.to_converse()
+    model_id = converse_request["modelId"]
+
+    # 동일한 요청의 응답이 캐시에 있으면 모델을 호출하지 않는다
+    key = cache_key(converse_request) if request.cacheable else None
+    if key:
+        cached = get_response_cache().get(key)
+        if cached is not None:
+            response = InferenceResponse(text=cached, model_id=model_id, task=request.task, cached=True)
+            record_usage(request, response, ttft_ms=0.0, total_ms=0.0)
+            return response
+
+    if key and SINGLE_FLIGHT_ENABLED:
+        # 같은 요청이 진행 중이면 그 호출의 결과를 함께 받는다
+        start = time.perf_counter()
+        response = get_single_flight().call(
+            flight_key(converse_request),
+            lambda flight_token, on_queue: _converse_chunks(request, converse_request, client, key, flight_token, on_queue),
+            get_task(request.task).timeout, token, request.on_queue,
+        )
+        if response.shared:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            record_usage(request, response, ttft_ms=elapsed_ms, total_ms=elapsed_ms)
+        return response
+    return _converse(request, converse_request, client, key, token, request.on_queue)
+
+
+def _converse(request, converse_request, client, key, token, on_queue):
+    model_id = converse_request["modelId"]
+    read_timeout, max_attempts = request.call_options()
+    client = client or get_bedrock_client(read_timeout=read_timeout)
+    start = time.perf_counter()
+    response, ticket = call_with_rate_limit(
+        lambda: client.converse(**converse_request),
+        converse_request,
+        session_id=request.session_id,
+        on_queue=on_queue,
+        max_attempts=max_attempts,
+        cancel_token=token,
+    )
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    get_rate_limiter().release(ticket, (response.get("usage") or {}).get("totalTokens"))
+
+    text = extract_text(response)
+    # 비스트리밍 호출은 전체 응답 시간이 곧 첫 토큰 시간이다
+    record_latency(model_id, elapsed_ms, elapsed_ms, streamed=False, task=request.task)
+    if key:
+        get_response_cache().set(key, text)
+    result = InferenceResponse(
+        text=text,
+        model_id=model_id,
+        task=request.task,
+        usage=response.get("usage") or {},
+        latency_ms=response.get("metrics", {}).get("latencyMs", elapsed_ms),
+        stop_reason=response.get("stopReason"),
+    )
+    record_usage(request, result, ttft_ms=elapsed_ms, total_ms=elapsed_ms)
+    return result
+
+
+def _converse_chunks(request, converse_request, client, key, token, on_queue):
+    # 합치기용 생산자: 비스트리밍 응답을 조각 하나로 내보낸다 (스트리밍 요청도 합류할 수 있게)
+    response = _converse(request, converse_request, client, key, token, on_queue)
+    if response.text:
+        yield response.text
+    return response
@@ -0,0 +1,226 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from .keywords import sentences_of, tokenize
+
+# 기사 속 수치 추출 / 계산 (모델 호출 없음)
+# 숫자, 퍼센트, 금액, 한국어 단위 (만/억/조, "3조 5천억원") 와 날짜를 문장별로 찾아 DataFrame 으로 만들고,
+# 변화율 / 순위 / 비중 / 이상치를 벡터 연산으로 계산한다.
+# 비중은 기사가 합계를 밝히거나 ("전체 예산 100억원 가운데", "모두 180명") 값들이 한 합계를 나눈다고 쓸 때만 낸다.
+# 데이터 분석은 원문 대신 이 표만 모델에 넘겨서, 모델은 계산하지 않고 해석과 서술만 한다.
+OUTLIER_Z = 3.5  # 수정 z 점수 (중앙값/MAD 기준) 가 이보다 크면 이상치
+OUTLIER_MIN_VALUES = 4  # 같은 단위의 값이 이보다 적으면 이상치를 판단하지 않는다
+
+MULTIPLIERS = {"십": 1e1, "백": 1e2, "천": 1e3, "만": 1e4, "억": 1e8, "조": 1e12}
+CURRENCIES = ("원", "달러", "엔", "위안", "유로", "파운드")
+UNITS = CURRENCIES + ("%p", "%", "퍼센트포인트", "퍼센트", "포인트", "명", "건", "개", "대", "가구", "배", "곳",
+                      "톤", "kg", "km", "㎡", "평", "회", "채", "세", "시간", "분", "초", "년간", "개월")
+UNIT_ALIASES = {"퍼센트": "%", "퍼센트포인트": "%p", "포인트": "%p"}
+
+DATE = re.compile(
+    r"(?P<year>\d{4})\s?년(?:\s?(?P<month>\d{1,2})\s?월)?(?:\s?(?P<day>\d{1,2})\s?일)?"
+    r"|(?P<iso>\d{4})[.-](?P<iso_month>\d{1,2})(?:[.-](?P<iso_day>\d{1,2}))?"
+    r"|(?P<quarter>[1-4])\s?분기"
+    r"|(?P<only_month>\d{1,2})\s?월(?:\s?(?P<only_day>\d{1,2})\s?일)?"
+    r"|(?P<only_day2>\d{1,2})\s?일(?![간째])"
+)
+PART = re.compile(r"(?P<sign>[-−△▽▼]?)(?P<number>\d+(?:,\d{3})*(?:\.\d+)?)\s?(?P<multiplier>[십백천만억조]*)")
+UNIT = re.compile(r"\s?(?P<unit>" + "|".join(sorted(map(re.escape, UNITS), key=len, reverse=True)) + ")")
+TOTAL_WORD = re.compile(r"합계|전체|총액|총계|모두|합쳐|(?<![가-힣])총(?![가-힣])")  # 바로 뒤의 값이 합계
+PART_OF = re.compile(r"\s*(?:가운데|중)(?![가-힣])")  # "100억원 가운데 교육 40억원": 앞의 값이 합계
+SHARE_WORD = re.compile(TOTAL_WORD.pattern + r"|가운데|중에서|비중|나눠|나뉜")
+
+
+def _part_value(match):
+    # 기사 표에서 △ / ▽ 는 감소 (음수) 를 뜻한다
+    value = float(match.group("number").replace(",", ""))
+    if match.group("sign"):
+        value = -value
+    scale = 1.0
+    for char in match.group("multiplier"):
+        scale *= MULTIPLIERS[char]
+    return value * scale, scale
+
+
+def _amounts(sentence, taken):
+    # (시작, 끝, 값, 단위, "에서" 가 붙었는지) 목록. "3조 5천억원" 처럼 큰 단위에서 작은 단위로 이어지는 조각은 하나로 합친다
+    amounts = []
+    for match in PART.finditer(sentence):
+        if any(start <= match.start() < end for start, end in taken):
+            continue
+        value, scale = _part_value(match)
+        previous = amounts[-1] if amounts else None
+        if (previous and previous[4] > scale and previous[4] > 1 and not previous[3]
+                and not sentence[previous[1]:match.start()].strip()):
+            amounts[-1] = [previous[0], match.end(), previous[2] + value, "", scale]
+        else:
+            amounts.append([match.start(), match.end(), value, "", scale])
+        unit = UNIT.match(sentence, match.end())
+        if unit:
+            amounts[-1][1] = unit.end()
+            amounts[-1][3] = UNIT_ALIASES.get(unit.group("unit"), unit.group("unit"))
+    return [(start, end, value, unit, sentence[end:].lstrip().startswith("에서"))
+            for start, end, value, unit, _ in amounts]
+
+
+def _kind(unit):
+    if unit == "%":
+        return "비율"
+    if unit == "%p":
+        return "비율 변화"
+    if unit in CURRENCIES:
+        return "금액"
+    return "수량" if unit else "수치"
+
+
+def _period(match):
+    if match.group("year"):
+        return "-".join(filter(None, (match.group("year"), match.group("month") and match.group("month").zfill(2))))
+    if match.group("iso"):
+        return f"{match.group('iso')}-{match.group('iso_month').zfill(2)}"
+    if match.group("quarter"):
+        return f"{match.group('quarter')}분기"
+    return None
+
+
+def _periods(dates, amounts):
+    # 값마다 기간을 정한다. 기간이 하나뿐이면 모든 값에, 여럿이면
+    # "2023년과 2024년 각각 3조원, 4조원" 처럼 기간이 모두 앞에 나오고 값과 개수가 같으면 차례로 짝짓고,
+    # 아니면 값 바로 앞에 나온 기간 ("2023년 3조원, 2024년 4조원") 을 쓴다
+    dated = [(match.end(), _period(match)) for match in dates if _period(match)]
+    if len({period for _, period in dated}) == 1:
+        return [dated[0][1]] * len(amounts)
+    if dated and len(dated) == len(amounts) and dated[-1][0] <= amounts[0][0]:
+        return [period for _, period in dated]
+    periods = []
+    for start, *_ in amounts:
+        before = [period for end, period in dated if end <= start]
+        periods.append(before[-1] if before else None)
+    return periods
+
+
+def _totals(sentence, amounts):
+    # 값마다 문장이 밝힌 합계인지
+    totals = [False] * len(amounts)
+    cursor = 0
+    for i, (start, end, *_) in enumerate(amounts):
+        segment = sentence[cursor:start]
+        # 합계를 뜻하는 말이 값 바로 앞 두 낱말 안에 있을 때만 ("전체 인구는 서울 100명" 의 서울은 합계가 아니다)
+        if any(TOTAL_WORD.search(word) for word in segment.split()[-2:]):
+            totals[i] = True
+        if i and PART_OF.match(segment):
+            totals[i - 1] = True
+        cursor = end
+    return totals
+
+
+def _label(before):
+    # 숫자 바로 앞에 나온 낱말 (예: "지하철 기본요금은 1,400원" -> 기본요금)
+    terms = tokenize(before)
+    return terms[-1] if terms else ""
+
+
+def extract_figures(text):
+    # 문장 | 항목 | 원문 | 값 | 단위 | 종류 | 기간 | 변화율 | 순위 | 비중 | 이상치
+    rows = []
+    for number, sentence in enumerate(sentences_of(text), 1):
+        dates = list(DATE.finditer(sentence))
+        taken = [match.span() for match in dates]
+        amounts = _amounts(sentence, taken)
+        divided = bool(SHARE_WORD.search(sentence))
+        for (start, end, value, unit, origin), period, total in zip(
+                amounts, _periods(dates, amounts), _totals(sentence, amounts)):
+            rows.append({
+                "문장": number,
+                "항목": _label(sentence[:start]),
+                "원문": sentence[start:end].strip(),
+                "값": value,
+                "단위": unit,
+                "종류": _kind(unit),
+                "기간": period,
+                "출발값": origin,
+                "합계": total,
+                "나눔": divided,
+            })
+    columns = ["문장", "항목", "원문", "값", "단위", "종류", "기간", "출발값", "합계", "나눔"]
+    df = pd.DataFrame(rows, columns=columns)
+    return add_statistics(df)
+
+
+def add_statistics(df):
+    df = df.copy()
+    df["값"] = df["값"].astype(float)
+    df["순서"] = np.arange(len(df))
+
+    # 변화율: 같은 항목/단위의 앞 값 대비. 같은 문장 안에서 "1,400원에서 1,550원으로" 처럼 이어지거나
+    # 둘 다 기간이 있고 기간이 다를 때만 계산한다 (기간 순, 없으면 나온 순서)
+    ordered = df.sort_values(["항목", "단위", "기간", "순서"], na_position="first")
+    group = ordered.groupby(["항목", "단위"], sort=False)
+    previous = group["값"].shift()
+    previous_sentence = group["문장"].shift()
+    previous_period = group["기간"].shift()
+    previous_origin = group["출발값"].shift(fill_value=False)
+    comparable = (ordered["항목"] != "") & previous.notna() & (previous != 0) & (
+        ((ordered["문장"] == previous_sentence) & previous_origin)
+        | (ordered["기간"].notna() & previous_period.notna() & (ordered["기간"] != previous_period))
+    )
+    df["변화율"] = ((ordered["값"] / previous - 1) * 100).where(comparable).round(1)
+
+    # 비중: 한 문장에 같은 단위/기간으로 나열된 값들 (지역별 인원, 분야별 예산 등) 이 한 합계를 나눌 때만.
+    # 문장이 합계를 밝혔으면 ("전체 예산 100억원 가운데 ...") 그 합계 대비, 아니면 나열된 값들의 합 대비.
+    # 전후 비교 ("1,400원에서 1,550원으로") 나 기간별 값은 합계를 나눈 것이 아니고, 비율은 더해도 의미가 없다
+    listing = [df["문장"], df["단위"], df["기간"].fillna("")]
+    parts = ~df["합계"]
+    part_sum = df["값"].where(parts).groupby(listing).transform("sum")
+    part_count = parts.groupby(listing).transform("sum")
+    stated = df["값"].where(df["합계"]).groupby(listing).transform("max")
+    pair = df["출발값"].groupby(listing).transform("any")
+    base = stated.where(part_sum <= stated * 1.01)  # 부분의 합이 밝힌 합계보다 크면 합계가 아니다
+    base = base.where(stated.notna(), part_sum.where(df["나눔"] & (part_count > 1)))
+    share = parts & ~pair & ~df["종류"].isin(["비율", "비율 변화"]) & (base > 0)
+    shares = (df["값"] / base * 100).where(share).round(1)
+
+    # 순위: 비중을 낸 목록 안에서, 아니면 같은 항목/단위의 값들 (기간별 매출 등) 안에서. 비교할 값이 없으면 비워 둔다
+    key = pd.Series(None, index=df.index, dtype=object)
+    named = (df["항목"] != "") & parts
+    # 빈 표에서는 열이 object 가 되어 문자열 열과 더할 수 없으므로 모두 str 로 바꿔서 잇는다
+    key[named] = "항목:" + df["항목"].astype(str) + "|" + df["단위"].astype(str)
+    key[share] = ("목록:" + df["문장"].astype(str) + "|" + df["단위"].astype(str) + "|"
+                  + df["기간"].fillna("").astype(str))
+    ranked = df["값"].groupby(key).rank(ascending=False, method="min")
+    df["순위"] = ranked.where(key.map(key.value_counts()) > 1).astype("Int64")
+    df["비중"] = shares
+
+    # 이상치: 같은 단위 값들의 로그 (자릿수) 에 대한 중앙값/MAD 기반 수정 z 점수
+    scale = np.log10(df["값"].where(df["값"] > 0))
+    median = scale.groupby(df["단위"]).transform("median")
+    mad = (scale - median).abs().groupby(df["단위"]).transform("median")
+    count = scale.groupby(df["단위"]).transform("count")
+    z = 0.6745 * (scale - median) / mad.where(mad > 0)
+    df["이상치"] = (count >= OUTLIER_MIN_VALUES) & (z.abs() > OUTLIER_Z)
+    return df.drop(columns=["순서", "출발값", "합계", "나눔"])
+
+
+def format_value(value):
+    # 3500000000000 -> "3조 5,000억", 1550 -> "1,550", 3.5 -> "3.5"
+    if value != value:
+        return ""
+    if abs(value) < 1e4 or value != int(value):
+        return f"{value:,.10g}" if abs(value) < 1e4 else f"{value:,.2f}".rstrip("0").rstrip(".")
+    parts, rest = [], int(value)
+    for name, scale in (("조", 10 ** 12), ("억", 10 ** 8), ("만", 10 ** 4)):
+        if rest >= scale:
+            parts.append(f"{rest // scale:,}{name}")
+            rest %= scale
+    if rest:
+        parts.append(f"{rest:,}")
+    return " ".join(parts)
+
+
+def figures_table(df):
+    # 모델에 넘길 CSV (값은 한국어 단위로 읽기 쉽게)
+    table = df.assign(값=df["값"].map(format_value))
+    table["이상치"] = table["이상치"].map({True: "예", False: ""})
+    return table.drop(columns="종류").to_csv(index=False)
@@ -0,0 +1,292 @@
+import base64
+import difflib
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+# 편집 기록 (되돌리기 / 다시 실행 / 버전 비교)
+# 버전마다 전체 글을 두지 않고 바로 앞 버전과의 차이 (낱말 단위) 만 압축해서 저장한다.
+# 몇 버전마다 한 번은 전체 글을 압축해 두어 먼 버전도 빨리 복원한다.
+# 문서별 버전 수와 압축 크기가 한도를 넘으면 가장 오래된 버전부터 버린다.
+# 기록은 프로세스 전역 저장소에 문서 ID (제목 또는 글 내용 해시, document_key) 별로 둔다.
+# Streamlit 세션 ID 는 새로고침마다 바뀌므로 쓰지 않는다: 같은 제목을 적거나 마지막 버전과 같은 글을 열면 (find)
+# 새로고침 뒤에도 기록을 이어 쓴다. HISTORY_DB_PATH 를 지정하면 SQLite 에도 저장해 재시작 후에도 이어서 쓴다.
+# HISTORY_TTL 동안 쓰지 않은 문서의 기록은 메모리와 SQLite 에서 지운다.
+HISTORY_MAX_VERSIONS = int(os.environ.get("HISTORY_MAX_VERSIONS", "100"))
+HISTORY_MAX_BYTES = int(os.environ.get("HISTORY_MAX_BYTES", 256 * 1024))  # 문서당 압축 크기 한도
+HISTORY_DB_PATH = os.environ.get("HISTORY_DB_PATH", "")
+HISTORY_TTL = float(os.environ.get("HISTORY_TTL", 30 * 86400))  # 쓰지 않은 문서 기록 보관 기간 (초)
+HISTORY_DOCUMENTS = 1000  # 메모리에 둘 문서 수 (LRU)
+SNAPSHOT_EVERY = 10
+
+TOKEN = re.compile(r"\S+\s*|\s+")
+
+
+def text_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+def document_key(title=None, text=None):
+    # 편집 기록을 묶는 문서 ID. 제목이 있으면 제목 (공백 정리) 으로, 없으면 글 내용의 해시로 정한다
+    if title and title.strip():
+        return "title:" + " ".join(title.split())
+    return "text:" + text_hash(text or "")
+
+
+def _pack(data):
+    return zlib.compress(json.dumps(data, ensure_ascii=False).encode("utf-8"))
+
+
+def _unpack(blob):
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+def make_patch(old, new):
+    # 낱말 단위 차이: [[시작, 끝, 바꿀 내용], ...] (old 토큰 위치 기준)
+    a, b = TOKEN.findall(old), TOKEN.findall(new)
+    matcher = difflib.SequenceMatcher(None, a, b, autojunk=False)
+    return [[i1, i2, "".join(b[j1:j2])] for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != "equal"]
+
+
+def apply_patch(old, patch):
+    tokens = TOKEN.findall(old)
+    for start, end, replacement in reversed(patch):
+        tokens[start:end] = [replacement]
+    return "".join(tokens)
+
+
+class EditHistory:
+
+    def __init__(self, max_versions=HISTORY_MAX_VERSIONS, max_bytes=HISTORY_MAX_BYTES):
+        self.max_versions = max(2, max_versions)
+        self.max_bytes = max_bytes
+        self.entries = []  # (종류, 압축 데이터, 저장 시각, 글자 수), 종류는 "full" 또는 "diff"
+        self.position = -1  # 현재 버전 번호
+        self.dropped = 0  # 한도 때문에 버린 버전 수
+        self._cache = (None, None)  # (버전 번호, 텍스트)
+
+    def __len__(self):
+        return len(self.entries)
+
+    @property
+    def size(self):
+        return sum(len(entry[1]) for entry in self.entries)
+
+    @property
+    def can_undo(self):
+        return self.position > 0
+
+    @property
+    def can_redo(self):
+        return self.position < len(self.entries) - 1
+
+    def text(self, index=None):
+        # index 번째 버전 복원: 가장 가까운 앞쪽 전체 글에서 차이를 차례로 적용한다
+        index = self.position if index is None else index
+        if index < 0:
+            return ""
+        cached_index, cached_text = self._cache
+        if cached_index == index:
+            return cached_text
+        start = index
+        while self.entries[start][0] != "full":
+            start -= 1
+        text = _unpack(self.entries[start][1])
+        for entry in self.entries[start + 1:index + 1]:
+            text = apply_patch(text, _unpack(entry[1]))
+        self._cache = (index, text)
+        return text
+
+    def push(self, text):
+        # 새 버전을 현재 버전 뒤에 붙인다 (되돌린 뒤에 고쳤으면 다시 실행할 버전은 버린다)
+        if self.position >= 0 and text == self.text():
+            return False
+        previous = self.text() if self.position >= 0 else None
+        del self.entries[self.position + 1:]
+        if previous is None or len(self.entries) % SNAPSHOT_EVERY == 0:
+            self.entries.append(("full", _pack(text), time.time(), len(text)))
+        else:
+            self.entries.append(("diff", _pack(make_patch(previous, text)), time.time(), len(text)))
+        self.position = len(self.entries) - 1
+        self._cache = (self.position, text)
+        self._trim()
+        return True
+
+    def _trim(self):
+        while len(self.entries) > 1 and (len(self.entries) > self.max_versions or self.size > self.max_bytes):
+            # 두 번째 버전을 전체 글로 바꾸고 첫 버전을 버린다
+            second = self.text(1)
+            self.entries[1] = ("full", _pack(second), *self.entries[1][2:])
+            del self.entries[0]
+            self.position = max(0, self.position - 1)
+            self.dropped += 1
+            self._cache = (None, None)
+
+    def undo(self, current=None):
+        # current (입력창의 지금 글) 가 현재 버전과 다르면 먼저 저장해서 다시 실행으로 돌아올 수 있게 한다
+        if current is not None:
+            self.push(current)
+        if self.can_undo:
+            self.position -= 1
+        return self.text()
+
+    def redo(self):
+        if self.can_redo:
+            self.position += 1
+        return self.text()
+
+    def goto(self, index):
+        self.position = max(0, min(index, len(self.entries) - 1))
+        return self.text()
+
+    def versions(self):
+        # 화면 표시용 (번호, 저장 시각, 글자 수)
+        return [(i, saved_at, chars) for i, (_, _, saved_at, chars) in enumerate(self.entries)]
+
+    def to_bytes(self):
+        entries = [[kind, base64.b64encode(blob).decode("ascii"), saved_at, chars]
+                   for kind, blob, saved_at, chars in self.entries]
+        return zlib.compress(json.dumps({"entries": entries, "position": self.position,
+                                         "dropped": self.dropped}).encode("utf-8"))
+
+    @classmethod
+    def from_bytes(cls, data, **limits):
+        history = cls(**limits)
+        state = json.loads(zlib.decompress(data).decode("utf-8"))
+        history.entries = [(kind, base64.b64decode(blob), saved_at, chars)
+                           for kind, blob, saved_at, chars in state["entries"]]
+        history.position = state["position"]
+        history.dropped = state.get("dropped", 0)
+        return history
+
+
+def compare_versions(old, new):
+    # 문장 단위 unified diff (화면에서 diff 코드 블록으로 보여준다)
+    a = [line for line in re.split(r"(?<=[.!?])\s+|\n", old) if line.strip()]
+    b = [line for line in re.split(r"(?<=[.!?])\s+|\n", new) if line.strip()]
+    return "\n".join(difflib.unified_diff(a, b, "이전", "이후", lineterm="", n=1))
+
+
+class HistoryStore:
+    # 문서 ID -> EditHistory. 메모리에는 최근 문서만 두고, db_path 가 있으면 변경할 때마다 저장한다
+
+    def __init__(self, db_path=HISTORY_DB_PATH, max_documents=HISTORY_DOCUMENTS, ttl=HISTORY_TTL):
+        self.max_documents = max_documents
+        self.ttl = ttl
+        self._histories = OrderedDict()  # 오래 안 쓴 문서가 앞
+        self._used = {}  # 문서 ID -> 마지막으로 쓴 시각
+        self._latest = {}  # 문서 ID -> 저장한 현재 버전의 해시 (find 용)
+        self._lock = threading.Lock()
+        self._db = None
+        if db_path:
+            if db_path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS history ("
+                "owner TEXT PRIMARY KEY, data BLOB NOT NULL, updated_at REAL NOT NULL)"
+            )
+            columns = [row[1] for row in self._db.execute("PRAGMA table_info(history)")]
+            if "latest" not in columns:
+                self._db.execute("ALTER TABLE history ADD COLUMN latest TEXT")
+            self._db.execute("CREATE INDEX IF NOT EXISTS history_latest ON history (latest)")
+            self._prune_db(time.time())
+            self._db.commit()
+
+    def get(self, owner):
+        owner = owner or "default"
+        with self._lock:
+            now = time.time()
+            self._prune_memory(now)
+            history = self._histories.get(owner)
+            if history is None:
+                history = self._load(owner) or EditHistory()
+                self._histories[owner] = history
+                while len(self._histories) > self.max_documents:
+                    self._forget(next(iter(self._histories)))
+            self._histories.move_to_end(owner)
+            self._used[owner] = now
+            return history
+
+    def find(self, text):
+        # 현재 버전이 text 인 문서 ID (새로고침 뒤 같은 글을 열었을 때 기록을 이어 쓰기). 없으면 None
+        if not text:
+            return None
+        key = text_hash(text)
+        with self._lock:
+            for owner in reversed(self._histories):
+                if self._latest.get(owner) == key:
+                    return owner
+            if self._db is None:
+                return None
+            row = self._db.execute(
+                "SELECT owner FROM history WHERE latest = ? AND updated_at >= ? ORDER BY updated_at DESC LIMIT 1",
+                (key, time.time() - self.ttl),
+            ).fetchone()
+        return row[0] if row else None
+
+    def _load(self, owner):
+        if self._db is None:
+            return None
+        row = self._db.execute("SELECT data FROM history WHERE owner = ? AND updated_at >= ?",
+                               (owner, time.time() - self.ttl)).fetchone()
+        return EditHistory.from_bytes(row[0]) if row else None
+
+    def _forget(self, owner):
+        del self._histories[owner]
+        self._used.pop(owner, None)
+        self._latest.pop(owner, None)
+
+    def _prune_memory(self, now):
+        # 앞쪽이 오래 안 쓴 문서이므로 기한이 지나지 않은 문서가 나오면 멈춘다
+        while self._histories:
+            owner = next(iter(self._histories))
+            if self._used.get(owner, 0) >= now - self.ttl:
+                break
+            self._forget(owner)
+
+    def _prune_db(self, now):
+        self._db.execute("DELETE FROM history WHERE updated_at < ?", (now - self.ttl,))
+
+    def save(self, owner):
+        owner = owner or "default"
+        with self._lock:
+            history = self._histories.get(owner)
+            if history is None:
+                return
+            now = time.time()
+            latest = text_hash(history.text()) if len(history) else None
+            self._latest[owner] = latest
+            self._used[owner] = now
+            if self._db is None:
+                return
+            self._db.execute(
+                "INSERT OR REPLACE INTO history (owner, data, updated_at, latest) VALUES (?, ?, ?, ?)",
+                (owner, history.to_bytes(), now, latest),
+            )
+            self._prune_db(now)
+            self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            histories = list(self._histories.values())
+        return {"documents": len(histories), "bytes": sum(h.size for h in histories)}
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_history_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = HistoryStore()
+    return _store
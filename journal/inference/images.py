@@ -0,0 +1,109 @@
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+# 모델에 보내기 전 이미지 전처리
+# - 긴 변을 모델이 실제로 활용하는 최대 크기로 축소 (Claude 는 1568px 를 넘으면 어차피 내부에서 줄인다)
+# - JPEG/WebP 품질 조정, EXIF 제거 (회전 정보는 먼저 픽셀에 반영)
+# - 업로드 해시로 인코딩 결과를 캐시해서 rerun 마다 다시 압축하지 않는다
+MAX_IMAGE_DIMENSION = int(os.environ.get("IMAGE_MAX_DIMENSION", "1568"))
+IMAGE_FORMAT = os.environ.get("IMAGE_FORMAT", "jpeg")  # jpeg | webp
+IMAGE_QUALITY = int(os.environ.get("IMAGE_QUALITY", "85"))
+CACHE_MAX_ENTRIES = 32
+
+
+@dataclass(frozen=True)
+class PreparedImage:
+    data: bytes
+    format: str
+    width: int
+    height: int
+    original_size: int
+
+    @property
+    def size(self):
+        return len(self.data)
+
+    @property
+    def saved_ratio(self):
+        if not self.original_size:
+            return 0.0
+        return max(0.0, 1 - self.size / self.original_size)
+
+    def savings_caption(self):
+        return (f"이미지 {_format_bytes(self.original_size)} → {_format_bytes(self.size)} "
+                f"({self.width}×{self.height}, {self.saved_ratio:.0%} 절감)")
+
+
+def _format_bytes(size):
+    if size >= 1024 * 1024:
+        return f"{size / (1024 * 1024):.1f}MB"
+    if size >= 10 * 1024:
+        return f"{size / 1024:.0f}KB"
+    return f"{size / 1024:.1f}KB"
+
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _to_rgb(image):
+    from PIL import Image
+
+    # RGBA 이미지를 RGB로 변환 (투명 영역은 흰 배경)
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        if image.mode == 'P':
+            image = image.convert('RGBA')
+        background.paste(image, mask=image.split()[-1])
+        return background
+    if image.mode != 'RGB':
+        return image.convert('RGB')
+    return image
+
+
+def encode_image(image, max_dimension=MAX_IMAGE_DIMENSION, fmt=IMAGE_FORMAT, quality=IMAGE_QUALITY):
+    from PIL import Image, ImageOps
+
+    # 회전 정보를 픽셀에 반영한 뒤, 다시 저장할 때 EXIF 는 넣지 않는다
+    image = ImageOps.exif_transpose(image)
+    image = _to_rgb(image)
+    if max(image.size) > max_dimension:
+        image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+
+    buffered = io.BytesIO()
+    if fmt == "webp":
+        image.save(buffered, format="WEBP", quality=quality, method=4)
+    else:
+        image.save(buffered, format="JPEG", quality=quality, optimize=True, progressive=True)
+    return buffered.getvalue(), image.size
+
+
+def prepare_image(data, max_dimension=MAX_IMAGE_DIMENSION, fmt=IMAGE_FORMAT, quality=IMAGE_QUALITY):
+    # 업로드 바이트 -> PreparedImage (같은 업로드는 캐시에서 바로 돌려준다)
+    from PIL import Image
+
+    key = (hashlib.sha256(data).hexdigest(), max_dimension, fmt, quality)
+    with _cache_lock:
+        prepared = _cache.get(key)
+        if prepared is not None:
+            _cache.move_to_end(key)
+            return prepared
+
+    with Image.open(io.BytesIO(data)) as image:
+        encoded, (width, height) = encode_image(image, max_dimension, fmt, quality)
+    prepared = PreparedImage(encoded, fmt, width, height, len(data))
+
+    with _cache_lock:
+        _cache[key] = prepared
+        while len(_cache) > CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
+    return prepared
+
+
+def process_image_for_bedrock(image):
+    # PIL 이미지를 모델 전송용 바이트로 변환 (업로드 바이트가 있으면 prepare_image 를 쓴다)
+    return encode_image(image)[0]
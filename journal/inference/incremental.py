@@ -0,0 +1,101 @@
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from .chunking import (
+    CHUNK_CHARS,
+    GRAMMAR_CHUNK_PROMPT,
+    chunk_text,
+    format_grammar_report,
+    map_chunks,
+    parse_grammar_chunk,
+    split_paragraphs,
+    split_whitespace,
+)
+
+# 문단 단위 증분 맞춤법 검사
+# 마지막으로 검사한 문단들의 결과를 내용 해시로 기억해 두고, 바뀐 문단만 모델에 보낸 뒤
+# 전체 수정본을 다시 이어 붙인다. 한 문장만 고쳤다면 그 문단 하나만 다시 검사한다.
+MAX_REMEMBERED_PARAGRAPHS = 1000
+
+
+@dataclass
+class IncrementalResult:
+    report: str
+    paragraphs: int
+    checked: int
+    reused: int
+    failed: int
+
+
+def _units(text):
+    # 문단 단위. 너무 긴 문단은 문장 단위 조각으로 더 나눈다
+    for paragraph in split_paragraphs(text):
+        if len(paragraph) <= CHUNK_CHARS:
+            yield paragraph
+        else:
+            yield from chunk_text(paragraph)
+
+
+def paragraph_key(body, model_id=None):
+    # 모델을 바꾸면 같은 문단도 다시 검사한다
+    return hashlib.sha256(f"{model_id or ''}\0{body}".encode("utf-8")).hexdigest()
+
+
+class IncrementalGrammarChecker:
+    # 세션마다 하나씩 두고 (st.session_state) 검사할 때마다 같은 객체를 쓴다
+
+    def __init__(self, max_paragraphs=MAX_REMEMBERED_PARAGRAPHS):
+        self.max_paragraphs = max_paragraphs
+        self._results = OrderedDict()  # 문단 해시 -> (수정 사항 목록, 수정된 문단)
+
+    def check(self, text, on_progress=None, **options):
+        parts = [split_whitespace(unit) for unit in _units(text)]
+        keys = [paragraph_key(body, options.get("model_id")) if body else None for _, body, _ in parts]
+
+        # 바뀐 (처음 보는) 문단만 모델에 보낸다. 같은 문단이 두 번 나오면 한 번만 보낸다
+        pending = []
+        for (_, body, _), key in zip(parts, keys):
+            if key and key not in self._results and key not in {k for k, _ in pending}:
+                pending.append((key, body))
+        prompts = [GRAMMAR_CHUNK_PROMPT.format(text=body) for _, body in pending]
+        outcomes = map_chunks("grammar", prompts, on_progress, **options) if prompts else []
+
+        errors = {}
+        for (key, body), (result, error) in zip(pending, outcomes):
+            if error is not None:
+                errors[key] = error
+                continue
+            self._remember(key, parse_grammar_chunk(result, body))
+
+        corrections, corrected = [], []
+        for index, ((leading, body, trailing), key) in enumerate(zip(parts, keys), 1):
+            if not body:
+                corrected.append(leading)
+                continue
+            if key in errors:
+                corrections.append(f"- 문단 {index} 검사 실패 (원문 유지): {str(errors[key])}")
+                corrected.append(leading + body + trailing)
+                continue
+            items, fixed = self._results[key]
+            self._results.move_to_end(key)
+            corrections.extend(f"{item} (문단 {index})" for item in items)
+            corrected.append(leading + fixed + trailing)
+
+        paragraphs = sum(1 for key in keys if key)
+        return IncrementalResult(
+            report=format_grammar_report(corrections, "".join(corrected)),
+            paragraphs=paragraphs,
+            checked=len(pending) - len(errors),
+            reused=paragraphs - len(pending),
+            failed=len(errors),
+        )
+
+    def _remember(self, key, value):
+        self._results[key] = value
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_paragraphs:
+            self._results.popitem(last=False)
+
+    def clear(self):
+        self._results.clear()
@@ -0,0 +1,169 @@
+import hashlib
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from .cancel import CallCancelled, CancelToken
+from .streaming import TextStream
+
+# 백그라운드 작업 대기열
+# Streamlit 스크립트 실행과 상관없이 작업자 스레드 풀에서 모델 호출을 끝까지 실행하고 결과를 작업 표에 남긴다.
+# 탭을 옮기면 기사 작성 페이지의 session_state 가 지워지지만 작업 표는 프로세스 전역이고 소유자 (세션 ID) 별로 찾으므로,
+# 기사 재작성을 걸어 두고 다른 페이지에 다녀와도 끝난 결과를 다시 돈 내지 않고 가져올 수 있다.
+# 같은 소유자가 같은 입력으로 다시 제출하면 진행 중이거나 아직 반영하지 않은 작업을 그대로 돌려준다.
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "8"))
+JOB_TTL = float(os.environ.get("JOB_TTL", 3600))  # 끝난 작업 보관 시간 (초)
+JOBS_PER_OWNER = 20
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "대기 중", "진행 중", "완료", "실패", "취소됨"
+
+_ids = itertools.count(1)
+
+
+@dataclass
+class Job:
+    id: str
+    owner: str
+    kind: str  # 작업 종류 (예: rewrite), 화면에서 어떤 작업의 결과를 보여줄지 고를 때 쓴다
+    label: str
+    key: str  # 같은 입력인지 판단하는 키
+    source: str = ""  # 입력 텍스트 (되돌리기용)
+    status: str = QUEUED
+    text: str = ""  # 스트리밍 중인 부분 결과
+    result: object = None
+    error: object = None
+    stream: object = None  # TextStream (지연 시간 표시용)
+    consumed: bool = False  # 화면에서 결과를 반영했는지
+    created_at: float = field(default_factory=time.time)
+    started_at: float = None
+    finished_at: float = None
+    token: CancelToken = field(default_factory=CancelToken, repr=False)
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED, CANCELLED)
+
+    @property
+    def elapsed(self):
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+
+def job_key(kind, args, kwargs):
+    payload = repr((kind, args, sorted(kwargs.items())))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class JobQueue:
+
+    def __init__(self, workers=JOB_WORKERS, ttl=JOB_TTL, per_owner=JOBS_PER_OWNER):
+        self.ttl = ttl
+        self.per_owner = per_owner
+        self.submitted = 0
+        self.reused = 0  # 같은 입력이라 새로 호출하지 않은 제출 수
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._jobs = OrderedDict()  # id -> Job (제출 순서)
+        self._lock = threading.Lock()
+
+    def submit(self, owner, kind, fn, *args, label=None, source="", **kwargs):
+        # fn(*args, cancel_token=..., **kwargs) 를 백그라운드에서 실행한다. TextStream 을 돌려주면 끝까지 읽는다
+        owner = owner or "default"
+        key = job_key(kind, args, kwargs)
+        with self._lock:
+            self._prune()
+            for job in reversed(self._jobs.values()):
+                reusable = not job.finished or (job.status == DONE and not job.consumed)
+                if job.owner == owner and job.key == key and reusable:
+                    self.reused += 1
+                    return job
+            job = Job(str(next(_ids)), owner, kind, label or kind, key, source=source)
+            self._jobs[job.id] = job
+            self.submitted += 1
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def _run(self, job, fn, args, kwargs):
+        if job.token.cancelled:
+            job.status, job.finished_at = CANCELLED, time.time()
+            return
+        job.status, job.started_at = RUNNING, time.time()
+        try:
+            result = fn(*args, cancel_token=job.token, **kwargs)
+            if isinstance(result, TextStream):
+                job.stream = result
+                for chunk in result:
+                    job.text += chunk
+                result = job.text
+            job.result = result
+            job.status = DONE
+        except Exception as e:
+            job.error = e
+            job.status = CANCELLED if isinstance(e, CallCancelled) and job.token.cancelled else FAILED
+        finally:
+            job.finished_at = time.time()
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self, owner, kinds=None):
+        # 소유자의 작업 (최근 것부터)
+        owner = owner or "default"
+        with self._lock:
+            return [job for job in reversed(self._jobs.values())
+                    if job.owner == owner and (kinds is None or job.kind in kinds)]
+
+    def latest(self, owner, kinds=None):
+        jobs = self.jobs(owner, kinds)
+        return jobs[0] if jobs else None
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is not None and not job.finished:
+            job.token.cancel()
+        return job
+
+    def remove(self, job_id):
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+        if job is not None:
+            job.token.cancel()
+
+    def _prune(self):
+        # 오래된 끝난 작업을 지우고, 소유자별로 최근 per_owner 개만 남긴다 (진행 중인 작업은 남긴다)
+        now = time.time()
+        counts = {}
+        for job in reversed(list(self._jobs.values())):
+            counts[job.owner] = counts.get(job.owner, 0) + 1
+            expired = job.finished and now - (job.finished_at or now) > self.ttl
+            if job.finished and (expired or counts[job.owner] > self.per_owner):
+                del self._jobs[job.id]
+
+    def stats(self):
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+        return {
+            "jobs": len(statuses),
+            "running": statuses.count(RUNNING),
+            "queued": statuses.count(QUEUED),
+            "submitted": self.submitted,
+            "reused": self.reused,
+        }
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = JobQueue()
+    return _queue
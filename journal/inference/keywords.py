@@ -0,0 +1,289 @@
+import functools
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+
+from .chunking import split_paragraphs, split_sentences
+from .structured import ContentAnalysisResult, Keyword
+from .tools import article_prefix, run_task, tracks_article
+from .usage import article_key
+
+# 로컬 키워드 추출 / 요약 (모델 호출 없음)
+# 한국어 낱말에서 조사와 '하다/되다' 활용 어미를 떼어 낸 줄기를 단어로 쓰고,
+# TF-IDF 와 TextRank (낱말 동시 출현 그래프) 점수를 합쳐 키워드를 고른다.
+# 요약은 문장 TF-IDF 벡터의 코사인 유사도 그래프에 TextRank 를 돌려 중요한 문장을 원문 순서대로 뽑는다.
+# IDF 는 지금까지 분석한 기사들의 문서 빈도 (SQLite) 로 계산하고, 분석할 때마다 새 기사를 색인에 더한다.
+# 색인이 아직 작으면 (CORPUS_MIN_DOCUMENTS 미만) 문장을 문서로 보고 글 안에서 IDF 를 계산한다.
+# KEYWORD_INDEX_PATH 를 빈 문자열로 두면 디스크에 남기지 않는다
+KEYWORD_INDEX_PATH = os.environ.get(
+    "KEYWORD_INDEX_PATH", os.path.join(os.path.expanduser("~"), ".journal", "keywords.sqlite3")
+)
+KEYWORD_COUNT = int(os.environ.get("KEYWORD_COUNT", "10"))
+SUMMARY_CHARS = 300
+SUMMARY_SENTENCES = 3
+CORPUS_MIN_DOCUMENTS = 20
+CANDIDATES = 300  # TextRank 그래프에 넣을 최대 낱말 수 (TF-IDF 상위)
+WINDOW = 3  # 동시 출현으로 볼 낱말 거리
+DAMPING = 0.85
+READING_CHARS_PER_MINUTE = 500
+
+WORD = re.compile(r"[가-힣]+|[A-Za-z][A-Za-z0-9]*")
+# 숫자에 붙은 단위 (1,400원에서, 3천억원) 는 낱말로 보지 않는다
+TERM = re.compile(r"\d[\d.,]*[가-힣A-Za-z]*|[가-힣]+|[A-Za-z][A-Za-z0-9]*")
+# 줄기가 이렇게 끝나면 서술어로 보고 버린다
+PREDICATE_ENDINGS = ("다", "다고", "라고", "는데", "면서", "지만", "어서", "아서", "을", "겠")
+
+# 낱말 끝에서 떼어 낼 조사 / 활용 어미 (긴 것부터 맞춰 본다)
+SUFFIXES = frozenset("""
+으로부터 에서부터 이라는 이라고 이라며 에게서 으로서 으로써 에서는 에서도 으로는 으로도 까지는 부터는 에게는
+이었다 이지만 하였다 되었다 했으며 했다며 한다며 한다고 했다고 된다고 시켰다
+였다 이다 라는 라고 라며 에서 에게 으로 로서 로써 보다 처럼 까지 부터 마다 조차 만큼 이나 이며 이고 에는 에도
+로는 와는 과는 와의 과의 했다 한다 하는 하고 하며 하여 해서 했고 하기 하면 된다 됐다 되는 되고 되어 시킨 시켜
+의 은 는 이 가 을 를 에 와 과 도 로 만 며 께 할 한 된
+""".split())
+LONGEST_SUFFIX = max(map(len, SUFFIXES))
+
+STOPWORDS = set("""
+그리고 그러나 하지만 그런데 또한 또는 혹은 한편 이에 이번 지난 올해 지난해 내년 오늘 내일 어제 현재 당시 이후 이전
+위해 대해 대한 통해 따라 관련 경우 때문 정도 가장 매우 모든 각각 우리 그것 이것 저것 여기 거기 이런 그런 저런
+있다 없다 있는 없는 있고 없고 있을 없을 같은 같다 함께 것으로 등 및 수 것 때 중 더 또 약 총 그 이 저 그는 그녀 이들 그들
+기자 뉴스 말했다 밝혔다 전했다 설명했다 강조했다 덧붙였다 예정 계획 the and of to in for on with is are was
+""".split())
+
+
+@functools.lru_cache(maxsize=65536)
+def _stem(word):
+    if not ("가" <= word[0] <= "힣"):
+        return word.lower()
+    for size in range(min(LONGEST_SUFFIX, len(word) - 2), 0, -1):
+        if word[-size:] in SUFFIXES:
+            return word[:-size]
+    return word
+
+
+def tokenize(text):
+    # 키워드 후보가 될 낱말 줄기 목록 (순서 유지, 숫자/한 글자/불용어/서술어 제외)
+    terms = []
+    for word in TERM.findall(text):
+        if word[0].isdigit() or word in STOPWORDS:
+            continue
+        term = _stem(word)
+        if len(term) < 2 or term in STOPWORDS or term.endswith(PREDICATE_ENDINGS):
+            continue
+        terms.append(term)
+    return terms
+
+
+def sentences_of(text):
+    return [s.strip() for paragraph in split_paragraphs(text) for s in split_sentences(paragraph) if s.strip()]
+
+
+def textrank(weights, damping=DAMPING, iterations=50, tolerance=1e-6):
+    # 가중치 인접 행렬에서 PageRank 점수 (행 정규화한 전이 행렬로 거듭제곱 반복)
+    n = len(weights)
+    if n == 0:
+        return np.zeros(0)
+    out = weights.sum(axis=1, keepdims=True)
+    transition = np.divide(weights, out, out=np.zeros_like(weights), where=out > 0)
+    scores = np.full(n, 1.0 / n)
+    for _ in range(iterations):
+        updated = (1 - damping) / n + damping * (scores @ transition)
+        if np.abs(updated - scores).sum() < tolerance:
+            return updated
+        scores = updated
+    return scores
+
+
+def _normalize(values):
+    top = values.max() if len(values) else 0
+    return values / top if top > 0 else values
+
+
+def text_stats(text, sentences, words):
+    chars = len(text)
+    return {
+        "글자 수": chars,
+        "공백 제외": len(re.sub(r"\s", "", text)),
+        "문장 수": len(sentences),
+        "낱말 수": len(words),
+        "평균 문장 길이": round(chars / len(sentences), 1) if sentences else 0,
+        "읽는 시간 (분)": max(1, math.ceil(chars / READING_CHARS_PER_MINUTE)) if chars else 0,
+    }
+
+
+class CorpusIndex:
+    # 기사별 낱말 문서 빈도 (IDF 계산용). 같은 기사는 한 번만 센다
+    def __init__(self, db_path=KEYWORD_INDEX_PATH):
+        if db_path and db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.db_path = db_path or ":memory:"
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        if self.db_path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS documents (key TEXT PRIMARY KEY, added_at REAL NOT NULL)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS terms (term TEXT PRIMARY KEY, df INTEGER NOT NULL)")
+        self._db.commit()
+        self.documents = self._db.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def add(self, key, terms):
+        # 처음 보는 기사면 문서 빈도를 올린다. 새로 더했으면 True
+        with self._lock:
+            if self._db.execute("SELECT 1 FROM documents WHERE key = ?", (key,)).fetchone():
+                return False
+            self._db.execute("INSERT INTO documents (key, added_at) VALUES (?, ?)", (key, time.time()))
+            self._db.executemany(
+                "INSERT INTO terms (term, df) VALUES (?, 1) ON CONFLICT(term) DO UPDATE SET df = df + 1",
+                [(term,) for term in set(terms)],
+            )
+            self._db.commit()
+            self.documents += 1
+            return True
+
+    def frequencies(self, terms):
+        # terms 순서대로 문서 빈도 배열
+        found = {}
+        with self._lock:
+            for start in range(0, len(terms), 500):
+                batch = terms[start:start + 500]
+                query = f"SELECT term, df FROM terms WHERE term IN ({','.join('?' * len(batch))})"
+                found.update(self._db.execute(query, batch).fetchall())
+        return np.array([found.get(term, 0) for term in terms], dtype=float)
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM documents")
+            self._db.execute("DELETE FROM terms")
+            self._db.commit()
+            self.documents = 0
+
+    def stats(self):
+        with self._lock:
+            terms = self._db.execute("SELECT COUNT(*) FROM terms").fetchone()[0]
+        return {"documents": self.documents, "terms": terms}
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_corpus_index():
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = CorpusIndex()
+    return _index
+
+
+def _idf(vocabulary, sentence_terms, index, key):
+    # 분석할 기사도 색인에 더한 뒤 계산한다 (이미 본 기사면 다시 세지 않는다)
+    index.add(key, vocabulary)
+    if index.documents >= CORPUS_MIN_DOCUMENTS:
+        return np.log((1 + index.documents) / (1 + index.frequencies(vocabulary))) + 1
+    position = {term: i for i, term in enumerate(vocabulary)}
+    df = np.zeros(len(vocabulary))
+    for terms in sentence_terms:
+        df[[position[term] for term in set(terms)]] += 1
+    return np.log((1 + len(sentence_terms)) / (1 + df)) + 1
+
+
+def _context(keyword, sentences, limit=80):
+    for sentence in sentences:
+        if keyword in sentence or keyword in sentence.lower():
+            return sentence if len(sentence) <= limit else sentence[:limit - 1] + "…"
+    return ""
+
+
+@tracks_article
+def analyze_content_local(text, count=KEYWORD_COUNT, summary_chars=SUMMARY_CHARS, summary_sentences=SUMMARY_SENTENCES,
+                          index=None, **options):
+    # analyze_content_structured 와 같은 ContentAnalysisResult (source="로컬", 기본 통계 포함)
+    index = index or get_corpus_index()
+    sentences = sentences_of(text)
+    sentence_terms = [tokenize(sentence) for sentence in sentences]
+    words = WORD.findall(text)
+    result = ContentAnalysisResult(stats=text_stats(text, sentences, words), source="로컬")
+    counts = Counter(term for terms in sentence_terms for term in terms)
+    if not counts:
+        result.summary = text.strip()[:summary_chars]
+        return result
+
+    vocabulary = list(counts)
+    position = {term: i for i, term in enumerate(vocabulary)}
+    tf = np.array([counts[term] for term in vocabulary], dtype=float)
+    idf = _idf(vocabulary, sentence_terms, index, options.get("article_id") or article_key(text))
+    tfidf = tf / tf.sum() * idf
+
+    # 키워드: TF-IDF 상위 후보로 동시 출현 그래프를 만들어 TextRank 와 합친다
+    candidates = np.argsort(-tfidf)[:CANDIDATES]
+    slot = np.full(len(vocabulary), -1)
+    slot[candidates] = np.arange(len(candidates))
+    graph = np.zeros((len(candidates), len(candidates)))
+    for terms in sentence_terms:
+        ids = slot[[position[term] for term in terms]] if terms else np.zeros(0, dtype=int)
+        ids = ids[ids >= 0]
+        for distance in range(1, WINDOW):
+            a, b = ids[:-distance], ids[distance:]
+            keep = a != b
+            np.add.at(graph, (a[keep], b[keep]), 1)
+            np.add.at(graph, (b[keep], a[keep]), 1)
+    scores = 0.5 * _normalize(tfidf[candidates]) + 0.5 * _normalize(textrank(graph))
+    scores = _normalize(scores)
+    top = np.argsort(-scores)[:count]
+    result.keywords = [
+        Keyword(vocabulary[candidates[i]], round(float(scores[i]), 2), _context(vocabulary[candidates[i]], sentences))
+        for i in top
+    ]
+
+    # 주요 주제: 상위 키워드 두 개가 붙어서 두 번 이상 나온 구
+    keywords = {vocabulary[candidates[i]] for i in np.argsort(-scores)[:count * 2]}
+    pairs = Counter(
+        f"{a} {b}" for terms in sentence_terms for a, b in zip(terms, terms[1:])
+        if a != b and a in keywords and b in keywords
+    )
+    result.topics = [phrase for phrase, n in pairs.most_common(3) if n >= 2]
+
+    # 요약: 문장 유사도 그래프의 TextRank 상위 문장 (기사 앞부분에 약간의 가산점)
+    matrix = np.zeros((len(sentences), len(vocabulary)))
+    for row, terms in enumerate(sentence_terms):
+        for term, n in Counter(terms).items():
+            matrix[row, position[term]] = n * idf[position[term]]
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix = np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+    similarity = matrix @ matrix.T
+    np.fill_diagonal(similarity, 0)
+    ranks = textrank(similarity) * (1 + 0.2 / (1 + np.arange(len(sentences))))
+    chosen, used = [], 0
+    for i in np.argsort(-ranks):
+        if len(chosen) == summary_sentences:
+            break
+        if chosen and used + len(sentences[i]) > summary_chars:
+            continue
+        chosen.append(i)
+        used += len(sentences[i])
+    result.summary = " ".join(sentences[i] for i in sorted(chosen))
+    return result
+
+
+@tracks_article
+def content_insights(text, analysis, image_b64=None, stream=False, on_error=None, **options):
+    # 로컬 분석 결과를 바탕으로 서술형 추가 분석만 모델에 맡긴다
+    keywords = ", ".join(keyword.keyword for keyword in analysis.keywords)
+    prompt = f"""
+    위 원문을 로컬에서 분석한 결과는 다음과 같습니다.
+    - 핵심 키워드: {keywords}
+    - 요약: {analysis.summary}
+
+    키워드와 요약은 반복하지 말고 다음 추가 분석만 작성해주세요:
+    - 글의 톤과 스타일:
+    - 주요 논점:
+    - 데이터/통계 정보:
+    """
+    return run_task("content_analysis", prompt, image_b64, stream, on_error, prefix=article_prefix(text), **options)
@@ -0,0 +1,53 @@
+import threading
+import time
+from collections import deque
+
+# 최근 호출의 지연 시간 기록 (프로세스 전역, 메모리 한정)
+# 스트리밍 도입 이후 사용자 체감 지연의 기준은 첫 토큰까지의 시간(TTFT)이다.
+MAX_SAMPLES = 1000
+
+_samples = deque(maxlen=MAX_SAMPLES)
+_lock = threading.Lock()
+
+
+def record_latency(model_id, ttft_ms, total_ms, streamed, task=None):
+    sample = {
+        "timestamp": time.time(),
+        "task": task,
+        "model_id": model_id,
+        "ttft_ms": ttft_ms,
+        "total_ms": total_ms,
+        "streamed": streamed,
+    }
+    with _lock:
+        _samples.append(sample)
+    return sample
+
+
+def recent_samples(task=None):
+    with _lock:
+        samples = list(_samples)
+    if task is not None:
+        samples = [s for s in samples if s["task"] == task]
+    return samples
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, int(round(q / 100 * len(values) + 0.5)) - 1))
+    return values[index]
+
+
+def latency_summary(task=None):
+    samples = recent_samples(task)
+    ttft = [s["ttft_ms"] for s in samples if s["ttft_ms"] is not None]
+    total = [s["total_ms"] for s in samples]
+    return {
+        "count": len(samples),
+        "ttft_p50_ms": percentile(ttft, 50),
+        "ttft_p95_ms": percentile(ttft, 95),
+        "total_p50_ms": percentile(total, 50),
+        "total_p95_ms": percentile(total, 95),
+    }
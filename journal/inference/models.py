@@ -0,0 +1,116 @@
+import dataclasses
+import os
+from dataclasses import dataclass
+
+from botocore.exceptions import ConnectTimeoutError, ReadTimeoutError
+
+from .ratelimit import is_throttling_error
+
+# 모델 목록과 작업별 라우팅
+# 작업마다 지연/비용 등급 (tier) 이 있고, 등급별 기본 모델을 쓴다 (화면에서 "자동").
+# 화면에서 모델을 고르면 모든 작업에 그 모델을 쓴다.
+# 기본 모델이 스로틀링되거나 제한 시간 안에 응답하지 않으면 fallback 으로 지정된 더 작은 모델로 넘어간다.
+# 프롬프트 캐시를 지원하는 모델은 cache_min_tokens 이상인 고정 앞부분에 캐시 지점 (cachePoint) 을 둔다.
+# Bedrock 문서에 정식 지원으로 나온 모델만 켠다 (Claude 3.5 Sonnet v2 는 미리보기 때만 지원되어 끈다).
+
+
+@dataclass(frozen=True)
+class Model:
+    key: str
+    label: str
+    model_id: str
+    fallback: str = None  # 스로틀링/시간 초과 시 넘어갈 모델 key
+    cache_min_tokens: int = None  # 프롬프트 캐시 지점당 최소 토큰 수 (None 이면 캐시 미지원)
+
+
+MODELS = {
+    model.key: model
+    for model in [
+        Model("claude-3-5-sonnet", "Claude 3.5 Sonnet", "us.anthropic.claude-3-5-sonnet-20241022-v2:0",
+              fallback="claude-3-5-haiku"),
+        Model("claude-3-sonnet", "Claude 3 Sonnet", "us.anthropic.claude-3-sonnet-20240229-v1:0",
+              fallback="claude-3-haiku"),
+        Model("claude-3-5-haiku", "Claude 3.5 Haiku", "us.anthropic.claude-3-5-haiku-20241022-v1:0",
+              fallback="claude-3-haiku", cache_min_tokens=2048),
+        Model("claude-3-haiku", "Claude 3 Haiku", "us.anthropic.claude-3-haiku-20240307-v1:0"),
+        Model("nova-pro", "Nova Pro", "us.amazon.nova-pro-v1:0", fallback="nova-lite", cache_min_tokens=1000),
+        Model("nova-lite", "Nova Lite", "us.amazon.nova-lite-v1:0", fallback="nova-micro", cache_min_tokens=1000),
+        Model("nova-micro", "Nova Micro", "us.amazon.nova-micro-v1:0", cache_min_tokens=1000),
+    ]
+}
+MODELS_BY_ID = {model.model_id: model for model in MODELS.values()}
+
+# 등급별 기본 모델 (BEDROCK_QUALITY_MODEL 처럼 환경 변수로 바꿀 수 있다)
+TIER_MODELS = {
+    "quality": os.environ.get("BEDROCK_QUALITY_MODEL", "claude-3-5-sonnet"),  # 긴 글 작성, 팩트 체크
+    "balanced": os.environ.get("BEDROCK_BALANCED_MODEL", "claude-3-5-haiku"),  # 맞춤법, 키워드
+    "fast": os.environ.get("BEDROCK_FAST_MODEL", "claude-3-haiku"),  # SEO 제목 등 짧은 출력
+}
+TIERS = list(TIER_MODELS)
+
+AUTO = "auto"
+MODEL_CHOICES = [AUTO] + list(MODELS)
+
+# 기본 모델에서 스로틀링을 몇 번 겪으면 작은 모델로 넘어갈지
+FALLBACK_AFTER_THROTTLES = int(os.environ.get("BEDROCK_FALLBACK_AFTER", "2"))
+FALLBACK_ERROR_CODES = {"ModelNotReadyException", "ServiceUnavailableException", "ModelTimeoutException"}
+
+# BEDROCK_PROMPT_CACHE=0 이면 캐시 지점을 넣지 않는다
+PROMPT_CACHE_ENABLED = os.environ.get("BEDROCK_PROMPT_CACHE", "1") != "0"
+
+
+def get_model(key):
+    try:
+        return MODELS[key]
+    except KeyError:
+        raise ValueError(f"알 수 없는 모델: {key}") from None
+
+
+def tier_model_id(tier):
+    return get_model(TIER_MODELS[tier]).model_id
+
+
+def model_label(key):
+    return "자동 (작업별 추천)" if key == AUTO else get_model(key).label
+
+
+def model_name(model_id):
+    model = MODELS_BY_ID.get(model_id)
+    return model.label if model else model_id
+
+
+def selected_model_id(key):
+    # 화면 선택값 -> InferenceRequest.model_id (자동이면 None: 작업 등급의 기본 모델)
+    return None if key in (None, AUTO) else get_model(key).model_id
+
+
+def cache_min_tokens(model_id):
+    # 이 모델에서 캐시 지점을 둘 수 있는 최소 앞부분 토큰 수 (캐시를 쓰지 않으면 None)
+    model = MODELS_BY_ID.get(model_id)
+    if not PROMPT_CACHE_ENABLED or model is None:
+        return None
+    return model.cache_min_tokens
+
+
+def fallback_model_id(model_id):
+    model = MODELS_BY_ID.get(model_id)
+    if model is None or model.fallback is None:
+        return None
+    return get_model(model.fallback).model_id
+
+
+def should_fall_back(e):
+    if isinstance(e, (ReadTimeoutError, ConnectTimeoutError)):
+        return True
+    code = (getattr(e, "response", None) or {}).get("Error", {}).get("Code")
+    return is_throttling_error(e) or code in FALLBACK_ERROR_CODES
+
+
+def fallback_request(request, e):
+    # 같은 요청을 더 작은 모델로 보낼 InferenceRequest (넘어갈 수 없으면 None)
+    if not request.allow_fallback or not should_fall_back(e):
+        return None
+    fallback = fallback_model_id(request.resolved_model_id)
+    if fallback is None:
+        return None
+    return dataclasses.replace(request, model_id=fallback)
@@ -0,0 +1,83 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+
+from .cancel import CancelToken
+from .tasks import get_task
+from .tools import analyze_data, check_facts, check_grammar, generate_seo_title
+
+# "전체 분석" 에서 동시에 실행하는 작업들
+ANALYSIS_TASKS = {
+    "fact_check": check_facts,
+    "data_analysis": analyze_data,
+    "grammar": check_grammar,
+    "seo_title": generate_seo_title,
+}
+
+
+@dataclass
+class TaskResult:
+    task: str
+    label: str
+    text: str = None
+    error: Exception = None
+    elapsed_ms: float = None
+    timed_out: bool = False
+
+    @property
+    def ok(self):
+        return self.error is None and not self.timed_out
+
+
+def _timed(fn, text, image_b64, options, token):
+    start = time.perf_counter()
+    result = fn(text, image_b64, cancel_token=token, **options)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def run_all(text, image_b64=None, tasks=None, timeouts=None, **options):
+    # 여러 분석을 동시에 실행하고 끝나는 순서대로 TaskResult 를 내보낸다.
+    # 전체 소요 시간은 합이 아니라 가장 느린 작업 하나 정도가 된다.
+    # 작업별 제한 시간을 넘기면 그 호출을 취소하고 timed_out 결과를 내보낸 뒤 나머지는 계속 기다린다.
+    # options 의 cancel_token 이 취소되거나 소비자가 중간에 그만두면 남은 호출도 모두 취소한다.
+    tasks = list(tasks or ANALYSIS_TASKS)
+    timeouts = timeouts or {}
+    parent = options.pop("cancel_token", None)
+    start = time.monotonic()
+    executor = ThreadPoolExecutor(max_workers=len(tasks), thread_name_prefix="analysis")
+    tokens = {}
+    try:
+        pending = {}
+        for name in tasks:
+            tokens[name] = CancelToken(parent=parent)
+            future = executor.submit(_timed, ANALYSIS_TASKS[name], text, image_b64, options, tokens[name])
+            pending[future] = (name, start + timeouts.get(name, get_task(name).timeout))
+
+        while pending:
+            next_deadline = min(deadline for _, deadline in pending.values())
+            done, _ = wait(pending, timeout=max(0.0, next_deadline - time.monotonic()),
+                           return_when=FIRST_COMPLETED)
+            for future in done:
+                name, _ = pending.pop(future)
+                label = get_task(name).label
+                try:
+                    result, elapsed_ms = future.result()
+                    yield TaskResult(name, label, text=result, elapsed_ms=elapsed_ms)
+                except Exception as e:
+                    # 일부 작업이 실패해도 나머지 결과는 그대로 보여준다
+                    yield TaskResult(name, label, error=e,
+                                     elapsed_ms=(time.monotonic() - start) * 1000)
+
+            now = time.monotonic()
+            for future, (name, deadline) in list(pending.items()):
+                if now >= deadline:
+                    del pending[future]
+                    future.cancel()
+                    tokens[name].cancel()
+                    yield TaskResult(name, get_task(name).label, timed_out=True,
+                                     elapsed_ms=(now - start) * 1000)
+    finally:
+        # 남은 호출을 취소하고 기다리지 않고 스크립트 스레드를 돌려준다
+        for token in tokens.values():
+            token.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
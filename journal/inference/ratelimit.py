@@ -0,0 +1,276 @@
+import os
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+
+from .cancel import POLL_INTERVAL, CallCancelled, call_cancellable
+
+# 프로세스 전역 Bedrock 요청 제한기
+# - 분당 요청 수(RPM)와 분당 토큰 수(TPM) 토큰 버킷
+# - 세션별 대기열을 라운드 로빈으로 처리해서 한 세션(예: 일괄 처리)이 다른 사용자를 굶기지 않게 한다
+# - ThrottlingException 이 오면 허용 속도를 절반으로 줄이고 (AIMD), 성공할 때마다 조금씩 회복한다
+# - 스로틀링된 호출은 지수 백오프 + 지터 후 대기열 맨 뒤로 다시 들어간다
+REQUESTS_PER_MINUTE = int(os.environ.get("BEDROCK_RPM", "100"))
+TOKENS_PER_MINUTE = int(os.environ.get("BEDROCK_TPM", "400000"))
+BURST_SECONDS = 10.0
+MAX_ATTEMPTS = int(os.environ.get("BEDROCK_THROTTLE_RETRIES", "6"))
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 20.0
+
+THROTTLING_ERROR_CODES = {
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "ServiceUnavailableException",
+    "ModelNotReadyException",
+}
+
+
+class TokenBucket:
+    def __init__(self, per_minute, burst_seconds=BURST_SECONDS):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now, scale):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate * scale)
+        self.updated = now
+
+    def wait_time(self, amount, now, scale=1.0):
+        self._refill(now, scale)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / (self.rate * scale)
+
+    def take(self, amount):
+        # 예상치가 용량보다 커도 한 번은 통과시키고 빚으로 남긴다
+        self.tokens -= amount
+
+    def give(self, amount):
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class Ticket:
+    __slots__ = ("session_id", "tokens")
+
+    def __init__(self, session_id, tokens):
+        self.session_id = session_id
+        self.tokens = tokens
+
+
+class RateLimiter:
+    def __init__(self, requests_per_minute=REQUESTS_PER_MINUTE, tokens_per_minute=TOKENS_PER_MINUTE,
+                 burst_seconds=BURST_SECONDS):
+        self._requests = TokenBucket(requests_per_minute, burst_seconds) if requests_per_minute else None
+        self._tokens = TokenBucket(tokens_per_minute, burst_seconds) if tokens_per_minute else None
+        self._queues = OrderedDict()  # session_id -> deque[Ticket], 맨 앞 세션이 다음 차례
+        self._cond = threading.Condition()
+        self.scale = 1.0  # 스로틀링에 따라 줄어드는 허용 속도 비율
+        self.throttled = 0
+        self.granted = 0
+
+    def _position(self, ticket):
+        # 라운드 로빈 순서에서 앞에 있는 요청 수
+        queues = list(self._queues.values())
+        position, depth = 0, 0
+        while True:
+            active = False
+            for queue in queues:
+                if depth < len(queue):
+                    active = True
+                    if queue[depth] is ticket:
+                        return position
+                    position += 1
+            if not active:
+                return position
+            depth += 1
+
+    def _wait_time(self, tokens, now):
+        wait = 0.0
+        if self._requests is not None:
+            wait = max(wait, self._requests.wait_time(1, now, self.scale))
+        if self._tokens is not None:
+            wait = max(wait, self._tokens.wait_time(tokens, now, self.scale))
+        return wait
+
+    def acquire(self, session_id=None, tokens=0, on_queue=None, cancel_token=None):
+        ticket = Ticket(session_id or "default", tokens)
+        if self._requests is None and self._tokens is None:
+            return ticket
+
+        with self._cond:
+            self._queues.setdefault(ticket.session_id, deque()).append(ticket)
+        last_position = None
+        served = False
+        try:
+            while True:
+                with self._cond:
+                    position = self._position(ticket)
+                    wait = self._wait_time(tokens, time.monotonic())
+                    if position == 0 and wait == 0:
+                        if self._requests is not None:
+                            self._requests.take(1)
+                        if self._tokens is not None:
+                            self._tokens.take(tokens)
+                        self.granted += 1
+                        served = True
+                        self._remove(ticket, served)
+                        self._cond.notify_all()
+                        break
+                    report = on_queue is not None and position != last_position
+                    if not report:
+                        timeout = max(wait, 0.05) if position == 0 else 1.0
+                        if cancel_token is not None:
+                            # 취소되면 대기열에서 빠진다 (finally)
+                            cancel_token.check()
+                            timeout = min(timeout, POLL_INTERVAL)
+                        self._cond.wait(timeout=timeout)
+                if report:
+                    # 화면 갱신 콜백은 느릴 수 있으므로 잠금을 놓고 부른다 (다른 세션의 acquire/release 를 막지 않게)
+                    on_queue(position, wait)
+                    last_position = position
+        finally:
+            if not served:
+                with self._cond:
+                    self._remove(ticket, served)
+                    self._cond.notify_all()
+
+        if on_queue and last_position is not None:
+            on_queue(None, 0)
+        return ticket
+
+    def _remove(self, ticket, served):
+        queue = self._queues[ticket.session_id]
+        queue.remove(ticket)
+        if not queue:
+            del self._queues[ticket.session_id]
+        elif served:
+            # 차례를 쓴 세션은 맨 뒤로
+            self._queues.move_to_end(ticket.session_id)
+
+    def release(self, ticket, used_tokens=None):
+        # 예약한 토큰과 실제 사용량의 차이를 정산한다 (None 이면 전부 돌려준다)
+        if self._tokens is None:
+            return
+        with self._cond:
+            self._tokens.give(ticket.tokens - (used_tokens or 0))
+            self._cond.notify_all()
+
+    def report_throttle(self):
+        with self._cond:
+            self.throttled += 1
+            self.scale = max(0.1, self.scale * 0.5)
+
+    def report_success(self):
+        with self._cond:
+            self.scale = min(1.0, self.scale + 0.05)
+
+    def queue_length(self):
+        with self._cond:
+            return sum(len(q) for q in self._queues.values())
+
+    def stats(self):
+        with self._cond:
+            return {
+                "queued": sum(len(q) for q in self._queues.values()),
+                "granted": self.granted,
+                "throttled": self.throttled,
+                "scale": self.scale,
+            }
+
+
+def is_throttling_error(e):
+    code = (getattr(e, "response", None) or {}).get("Error", {}).get("Code")
+    return code in THROTTLING_ERROR_CODES
+
+
+def backoff_delay(attempt):
+    # 지수 백오프 + full jitter
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+def estimate_tokens(converse_request):
+    # Bedrock 은 요청 시작 시 입력 토큰 + maxTokens 를 할당량에서 예약한다
+    chars = sum(len(block.get("text", "")) for block in converse_request.get("system", []))
+    for message in converse_request["messages"]:
+        for block in message["content"]:
+            chars += len(block.get("text", ""))
+            if "image" in block:
+                chars += 3000  # 이미지 한 장 대략 1,500 토큰
+    max_tokens = converse_request.get("inferenceConfig", {}).get("maxTokens", 0)
+    return chars // 2 + max_tokens
+
+
+def call_with_rate_limit(call, converse_request, session_id=None, on_queue=None, max_attempts=None,
+                         cancel_token=None, on_abandoned=None):
+    # 제한기를 통과한 뒤 call() 을 실행한다. 스로틀링이면 백오프 후 다시 줄을 선다.
+    # 호출자는 끝난 뒤 반드시 limiter.release(ticket, 실제 토큰 수) 를 호출해야 한다.
+    # cancel_token 이 있으면 대기열, 백오프, 응답 대기 중 어디서든 취소/마감 시 CallCancelled 를 올린다.
+    # 응답을 기다리다 취소된 호출은 스레드에서 끝까지 돌아 과금되므로, 그 예약은 호출이 실제로 끝날 때 정산하고
+    # 늦게 도착한 결과는 on_abandoned(result) 로 정리한다
+    limiter = get_rate_limiter()
+    tokens = estimate_tokens(converse_request)
+    max_attempts = max_attempts or MAX_ATTEMPTS
+    for attempt in range(max_attempts):
+        ticket = limiter.acquire(session_id, tokens, on_queue, cancel_token)
+        try:
+            if cancel_token is None:
+                response = call()
+            else:
+                response = call_cancellable(call, cancel_token, lambda future: settle_abandoned(
+                    limiter, ticket, future, on_abandoned))
+        except CallCancelled:
+            raise
+        except Exception as e:
+            limiter.release(ticket)
+            if not is_throttling_error(e) or attempt == max_attempts - 1:
+                raise
+            limiter.report_throttle()
+            delay = backoff_delay(attempt)
+            if on_queue:
+                on_queue(None, delay)
+            if cancel_token is None:
+                time.sleep(delay)
+            else:
+                cancel_token.sleep(delay)
+            continue
+        limiter.report_success()
+        return response, ticket
+
+
+def settle_abandoned(limiter, ticket, future, on_abandoned=None):
+    # 취소된 호출이 끝났을 때 (호출 스레드에서) 불린다. 시작하지 않았거나 실패했으면 예약을 모두 돌려주고,
+    # 끝까지 돌았으면 사용량만큼 (알 수 없으면 (스트림) 예약 전부) 쓴 것으로 정산한다
+    if future.cancelled() or future.exception() is not None:
+        limiter.release(ticket)
+        return
+    result = future.result()
+    try:
+        if on_abandoned is not None:
+            on_abandoned(result)
+    finally:
+        limiter.release(ticket, (result.get("usage") or {}).get("totalTokens", ticket.tokens))
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = RateLimiter()
+    return _limiter
+
+
+def configure_rate_limiter(requests_per_minute=REQUESTS_PER_MINUTE, tokens_per_minute=TOKENS_PER_MINUTE,
+                           burst_seconds=BURST_SECONDS):
+    # 부하 테스트 등에서 전역 제한기를 교체할 때 사용 (0 이면 제한 없음)
+    global _limiter
+    with _limiter_lock:
+        _limiter = RateLimiter(requests_per_minute, tokens_per_minute, burst_seconds)
+    return _limiter
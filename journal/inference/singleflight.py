@@ -0,0 +1,172 @@
+import os
+import threading
+from dataclasses import replace
+
+from .cache import cache_key
+from .cancel import POLL_INTERVAL, CancelToken
+
+# 같은 요청 합치기 (single-flight)
+# 같은 글을 여러 사람이 몇 초 사이에 검사/분석하면 (모델, 프롬프트, 이미지 해시, toolConfig) 가 같은 호출이 동시에 생긴다.
+# 진행 중인 같은 호출이 있으면 새로 호출하지 않고 그 호출에 합류해서 스트림 조각까지 함께 받는다.
+# 호출은 처음 요청한 쪽이 아니라 별도 스레드 (생산자) 에서 하므로, 먼저 요청한 사람이 화면을 떠나도
+# 합류한 사람은 끝까지 받는다. 받는 사람이 모두 떠나면 호출도 취소한다.
+# 매번 다른 결과를 기대하는 작업 (use_cache=False, 예: 다시 쓰기 후보) 은 합치지 않는다.
+SINGLE_FLIGHT_ENABLED = os.environ.get("BEDROCK_SINGLE_FLIGHT", "1") != "0"
+
+
+def flight_key(converse_request):
+    # 응답 캐시와 같은 키 (toolConfig 까지 들어 있어서 도구 정의가 다른 구조화 출력 호출은 합치지 않는다)
+    return cache_key(converse_request)
+
+
+class Flight:
+    # 진행 중인 호출 하나. 생산자가 조각과 최종 응답을 올리고 구독자들이 각자 스레드에서 따라 읽는다
+
+    def __init__(self, timeout):
+        self.chunks = []
+        self.response = None
+        self.error = None
+        self.done = False
+        self.queue = None  # 생산자의 대기열 상태 (순서, 예상 대기 초)
+        self.queue_updates = 0
+        self.subscribers = 0
+        self.token = CancelToken(timeout)
+        self._changed = threading.Condition()
+
+    def publish(self, chunk):
+        with self._changed:
+            self.chunks.append(chunk)
+            self._changed.notify_all()
+
+    def report_queue(self, position, wait):
+        # 생산자 스레드에서 불린다. 구독자는 자기 스레드에서 각자의 on_queue 로 전달한다 (Streamlit 화면 갱신 등)
+        with self._changed:
+            self.queue = (position, wait)
+            self.queue_updates += 1
+            self._changed.notify_all()
+
+    def finish(self, response=None, error=None):
+        with self._changed:
+            self.response = response
+            self.error = error
+            self.done = True
+            self._changed.notify_all()
+
+    def follow(self, token, on_queue=None):
+        # 처음 조각부터 차례로 내보내고, 끝나면 최종 응답을 돌려준다 (StopIteration.value).
+        # 기다리는 중에도 구독자 자신의 토큰이 취소/마감되면 바로 CallCancelled 로 풀려난다
+        sent, queue_seen = 0, 0
+        while True:
+            with self._changed:
+                while sent == len(self.chunks) and not self.done and self.queue_updates == queue_seen:
+                    token.check()
+                    self._changed.wait(POLL_INTERVAL)
+                chunks = self.chunks[sent:]
+                done = self.done and sent + len(chunks) == len(self.chunks)
+                queue, queue_updates = self.queue, self.queue_updates
+            if on_queue and queue_updates != queue_seen:
+                on_queue(*queue)
+            queue_seen = queue_updates
+            for chunk in chunks:
+                sent += 1
+                yield chunk
+            if done:
+                if self.error is not None:
+                    raise self.error
+                return self.response
+
+
+class SingleFlight:
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.started = 0  # 실제로 한 호출 수
+        self.joined = 0  # 진행 중인 같은 호출에 합류해서 따로 호출하지 않은 수 (아낀 호출)
+        self.saved_tokens = 0  # 합류한 요청이 따로 호출했으면 썼을 토큰
+
+    def run(self, key, produce, timeout, token, on_queue=None):
+        # produce(token, on_queue) 는 조각을 내보내고 InferenceResponse 를 돌려주는 제너레이터.
+        # 같은 key 의 호출이 진행 중이면 합류하고, 아니면 생산자 스레드에서 새로 시작한다.
+        # 조각을 내보내고 응답을 돌려준다. 합류한 쪽의 응답은 shared=True, 사용량 없음 (비용이 들지 않았다)
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = Flight(timeout)
+                self._flights[key] = flight
+                self.started += 1
+            else:
+                self.joined += 1
+            flight.subscribers += 1
+        if leader:
+            threading.Thread(target=self._produce, args=(key, flight, produce),
+                             name="bedrock-flight", daemon=True).start()
+        try:
+            response = yield from flight.follow(token, on_queue)
+        finally:
+            self._leave(key, flight)
+        if leader:
+            return response
+        with self._lock:
+            self.saved_tokens += (response.usage or {}).get("totalTokens") or 0
+        return replace(response, usage={}, cached=True, shared=True)
+
+    def call(self, key, produce, timeout, token, on_queue=None):
+        # run() 의 조각은 버리고 응답만 받는다 (비스트리밍 호출용)
+        flight = self.run(key, produce, timeout, token, on_queue)
+        while True:
+            try:
+                next(flight)
+            except StopIteration as stop:
+                return stop.value
+
+    def _produce(self, key, flight, produce):
+        try:
+            chunks = produce(flight.token, flight.report_queue)
+            while True:
+                try:
+                    flight.publish(next(chunks))
+                except StopIteration as stop:
+                    flight.finish(response=stop.value)
+                    break
+        except Exception as e:
+            flight.finish(error=e)
+        finally:
+            # 끝난 호출의 결과는 응답 캐시가 이어받는다
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+
+    def _leave(self, key, flight):
+        with self._lock:
+            flight.subscribers -= 1
+            if flight.subscribers == 0 and not flight.done:
+                # 받을 사람이 없으면 호출을 취소하고, 뒤에 온 같은 요청은 새로 시작한다
+                flight.token.cancel()
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+
+    def stats(self):
+        with self._lock:
+            requests = self.started + self.joined
+            return {
+                "in_flight": len(self._flights),
+                "started": self.started,
+                "joined": self.joined,
+                "saved_tokens": self.saved_tokens,
+                "saved_rate": self.joined / requests if requests else 0.0,
+            }
+
+
+_single_flight = None
+_single_flight_lock = threading.Lock()
+
+
+def get_single_flight():
+    global _single_flight
+    if _single_flight is None:
+        with _single_flight_lock:
+            if _single_flight is None:
+                _single_flight = SingleFlight()
+    return _single_flight
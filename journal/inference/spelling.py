@@ -0,0 +1,167 @@
+import re
+from dataclasses import dataclass, field
+
+from .structured import Correction
+
+# 로컬 맞춤법 사전 검사 (모델 호출 없음)
+# 띄어쓰기, 자주 틀리는 표기 (되/돼, 안/않 등), 겹친 조사처럼 기계적으로 찾을 수 있는 오류를 찾는다.
+# 틀린 표기 사전은 트라이로 한 번에 훑고, 나머지는 정규식 규칙으로 찾는다.
+# 바로 고치는 것은 어절 전체가 사전의 틀린 표기와 정확히 같을 때뿐이다 (auto=True 항목).
+# 어절 일부만 사전에 걸리거나 정규식 규칙에 걸린 곳은 맞는 말일 수도 있어 (물가가, 단지 안은 등)
+# 고치지 않고 제안만 하며, 기자가 받아들인 제안만 apply_corrections 로 반영한다.
+
+
+def _syllables(*finals):
+    # 받침 (종성 번호) 이 finals 중 하나인 한글 음절 전부
+    return "".join(chr(0xAC00 + i) for i in range(11172) if i % 28 in finals)
+
+
+RIEUL = _syllables(8)  # ㄹ 받침 (할, 갈, 볼 ...)
+NIEUN_RIEUL = _syllables(4, 8)  # ㄴ/ㄹ 받침 (하는, 한, 할 ...)
+
+# 틀린 표기 -> (바른 표기, 이유, 분류, 자동 수정 여부)
+WORD_FIXES = {
+    "됬": ("됐", "'되었'의 준말은 '됐'", "맞춤법", True),
+    "됬다": ("됐다", "'되었다'의 준말은 '됐다'", "맞춤법", True),
+    "됬습니다": ("됐습니다", "'되었습니다'의 준말은 '됐습니다'", "맞춤법", True),
+    "됬어요": ("됐어요", "'되었어요'의 준말은 '됐어요'", "맞춤법", True),
+    "되요": ("돼요", "'되어요'의 준말은 '돼요'", "맞춤법", True),
+    "되서": ("돼서", "'되어서'의 준말은 '돼서'", "맞춤법", True),
+    "되야": ("돼야", "'되어야'의 준말은 '돼야'", "맞춤법", True),
+    "돼었": ("되었", "'되-' 뒤에 '-었-'", "맞춤법", True),
+    "돼어": ("되어", "'되-' 뒤에 '-어'", "맞춤법", True),
+    "돼는": ("되는", "'되-' 뒤에 '-는'", "맞춤법", True),
+    "돼고": ("되고", "'되-' 뒤에 '-고'", "맞춤법", True),
+    "돼면": ("되면", "'되-' 뒤에 '-면'", "맞춤법", True),
+    "안되요": ("안 돼요", "부정 부사 '안'은 띄어 쓰고 '되어요'는 '돼요'", "맞춤법", True),
+    "안됬": ("안 됐", "부정 부사 '안'은 띄어 쓰고 '되었'은 '됐'", "맞춤법", True),
+    "않되": ("안 되", "용언 앞의 부정 부사는 '안'", "맞춤법", True),
+    "않돼": ("안 돼", "용언 앞의 부정 부사는 '안'", "맞춤법", True),
+    "금새": ("금세", "'금시에'의 준말", "맞춤법", True),
+    "웬지": ("왠지", "'왜인지'의 준말", "맞춤법", True),
+    "왠일": ("웬일", "'어찌 된'의 뜻은 '웬'", "맞춤법", True),
+    "왠만": ("웬만", "'웬만하다'", "맞춤법", True),
+    "역활": ("역할", "표준어는 '역할'", "맞춤법", True),
+    "설겆이": ("설거지", "표준어는 '설거지'", "맞춤법", True),
+    "희안하": ("희한하", "표준어는 '희한하다'", "맞춤법", True),
+    "일일히": ("일일이", "'-이'로 끝나는 부사", "맞춤법", True),
+    "깨끗히": ("깨끗이", "'-이'로 끝나는 부사", "맞춤법", True),
+    "오랫만": ("오랜만", "'오래간만'의 준말", "맞춤법", True),
+    "할께": ("할게", "어미 '-ㄹ게'는 예사소리로 적는다", "맞춤법", True),
+    "할려고": ("하려고", "어미는 '-려고'", "맞춤법", True),
+    "어떻해": ("어떡해", "'어떻게 해'의 준말", "맞춤법", True),
+    "뵈요": ("봬요", "'뵈어요'의 준말", "맞춤법", True),
+    "내노라": ("내로라", "표준어는 '내로라하다'", "맞춤법", True),
+    "되물림": ("대물림", "표준어는 '대물림'", "맞춤법", True),
+    "어의없": ("어이없", "표준어는 '어이없다'", "맞춤법", True),
+    "설레임": ("설렘", "'설레다'의 명사형", "맞춤법", True),
+    "헷깔": ("헷갈", "표준어는 '헷갈리다'", "맞춤법", True),
+    "육계장": ("육개장", "표준어는 '육개장'", "맞춤법", True),
+    "있슴": ("있음", "명사형 어미는 '-음'", "맞춤법", True),
+    "없슴": ("없음", "명사형 어미는 '-음'", "맞춤법", True),
+    "구지": ("굳이", "부사 '굳이'일 수 있음", "맞춤법", False),
+    "바램": ("바람", "'바라다'의 명사형이면 '바람'", "맞춤법", False),
+    "문안하": ("무난하", "'무난하다'의 뜻이면 '무난하'", "맞춤법", False),
+}
+
+# (정규식, 바꿀 형태, 이유, 분류). 규칙에 걸린 곳은 모두 제안이다
+RULES = [
+    (rf"([{RIEUL}])수\s?(있|없)", r"\1 수 \2", "의존 명사 '수'는 띄어 쓴다", "띄어쓰기"),
+    (rf"([{RIEUL}]) 수(있|없)", r"\1 수 \2", "'수' 뒤의 용언은 띄어 쓴다", "띄어쓰기"),
+    (rf"(?!별것|날것)([{NIEUN_RIEUL}])것", r"\1 것", "의존 명사 '것'은 띄어 쓴다", "띄어쓰기"),
+    # 단지/부지/반지 안 처럼 '지'로 끝나는 명사 뒤의 '안'은 건너뛴다
+    (r"(?<![단부반택대용처])지\s+안(았|는|고|은|을|아|기)", r"지 않\1", "'-지 않다'는 '않'", "맞춤법"),
+    (r"(?<!\S)않\s?(하|했|되|됐|돼|가|갔|먹|왔|와|보|봤)", r"안 \1", "용언 앞의 부정 부사는 '안'", "맞춤법"),
+    (r"몇\s?일(?=[\s.,!?]|$|째|간|동안|이|은|을|에|부터|까지|만에)", "며칠", "표준어는 '며칠'", "맞춤법"),
+    # 가/도/의 는 명사 끝 글자와 겹치는 일이 많아 (물가가, 습도도, 회의의) 보지 않는다
+    (r"([가-힣])(을|를|는|에|와|과)\2(?=[\s.,!?]|$)", r"\1\2", "조사가 겹쳐 있다", "문법"),
+    (r"(?<!\S)([가-힣]+)\s+\1(?=[\s.,!?]|$)", r"\1", "같은 낱말이 반복된다", "문법"),
+    (r"(?<=\S) {2,}(?=\S)", " ", "공백이 여러 번 들어갔다", "띄어쓰기"),
+    (r" +([.,!?])", r"\1", "문장 부호 앞에는 띄어 쓰지 않는다", "띄어쓰기"),
+    (r"(?<=[가-힣])([.!?])(?=[가-힣])", r"\1 ", "문장 부호 뒤에는 띄어 쓴다", "띄어쓰기"),
+]
+COMPILED_RULES = [(re.compile(pattern), *rest) for pattern, *rest in RULES]
+
+
+def _build_trie(words):
+    root = {}
+    for word, fix in words.items():
+        node = root
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[None] = word
+    return root
+
+
+def _trie_pattern(node):
+    # 트라이를 그대로 정규식으로 옮긴다. 끝나는 지점 뒤의 가지는 선택 (탐욕적) 이라 가장 긴 표기가 잡힌다
+    branches = [re.escape(ch) + _trie_pattern(child) for ch, child in node.items() if ch is not None]
+    if not branches:
+        return ""
+    pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if None in node:
+        pattern = "(?:" + pattern + ")?"
+    return pattern
+
+
+TRIE = _build_trie(WORD_FIXES)
+TRIE_PATTERN = re.compile(_trie_pattern(TRIE))
+
+
+@dataclass
+class SpellingResult:
+    text: str  # 자동 수정을 반영한 텍스트
+    corrections: list = field(default_factory=list)  # 적용한 수정 (Correction, 원문 위치 기준)
+    flags: list = field(default_factory=list)  # 제안 (고치지 않음, 받아들이면 apply_corrections 로 반영)
+
+
+def _is_token(text, start, end):
+    # text[start:end] 가 어절 하나 전체인지 (앞뒤가 글자/숫자가 아님)
+    return (start == 0 or not text[start - 1].isalnum()) and (end == len(text) or not text[end].isalnum())
+
+
+def _dictionary_matches(text):
+    # 사전 트라이에서 만든 정규식으로 가장 긴 틀린 표기를 찾는다. 어절 일부에만 걸리면 제안으로 돌린다
+    matches = []
+    for match in TRIE_PATTERN.finditer(text):
+        fixed, reason, category, auto = WORD_FIXES[match.group()]
+        auto = auto and _is_token(text, match.start(), match.end())
+        matches.append((match.start(), match.end(), fixed, reason, category, auto))
+    return matches
+
+
+def _rule_matches(text):
+    for pattern, replacement, reason, category in COMPILED_RULES:
+        for match in pattern.finditer(text):
+            yield match.start(), match.end(), match.expand(replacement), reason, category, False
+
+
+def apply_corrections(text, corrections):
+    # 원문 위치 기준의 수정들을 한 번에 반영한다 (겹치면 앞의 것만)
+    pieces, cursor = [], 0
+    for correction in sorted(corrections, key=lambda c: c.start):
+        if correction.start < cursor:
+            continue
+        pieces.append(text[cursor:correction.start])
+        pieces.append(correction.corrected)
+        cursor = correction.end
+    pieces.append(text[cursor:])
+    return "".join(pieces)
+
+
+def check_spelling(text):
+    matches = _dictionary_matches(text) + list(_rule_matches(text))
+    # 겹치면 먼저 시작하고 더 긴 것을 남긴다
+    matches.sort(key=lambda m: (m[0], m[0] - m[1]))
+
+    corrections, flags, cursor = [], [], 0
+    for start, end, fixed, reason, category, auto in matches:
+        if start < cursor:
+            continue
+        original = text[start:end]
+        if fixed == original:
+            continue
+        # 제안끼리는 겹치지 않게 해서 어떤 조합을 받아들여도 그대로 반영할 수 있게 한다
+        (corrections if auto else flags).append(Correction(original, fixed, reason, category, start, end))
+        cursor = end
+    return SpellingResult(text=apply_corrections(text, corrections), corrections=corrections, flags=flags)
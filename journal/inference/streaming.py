@@ -0,0 +1,218 @@
+import logging
+import os
+import time
+
+from .cache import cache_key, get_response_cache
+from .cancel import CallCancelled, iterate_cancellable
+from .client import get_bedrock_client
+from .core import InferenceResponse, invoke
+from .metrics import record_latency
+from .models import fallback_request, model_name
+from .ratelimit import call_with_rate_limit, get_rate_limiter, is_throttling_error
+from .singleflight import SINGLE_FLIGHT_ENABLED, flight_key, get_single_flight
+from .tasks import get_task
+from .usage import record_usage
+
+logger = logging.getLogger(__name__)
+
+# BEDROCK_STREAMING=0 이면 기존 converse (비스트리밍) 경로를 사용한다
+STREAMING_ENABLED = os.environ.get("BEDROCK_STREAMING", "1") != "0"
+
+STREAM_ERROR_EVENTS = (
+    "internalServerException",
+    "modelStreamErrorException",
+    "throttlingException",
+    "validationException",
+    "serviceUnavailableException",
+)
+
+
+# converse_stream 응답을 텍스트 조각 단위로 내보내는 iterable
+# st.write_stream 에 그대로 넘길 수 있고, 스트림이 끝나면 ttft_ms / total_ms / response 에
+# 측정값이 남는다. 첫 토큰 전에 실패하면 비스트리밍 invoke 결과를 한 번에 내보낸다.
+# 캐시 가능한 요청은 응답 캐시를 먼저 조회하고, 끝까지 받은 응답을 캐시에 저장한다.
+# 작업 제한 시간이 지나거나 request.cancel_token 이 취소되면 스트림을 닫고 CallCancelled 로 끝난다.
+# 같은 요청이 이미 스트리밍 중이면 새로 호출하지 않고 그 스트림에 합류한다 (singleflight.py).
+class TextStream:
+
+    def __init__(self, request, client=None, on_error=None):
+        self.request = request
+        self.client = client
+        self.on_error = on_error
+        self.ttft_ms = None
+        self.total_ms = None
+        self.response = None
+        self.streamed = False
+        self.cached = False
+        self.error = None
+        self.fallback_from = None  # 작은 모델로 넘어간 경우 원래 모델
+        self.token = None
+
+    @property
+    def usage(self):
+        return self.response.usage if self.response else None
+
+    def __iter__(self):
+        start = time.perf_counter()
+        self.token = self.request.deadline()
+        try:
+            while STREAMING_ENABLED:
+                try:
+                    yield from self._stream(start)
+                    break
+                except Exception as e:
+                    if self.ttft_ms is not None or isinstance(e, CallCancelled):
+                        raise
+                    # 첫 토큰 전에 스로틀링/시간 초과면 더 작은 모델로 다시 스트리밍한다
+                    fallback = fallback_request(self.request, e)
+                    if fallback is not None:
+                        logger.warning("%s 호출 실패, %s 로 전환: %s",
+                                       self.request.resolved_model_id, fallback.model_id, e)
+                        self.fallback_from = self.fallback_from or self.request.resolved_model_id
+                        self.request = fallback
+                        continue
+                    # 재시도를 다 쓴 스로틀링이면 대체 경로도 소용없다
+                    if is_throttling_error(e):
+                        raise
+                    # 첫 토큰 전에 실패했으면 비스트리밍 경로로 재시도
+                    logger.warning("스트리밍 실패, 일반 호출로 전환: %s", e)
+                    yield from self._fallback(start)
+                    break
+            else:
+                yield from self._fallback(start)
+        except Exception as e:
+            self.error = e
+            if self.on_error is None:
+                raise
+            self.on_error(e)
+        finally:
+            self.total_ms = (time.perf_counter() - start) * 1000
+
+    def _stream(self, start):
+        converse_request = self.request.to_converse()
+        model_id = converse_request["modelId"]
+        key = cache_key(converse_request) if self.request.cacheable else None
+        if key:
+            cached = get_response_cache().get(key)
+            if cached is not None:
+                self.cached = True
+                self.ttft_ms = 0.0
+                self.response = InferenceResponse(text=cached, model_id=model_id,
+                                                  task=self.request.task, cached=True)
+                record_usage(self.request, self.response, ttft_ms=0.0, total_ms=0.0)
+                yield cached
+                return
+
+        def produce(token, on_queue):
+            return stream_chunks(self.request, converse_request, self.client, key, token, on_queue)
+
+        if key and SINGLE_FLIGHT_ENABLED:
+            # 같은 요청이 진행 중이면 그 스트림에 합류해서 지금까지 온 조각부터 함께 받는다
+            chunks = get_single_flight().run(flight_key(converse_request), produce, get_task(self.request.task).timeout,
+                                             self.token, self.request.on_queue)
+        else:
+            chunks = produce(self.token, self.request.on_queue)
+        self.response = yield from self._relay(chunks, start)
+        if self.response.shared:
+            self.cached = True
+            record_usage(self.request, self.response, ttft_ms=self.ttft_ms,
+                         total_ms=(time.perf_counter() - start) * 1000, streamed=True)
+
+    def _relay(self, chunks, start):
+        # 조각을 넘겨주며 이 소비자 기준의 첫 토큰 시간을 잰다. 소비자가 그만두면 chunks 도 닫는다
+        try:
+            while True:
+                try:
+                    chunk = next(chunks)
+                except StopIteration as stop:
+                    return stop.value
+                if self.ttft_ms is None:
+                    self.ttft_ms = (time.perf_counter() - start) * 1000
+                    self.streamed = True
+                yield chunk
+        finally:
+            chunks.close()
+
+    def _fallback(self, start):
+        self.response = invoke(self.request, self.client, self.token)
+        self.cached = self.response.cached
+        self.fallback_from = self.fallback_from or self.response.fallback_from
+        if self.response.text:
+            self.ttft_ms = (time.perf_counter() - start) * 1000
+            yield self.response.text
+
+    def latency_caption(self):
+        if self.response and self.response.shared:
+            return f"진행 중인 같은 요청의 응답을 함께 받음 · 전체 {self.total_ms / 1000:.2f}초"
+        if self.cached:
+            return "캐시된 응답"
+        if self.ttft_ms is None:
+            return ""
+        mode = "스트리밍" if self.streamed else "일반 호출"
+        caption = f"첫 토큰 {self.ttft_ms / 1000:.2f}초 · 전체 {self.total_ms / 1000:.2f}초 ({mode})"
+        if self.fallback_from and self.response:
+            caption += f" · {model_name(self.fallback_from)} 대신 {model_name(self.response.model_id)} 사용"
+        return caption
+
+
+def stream_chunks(request, converse_request, client, key, token, on_queue):
+    # converse_stream 호출 하나: 텍스트 조각을 내보내고, 끝나면 InferenceResponse 를 돌려준다 (StopIteration.value).
+    # 지연 / 사용량 기록과 응답 캐시 저장까지 한다. 합치기가 켜져 있으면 생산자 스레드에서 실행된다
+    start = time.perf_counter()
+    model_id = converse_request["modelId"]
+    read_timeout, max_attempts = request.call_options()
+    client = client or get_bedrock_client(read_timeout=read_timeout)
+    response, ticket = call_with_rate_limit(
+        lambda: client.converse_stream(**converse_request),
+        converse_request,
+        session_id=request.session_id,
+        on_queue=on_queue,
+        max_attempts=max_attempts,
+        cancel_token=token,
+        on_abandoned=lambda abandoned: abandoned["stream"].close(),
+    )
+    chunks = []
+    usage, metrics, stop_reason, ttft_ms = {}, {}, None, None
+    try:
+        for event in iterate_cancellable(response["stream"], token, close=response["stream"].close):
+            if "contentBlockDelta" in event:
+                text = event["contentBlockDelta"]["delta"].get("text")
+                if text:
+                    if ttft_ms is None:
+                        ttft_ms = (time.perf_counter() - start) * 1000
+                    chunks.append(text)
+                    yield text
+            elif "messageStop" in event:
+                stop_reason = event["messageStop"].get("stopReason")
+            elif "metadata" in event:
+                usage = event["metadata"].get("usage") or {}
+                metrics = event["metadata"].get("metrics") or {}
+            else:
+                for name in STREAM_ERROR_EVENTS:
+                    if name in event:
+                        raise RuntimeError(f"{name}: {event[name].get('message')}")
+    finally:
+        # 소비자가 중간에 그만두거나 (GeneratorExit) 취소되면 읽는 쪽이 연결을 닫아 남은 토큰 생성을 더 받지 않는다.
+        # 그때는 사용량을 받지 못하지만 이미 생성된 만큼은 과금되므로 예약은 돌려주지 않는다
+        get_rate_limiter().release(ticket, usage.get("totalTokens", ticket.tokens))
+
+    text = "".join(chunks)
+    total_ms = (time.perf_counter() - start) * 1000
+    result = InferenceResponse(
+        text=text,
+        model_id=model_id,
+        task=request.task,
+        usage=usage,
+        latency_ms=metrics.get("latencyMs", total_ms),
+        stop_reason=stop_reason,
+    )
+    if ttft_ms is not None:
+        record_latency(model_id, ttft_ms, total_ms, streamed=True, task=request.task)
+    record_usage(request, result, ttft_ms=ttft_ms, total_ms=total_ms, streamed=True)
+    if key and text:
+        get_response_cache().set(key, text)
+    return result
+
+
+def invoke_stream(request, client=None, on_error=None):
+    return TextStream(request, client=client, on_error=on_error)
@@ -0,0 +1,276 @@
+import json
+import re
+from dataclasses import asdict, dataclass, field
+
+from .tools import article_prefix, run_task, tracks_article
+
+# 구조화 출력: Bedrock 도구 호출 (toolConfig + JSON 스키마) 로 분석 결과를 정해진 형태로 받는다.
+# 모델이 도구 입력으로 JSON 을 내면 extract_text 가 이를 문자열로 돌려주고 (응답 캐시도 그대로 쓴다),
+# 여기서 관대하게 파싱한 뒤 스키마에 맞지 않는 항목은 버리거나 기본값으로 채운다.
+
+VERDICTS = ["사실", "검증 필요", "사실 아님", "판단 불가"]
+
+FACT_CHECK_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "claims": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "claim": {"type": "string", "description": "원문에 나온 주장 (짧게)"},
+                    "verdict": {"type": "string", "enum": VERDICTS},
+                    "reason": {"type": "string", "description": "판정 근거 또는 검증이 필요한 이유 (한 문장)"},
+                    "confidence": {"type": "number", "minimum": 0, "maximum": 1},
+                },
+                "required": ["claim", "verdict"],
+            },
+        },
+    },
+    "required": ["claims"],
+}
+
+CONTENT_ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "keywords": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "keyword": {"type": "string"},
+                    "weight": {"type": "number", "minimum": 0, "maximum": 1, "description": "중요도"},
+                    "context": {"type": "string", "description": "관련 문맥 (한 문장 이내)"},
+                },
+                "required": ["keyword", "weight"],
+            },
+        },
+        "topics": {"type": "array", "items": {"type": "string"}},
+        "summary": {"type": "string", "description": "300자 이내 요약"},
+    },
+    "required": ["keywords", "summary"],
+}
+
+GRAMMAR_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "corrections": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "original": {"type": "string", "description": "원문에 있는 그대로의 잘못된 부분"},
+                    "corrected": {"type": "string"},
+                    "reason": {"type": "string"},
+                    "category": {"type": "string", "enum": ["맞춤법", "띄어쓰기", "문법", "문체"]},
+                },
+                "required": ["original", "corrected"],
+            },
+        },
+        "corrected_text": {"type": "string", "description": "모든 수정이 반영된 전체 텍스트"},
+    },
+    "required": ["corrections", "corrected_text"],
+}
+
+
+@dataclass
+class Claim:
+    claim: str
+    verdict: str
+    reason: str = ""
+    confidence: float = None
+    source: str = "모델"  # 모델 또는 색인 (검증된 주장 색인에서 답한 경우)
+
+
+@dataclass
+class Keyword:
+    keyword: str
+    weight: float
+    context: str = ""
+
+
+@dataclass
+class Correction:
+    original: str
+    corrected: str
+    reason: str = ""
+    category: str = ""
+    start: int = None  # 원문에서의 위치 (찾지 못하면 None)
+    end: int = None
+
+
+@dataclass
+class FactCheckResult:
+    claims: list = field(default_factory=list)
+    sentences: int = 0  # 검사한 문장 수 (색인을 쓴 경우)
+    from_index: int = 0  # 그중 색인에서 답한 문장 수
+
+    def verdict_counts(self):
+        counts = {verdict: 0 for verdict in VERDICTS}
+        for claim in self.claims:
+            counts[claim.verdict] += 1
+        return counts
+
+
+@dataclass
+class ContentAnalysisResult:
+    keywords: list = field(default_factory=list)
+    topics: list = field(default_factory=list)
+    summary: str = ""
+    stats: dict = field(default_factory=dict)  # 기본 통계 (로컬 분석)
+    source: str = "모델"  # 모델 또는 로컬
+
+
+@dataclass
+class GrammarResult:
+    corrections: list = field(default_factory=list)
+    corrected_text: str = ""
+
+
+def rows(items):
+    # 표로 그리기 위한 dict 목록
+    return [asdict(item) for item in items]
+
+
+def tool_config(name, description, schema):
+    # 도구를 하나만 주고 그 도구를 반드시 호출하게 해서 서술형 텍스트 출력을 막는다
+    return {
+        "tools": [{"toolSpec": {"name": name, "description": description, "inputSchema": {"json": schema}}}],
+        "toolChoice": {"tool": {"name": name}},
+    }
+
+
+FENCE = re.compile(r"```(?:json)?\s*(.*?)```", re.S)
+
+
+def load_json(text):
+    # 도구 입력이면 그대로 JSON 이다. 도구를 쓰지 않은 모델이 코드 블록이나 앞뒤 설명을 붙여도 읽는다
+    text = (text or "").strip()
+    candidates = [text]
+    candidates += FENCE.findall(text)
+    start, end = text.find("{"), text.rfind("}")
+    if 0 <= start < end:
+        candidates.append(text[start:end + 1])
+    for candidate in candidates:
+        try:
+            data = json.loads(candidate)
+        except ValueError:
+            continue
+        if isinstance(data, dict):
+            return data
+    raise ValueError("구조화된 응답을 해석할 수 없습니다")
+
+
+def _text(value):
+    return value.strip() if isinstance(value, str) else ""
+
+
+def _number(value, default=None):
+    try:
+        return min(1.0, max(0.0, float(value)))
+    except (TypeError, ValueError):
+        return default
+
+
+def objects(data, key):
+    value = data.get(key)
+    return [item for item in value if isinstance(item, dict)] if isinstance(value, list) else []
+
+
+def parse_claim(item):
+    claim = _text(item.get("claim"))
+    if not claim:
+        return None
+    verdict = _text(item.get("verdict"))
+    return Claim(
+        claim=claim,
+        verdict=verdict if verdict in VERDICTS else "판단 불가",
+        reason=_text(item.get("reason")),
+        confidence=_number(item.get("confidence")),
+    )
+
+
+def parse_fact_check(text):
+    claims = [parse_claim(item) for item in objects(load_json(text), "claims")]
+    return FactCheckResult(claims=[claim for claim in claims if claim])
+
+
+def parse_content_analysis(text):
+    data = load_json(text)
+    keywords = []
+    for item in objects(data, "keywords"):
+        keyword = _text(item.get("keyword"))
+        if keyword:
+            keywords.append(Keyword(keyword, _number(item.get("weight"), 0.0), _text(item.get("context"))))
+    keywords.sort(key=lambda k: k.weight, reverse=True)
+    topics = data.get("topics") if isinstance(data.get("topics"), list) else []
+    topics = [_text(topic) for topic in topics if _text(topic)]
+    return ContentAnalysisResult(keywords=keywords, topics=topics, summary=_text(data.get("summary")))
+
+
+def parse_grammar(text, original):
+    data = load_json(text)
+    corrections, cursor = [], 0
+    for item in objects(data, "corrections"):
+        wrong, right = _text(item.get("original")), _text(item.get("corrected"))
+        if not wrong or wrong == right:
+            continue
+        # 위치는 모델에게 받지 않고 원문에서 직접 찾는다 (앞에서부터 순서대로)
+        start = original.find(wrong, cursor)
+        if start < 0:
+            start = original.find(wrong)
+        end = start + len(wrong) if start >= 0 else None
+        if start >= 0:
+            cursor = end
+        corrections.append(Correction(
+            original=wrong,
+            corrected=right,
+            reason=_text(item.get("reason")),
+            category=_text(item.get("category")),
+            start=start if start >= 0 else None,
+            end=end,
+        ))
+    return GrammarResult(corrections=corrections, corrected_text=_text(data.get("corrected_text")) or original)
+
+
+def run_structured(task, prompt, config, parse, image_b64=None, on_error=None, **options):
+    try:
+        return parse(run_task(task, prompt, image_b64, tool_config=config, **options))
+    except Exception as e:
+        if on_error is None:
+            raise
+        on_error(e)
+        return None
+
+
+@tracks_article
+def check_facts_structured(text, image_b64=None, on_error=None, **options):
+    prompt = """
+    위 원문에 나오는 주장들의 사실 관계를 검증해 주장마다 판정해주세요.
+    결과는 submit_fact_check 도구로 제출하세요.
+    """
+    config = tool_config("submit_fact_check", "주장별 사실 검증 결과를 제출한다", FACT_CHECK_SCHEMA)
+    return run_structured("fact_check", prompt, config, parse_fact_check, image_b64, on_error,
+                          prefix=article_prefix(text), **options)
+
+
+@tracks_article
+def analyze_content_structured(text, image_b64=None, on_error=None, **options):
+    prompt = """
+    위 원문의 핵심 키워드 (중요도 0~1), 주요 주제, 300자 이내 요약을 추출해주세요.
+    결과는 submit_content_analysis 도구로 제출하세요.
+    """
+    config = tool_config("submit_content_analysis", "키워드와 요약 분석 결과를 제출한다", CONTENT_ANALYSIS_SCHEMA)
+    return run_structured("content_analysis", prompt, config, parse_content_analysis, image_b64, on_error,
+                          prefix=article_prefix(text), **options)
+
+
+@tracks_article
+def check_grammar_structured(text, image_b64=None, on_error=None, **options):
+    prompt = """
+    위 원문의 맞춤법, 띄어쓰기, 문법 오류를 찾아주세요.
+    original 에는 원문에 있는 그대로의 부분을 적고, 결과는 submit_grammar 도구로 제출하세요.
+    """
+    config = tool_config("submit_grammar", "맞춤법/문법 수정 사항을 제출한다", GRAMMAR_SCHEMA)
+    return run_structured("grammar", prompt, config, lambda result: parse_grammar(result, text),
+                          image_b64, on_error, prefix=article_prefix(text), **options)
@@ -0,0 +1,79 @@
+from dataclasses import dataclass, field
+
+from .models import tier_model_id
+
+
+@dataclass(frozen=True)
+class Task:
+    name: str
+    label: str
+    system_prompt: str
+    tier: str = "quality"  # 지연/비용 등급 (inference.models.TIER_MODELS)
+    inference_config: dict = field(default_factory=lambda: {"maxTokens": 3000, "temperature": 0.3})
+    use_cache: bool = True
+    timeout: float = 120.0  # 작업별 응답 대기 한도 (초)
+
+    @property
+    def model_id(self):
+        return tier_model_id(self.tier)
+
+
+# 작업별 시스템 프롬프트 / 모델 / 추론 설정
+TASKS = {
+    "rewrite": Task(
+        name="rewrite",
+        label="기사 작성",
+        system_prompt="""[분석 요청]
+당신은 기사를 작성하는 전문가입니다.""",
+        # 재작성은 매번 다른 결과를 기대하므로 응답 캐시를 쓰지 않는다
+        use_cache=False,
+    ),
+    "fact_check": Task(
+        name="fact_check",
+        label="팩트 체크",
+        system_prompt="""[분석 요청]
+당신은 팩트체크 전문가입니다. 주어진 내용의 사실관계를 철저히 검증해주세요.""",
+        inference_config={"maxTokens": 2000, "temperature": 0.3},
+        timeout=90.0,
+    ),
+    "data_analysis": Task(
+        name="data_analysis",
+        label="데이터 분석",
+        system_prompt="""[분석 요청]
+당신은 데이터 분석 전문가입니다. 주어진 텍스트의 데이터를 분석하고 주요 인사이트를 도출해주세요.""",
+        inference_config={"maxTokens": 2000, "temperature": 0.3},
+        timeout=90.0,
+    ),
+    "content_analysis": Task(
+        name="content_analysis",
+        label="키워드 분석",
+        system_prompt="""[분석 요청]
+당신은 데이터 분석 전문가입니다. 주어진 텍스트에서 핵심 키워드를 추출하고 내용을 요약해주세요.""",
+        tier="balanced",
+        inference_config={"maxTokens": 2000, "temperature": 0.3},
+        timeout=90.0,
+    ),
+    "grammar": Task(
+        name="grammar",
+        label="맞춤법 교정",
+        system_prompt="""[분석 요청]
+당신은 한국어 맞춤법과 문법 전문가입니다. 주어진 텍스트의 맞춤법과 문법을 철저히 검토하고 개선점을 제안해주세요.""",
+        tier="balanced",
+    ),
+    "seo_title": Task(
+        name="seo_title",
+        label="SEO 제목",
+        system_prompt="""[분석 요청]
+당신은 뉴스 기사의 검색 최적화(SEO) 제목을 만드는 편집 전문가입니다.""",
+        tier="fast",
+        inference_config={"maxTokens": 800, "temperature": 0.3},
+        timeout=30.0,
+    ),
+}
+
+
+def get_task(name):
+    try:
+        return TASKS[name]
+    except KeyError:
+        raise ValueError(f"알 수 없는 작업: {name}") from None
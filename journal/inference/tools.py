@@ -0,0 +1,216 @@
+import functools
+
+from .core import InferenceRequest, invoke
+from .streaming import invoke_stream
+from .usage import article_key
+
+# 기사 작성 도구: 작업별 프롬프트를 만들고 공통 추론 경로로 실행한다.
+# stream=True 이면 TextStream 을, 아니면 응답 텍스트를 돌려준다.
+# on_error 가 없으면 모델 호출 오류를 그대로 올린다. 나머지 키워드 인자는 InferenceRequest 로 전달된다.
+# 원문은 prefix 로 프롬프트 맨 앞에 두고 작업별 지시는 그 뒤에 붙인다. 같은 기사로 스타일을 바꾸거나
+# 다시 생성할 때 시스템 프롬프트 + 원문까지가 같아서 Bedrock 프롬프트 캐시를 다시 쓸 수 있다.
+
+STYLE_INSTRUCTIONS = {
+    "권위있는 기사체": """
+        - 객관적이고 공식적인 톤 유지
+        - 정확한 사실과 데이터 중심
+        - 전문가적인 분석과 통찰 포함
+        - 격식있는 어휘 사용
+        """,
+    "르포 기사체": """
+        - 현장감 있는 묘사
+        - 구체적인 디테일 포함
+        - 인터뷰와 증언 활용
+        - 생생한 스토리텔링
+        """,
+    "세련된 뉴스레터체": """
+        - 친근하고 대화체적인 톤
+        - 핵심 포인트 강조
+        - 간결하고 명확한 문장
+        - 독자와 공감대 형성
+        """,
+    "AXIOS 기사체": """
+        - 핵심 정보 먼저 제시
+        - 짧고 명확한 문단
+        - 불렛 포인트 활용
+        - Why it matters 섹션 포함
+        """,
+}
+
+STYLES = list(STYLE_INSTRUCTIONS)
+
+
+def tracks_article(fn):
+    # 같은 원문에 대한 작업들을 사용량 대시보드에서 한 기사로 묶는다
+    @functools.wraps(fn)
+    def wrapper(text, *args, **kwargs):
+        kwargs.setdefault("article_id", article_key(text))
+        return fn(text, *args, **kwargs)
+    return wrapper
+
+
+def article_prefix(text):
+    return f"[원문]\n{text}"
+
+
+def run_task(task, prompt, image_b64=None, stream=False, on_error=None, **options):
+    request = InferenceRequest(task=task, prompt=prompt, image_bytes=image_b64, **options)
+    if stream:
+        return invoke_stream(request, on_error=on_error)
+    try:
+        return invoke(request).text
+    except Exception as e:
+        if on_error is None:
+            raise
+        on_error(e)
+        return None
+
+
+@tracks_article
+def check_facts(text, image_b64=None, stream=False, on_error=None, **options):
+    prompt = """
+    위 원문의 사실 관계를 검증하고 신뢰할 수 있는 정보와 검증이 필요한 정보를 구분해서 분석해주세요:
+    
+    [분석 형식]
+    1. 신뢰할 수 있는 정보:
+    - (정보 1)
+    - (정보 2)
+    
+    2. 검증이 필요한 정보:
+    - (정보 1): (검증 필요 이유)
+    - (정보 2): (검증 필요 이유)
+    """
+    return run_task("fact_check", prompt, image_b64, stream, on_error, prefix=article_prefix(text), **options)
+
+
+DATA_ANALYSIS_FORMAT = """
+    [분석 형식]
+    1. 주요 데이터 포인트:
+    - (데이터 1)
+    - (데이터 2)
+    
+    2. 인사이트:
+    - (인사이트 1)
+    - (인사이트 2)
+    
+    3. 추천 사항:
+    - (추천 1)
+    - (추천 2)
+    """
+
+
+@tracks_article
+def analyze_data(text, image_b64=None, stream=False, on_error=None, **options):
+    # 수치는 로컬에서 뽑아 계산한 표만 넘기고, 모델은 그 표를 해석해서 서술만 한다
+    from .figures import extract_figures, figures_table
+
+    figures = extract_figures(text)
+    if figures.empty:
+        prompt = """
+    위 원문에 포함된 데이터를 분석하고 주요 인사이트를 도출해주세요:
+    """ + DATA_ANALYSIS_FORMAT
+        return run_task("data_analysis", prompt, image_b64, stream, on_error, prefix=article_prefix(text), **options)
+
+    prompt = f"""
+    다음은 기사에서 추출해 미리 계산한 수치 표입니다 (CSV).
+    변화율/비중은 % 단위이고, 비중은 기사가 밝힌 합계 대비, 순위는 같은 항목끼리 또는 한 합계를 나눈 값들 안에서의 순위, 이상치는 같은 단위의 다른 값들과 자릿수가 크게 다른 값입니다.
+    값은 이미 계산된 것이므로 다시 계산하거나 표에 없는 숫자를 만들지 말고, 표의 값을 그대로 인용해 분석해주세요.
+
+{figures_table(figures)}
+    """ + DATA_ANALYSIS_FORMAT
+    return run_task("data_analysis", prompt, image_b64, stream, on_error, **options)
+
+
+@tracks_article
+def analyze_content(text, image_b64=None, stream=False, on_error=None, **options):
+    prompt = """
+    위 원문을 분석하여 핵심 키워드를 추출하고 내용을 요약해주세요:
+    
+    [분석 형식]
+    1. 핵심 키워드 (중요도 순):
+    - 키워드1: (관련 문맥)
+    - 키워드2: (관련 문맥)
+    - 키워드3: (관련 문맥)
+    
+    2. 주요 주제:
+    - (주제 1)
+    - (주제 2)
+    
+    3. 내용 요약:
+    (300자 이내로 핵심 내용 요약)
+    
+    4. 추가 분석:
+    - 글의 톤과 스타일:
+    - 주요 논점:
+    - 데이터/통계 정보:
+    """
+    return run_task("content_analysis", prompt, image_b64, stream, on_error, prefix=article_prefix(text), **options)
+
+
+@tracks_article
+def check_grammar(text, image_b64=None, stream=False, on_error=None, **options):
+    prompt = """
+    위 원문의 맞춤법과 문법을 검사하고 상세한 분석과 수정 사항을 제안해주세요:
+    
+    [분석 요청사항]
+    1. 맞춤법 오류:
+    - 오류 단어 → 올바른 표현
+    - 오류 이유 설명
+    
+    2. 문법적 개선사항:
+    - 어색한 문장 구조
+    - 조사 사용의 적절성
+    - 문장 호응 관계
+    
+    3. 문체 및 스타일:
+    - 일관성 있는 어조 사용
+    - 적절한 존댓말/반말 사용
+    - 전문용어 사용의 적절성
+    
+    4. 수정된 전체 텍스트:
+    (모든 수정사항이 반영된 최종본)
+    
+    5. 추가 제안사항:
+    - 가독성 향상을 위한 제안
+    - 문장 구조 개선 제안
+    """
+    return run_task("grammar", prompt, image_b64, stream, on_error, prefix=article_prefix(text), **options)
+
+
+@tracks_article
+def generate_seo_title(text, image_b64=None, stream=False, on_error=None, **options):
+    prompt = """
+    위 원문을 바탕으로 SEO에 최적화된 제목을 5개 생성해주세요:
+    
+    [생성 형식]
+    1. (제목 1) - (SEO 최적화 포인트)
+    2. (제목 2) - (SEO 최적화 포인트)
+    3. (제목 3) - (SEO 최적화 포인트)
+    4. (제목 4) - (SEO 최적화 포인트)
+    5. (제목 5) - (SEO 최적화 포인트)
+    """
+    return run_task("seo_title", prompt, image_b64, stream, on_error, prefix=article_prefix(text), **options)
+
+
+@tracks_article
+def rewrite_text(text, style, use_emoji=False, image_b64=None, stream=False, on_error=None, **options):
+    emoji_instruction = "이모티콘을 적절히 사용하여 " if use_emoji else ""
+    prompt = f"""
+    위 원문을 {emoji_instruction}{style} 스타일로 다시 작성해주세요:
+    
+    [스타일 가이드라인]
+    {STYLE_INSTRUCTIONS[style]}
+    """
+    return run_task("rewrite", prompt, image_b64, stream, on_error, prefix=article_prefix(text), **options)
+
+
+@tracks_article
+def change_related(text, image_b64=None, stream=False, on_error=None, **options):
+    prompt = "위 원문과 관련된 다른 주제나 관점으로 변경해서 작성해주세요."
+    return run_task("rewrite", prompt, image_b64, stream, on_error, prefix=article_prefix(text), **options)
+
+
+@tracks_article
+def regenerate_text(text, image_b64=None, stream=False, on_error=None, **options):
+    prompt = "위 원문을 완전히 새로운 방식으로 재작성해주세요."
+    return run_task("rewrite", prompt, image_b64, stream, on_error, prefix=article_prefix(text), **options)
@@ -0,0 +1,215 @@
+import logging
+import time
+
+import streamlit as st
+
+from .cancel import CallCancelled, CancelToken
+
+logger = logging.getLogger(__name__)
+
+# Streamlit 화면용 도우미 (inference 의 다른 모듈은 streamlit 에 의존하지 않는다)
+
+
+def report_model_error(e):
+    if isinstance(e, CallCancelled) and not isinstance(e, TimeoutError):
+        # 새 rerun 에 밀려 취소된 호출은 오류로 보여주지 않는다
+        logger.info("모델 호출 취소: %s", e)
+        return
+    st.error(f"모델 호출 중 오류 발생: {str(e)}")
+    logger.error("모델 호출 오류", exc_info=e)
+
+
+def render_stream(stream):
+    # 토큰이 도착하는 대로 출력하고 지연 시간을 표시한다
+    text = st.write_stream(stream)
+    caption = stream.latency_caption()
+    if caption:
+        st.caption(caption)
+    return text
+
+
+def render_structured(result):
+    # 구조화 출력 결과를 표로 그린다
+    from .structured import ContentAnalysisResult, FactCheckResult, GrammarResult, rows
+
+    if isinstance(result, FactCheckResult):
+        counts = result.verdict_counts()
+        for column, (verdict, count) in zip(st.columns(len(counts)), counts.items()):
+            column.metric(verdict, count)
+        st.dataframe(rows(result.claims), use_container_width=True, hide_index=True,
+                     column_config={"claim": "주장", "verdict": "판정", "reason": "근거", "source": "출처",
+                                    "confidence": st.column_config.ProgressColumn("신뢰도", min_value=0, max_value=1)})
+    elif isinstance(result, ContentAnalysisResult):
+        if result.stats:
+            for column, (name, value) in zip(st.columns(len(result.stats)), result.stats.items()):
+                column.metric(name, f"{value:,}")
+        st.markdown("### 핵심 키워드")
+        st.dataframe(rows(result.keywords), use_container_width=True, hide_index=True,
+                     column_config={"keyword": "키워드", "context": "문맥",
+                                    "weight": st.column_config.ProgressColumn("중요도", min_value=0, max_value=1)})
+        if result.topics:
+            st.markdown("### 주요 주제")
+            st.write(", ".join(result.topics))
+        st.markdown("### 내용 요약")
+        st.write(result.summary)
+    elif isinstance(result, GrammarResult):
+        st.markdown("### 수정 사항")
+        if result.corrections:
+            st.dataframe(rows(result.corrections), use_container_width=True, hide_index=True,
+                         column_config={"original": "원문", "corrected": "수정", "reason": "이유",
+                                        "category": "분류", "start": "시작", "end": "끝"})
+        else:
+            st.write("수정할 부분이 없습니다.")
+        st.markdown("### 수정된 전체 텍스트")
+        st.write(result.corrected_text)
+    else:
+        st.write(result)
+
+
+def _draw_candidate(box, candidate):
+    if candidate.error is not None:
+        box.error(f"모델 호출 중 오류 발생: {str(candidate.error)}")
+    elif candidate.cancelled and not candidate.text:
+        box.info("취소됨")
+    elif not candidate.text:
+        box.info("대기 중..." if not candidate.done else "빈 응답")
+    else:
+        box.container(height=400).markdown(candidate.text)
+
+
+def render_candidates(candidates, on_pick, per_row=4):
+    # 스타일 후보를 나란히 그리고, 모두 끝날 때까지 도착한 내용을 계속 갱신한다
+    # (고르기 버튼을 누르면 rerun 되면서 이 갱신 루프는 멈춘다)
+    items = candidates.candidates
+    summary = f"후보 {len(items)}개 · 최대 예상 비용 ${candidates.max_cost:.3f}"
+    if candidates.skipped:
+        summary += f" · 예산 초과로 {candidates.skipped}개 생략"
+    st.caption(summary)
+
+    boxes = []
+    for row in range(0, len(items), per_row):
+        for column, index in zip(st.columns(per_row), range(row, min(row + per_row, len(items)))):
+            with column:
+                st.markdown(f"**{items[index].label}**")
+                boxes.append(st.empty())
+                st.button("이 버전 사용", key=f"pick_candidate_{index}", on_click=on_pick, args=(index,),
+                          use_container_width=True)
+    status = st.empty()
+    while True:
+        finished = candidates.finished
+        for candidate, box in zip(items, boxes):
+            _draw_candidate(box, candidate)
+        if finished:
+            break
+        status.caption(f"{sum(c.done for c in items)}/{len(items)}개 완료")
+        time.sleep(0.2)
+    status.caption(f"모두 완료 · 실제 비용 ${candidates.spent():.4f}")
+
+
+def render_job(job):
+    # 백그라운드 작업의 부분 결과를 끝날 때까지 계속 그린다
+    # (다른 버튼을 누르거나 페이지를 옮기면 rerun 되면서 이 루프는 멈추지만 작업은 계속된다)
+    from .jobs import FAILED
+
+    box = st.empty()
+    status = st.empty()
+    while not job.finished:
+        if job.text:
+            box.markdown(job.text)
+        status.caption(f"{job.label} {job.status} · {job.elapsed:.1f}초")
+        time.sleep(0.2)
+    if job.status == FAILED:
+        box.error(f"모델 호출 중 오류 발생: {str(job.error)}")
+        status.empty()
+        return None
+    if job.text:
+        box.markdown(job.text)
+    else:
+        box.info(job.status)
+    caption = job.stream.latency_caption() if job.stream else ""
+    if caption:
+        status.caption(caption)
+    else:
+        status.empty()
+    return job.text
+
+
+def render_job_list():
+    # 사이드바: 이 세션의 백그라운드 작업 목록 (다른 페이지에서도 진행 상황을 보고 취소할 수 있다)
+    from .jobs import get_job_queue
+
+    queue = get_job_queue()
+    jobs = queue.jobs(current_session_id())
+    if not jobs:
+        return
+    st.sidebar.markdown("### 백그라운드 작업")
+    for job in jobs:
+        st.sidebar.caption(f"{job.label} · {job.status} · {job.elapsed:.0f}초")
+        if not job.finished:
+            st.sidebar.button("취소", key=f"cancel_job_{job.id}", on_click=queue.cancel, args=(job.id,))
+
+
+def current_session_id():
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx else None
+
+
+def run_cancel_token():
+    # 이 스크립트 실행이 rerun (다른 버튼, 입력 변경) 이나 중지 (페이지 이동, 연결 종료) 로 밀려나면 취소되는 토큰.
+    # 모델 응답을 기다리는 동안에는 Streamlit 이 스크립트를 끊을 수 없으므로 직접 요청 상태를 확인한다
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    try:
+        from streamlit.runtime.scriptrunner_utils.script_requests import ScriptRequestType
+    except ImportError:
+        return None
+
+    ctx = get_script_run_ctx()
+    requests = ctx.script_requests if ctx else None
+    if requests is None:
+        return None
+    if not hasattr(requests, "_state"):
+        # Streamlit 내부 속성이라 버전에 따라 없을 수 있다. 그때는 rerun 으로 취소하지 못하고 응답 제한 시간까지 기다린다
+        logger.warning("Streamlit 스크립트 요청 상태를 읽을 수 없어 rerun 시 모델 호출을 취소하지 않습니다")
+        return None
+    return CancelToken(should_cancel=lambda: getattr(requests, "_state", ScriptRequestType.CONTINUE)
+                       != ScriptRequestType.CONTINUE)
+
+
+def session_options():
+    # 요청 제한기 대기열에서 이 세션을 구분하고, 대기 중이면 순서를 화면에 보여준다
+    # 이 스크립트 실행이 밀려나면 호출도 취소된다
+    placeholder = st.empty()
+
+    def on_queue(position, delay):
+        if position is None and not delay:
+            placeholder.empty()
+        elif position is None:
+            placeholder.warning(f"요청이 많아 {delay:.1f}초 후 다시 시도합니다...")
+        else:
+            placeholder.info(f"대기열 {position + 1}번째 · 예상 대기 {delay:.0f}초")
+
+    return {"session_id": current_session_id(), "on_queue": on_queue, "cancel_token": run_cancel_token()}
+
+
+def run_chunked(fn, text, **options):
+    # 긴 문서: 조각별 병렬 처리 진행률을 보여주고 (합친 결과, 지연 시간 설명) 을 돌려준다
+    progress = st.progress(0.0, text="문서를 나눠서 처리하는 중...")
+    counts = {"total": 0}
+
+    def on_progress(done, total):
+        counts["total"] = total
+        progress.progress(done / total, text=f"{done}/{total} 조각 완료")
+
+    start = time.perf_counter()
+    try:
+        result = fn(text, on_progress=on_progress, session_id=current_session_id(),
+                    cancel_token=run_cancel_token(), **options)
+    except Exception as e:
+        report_model_error(e)
+        return None, ""
+    finally:
+        progress.empty()
+    return result, f"{counts['total']}개 조각 분할 처리 · 전체 {time.perf_counter() - start:.2f}초"
@@ -0,0 +1,137 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# 모델 호출별 토큰/지연/비용 기록 (로컬 SQLite)
+# USAGE_DB_PATH 를 빈 문자열로 두면 디스크에 남기지 않는다
+USAGE_DB_PATH = os.environ.get(
+    "USAGE_DB_PATH", os.path.join(os.path.expanduser("~"), ".journal", "usage.sqlite3")
+)
+
+# 1,000 토큰당 USD (입력, 출력) - 온디맨드 요금 기준
+MODEL_PRICING = {
+    "us.anthropic.claude-3-5-sonnet-20241022-v2:0": (0.003, 0.015),
+    "us.anthropic.claude-3-sonnet-20240229-v1:0": (0.003, 0.015),
+    "us.anthropic.claude-3-5-haiku-20241022-v1:0": (0.0008, 0.004),
+    "us.anthropic.claude-3-haiku-20240307-v1:0": (0.00025, 0.00125),
+    "us.amazon.nova-pro-v1:0": (0.0008, 0.0032),
+    "us.amazon.nova-lite-v1:0": (0.00006, 0.00024),
+    "us.amazon.nova-micro-v1:0": (0.000035, 0.00014),
+}
+
+
+# 프롬프트 캐시 토큰 요금 (입력 단가 대비). Claude 는 캐시 쓰기에 25% 를 더 받고 Nova 는 더 받지 않는다
+CACHE_READ_RATE = 0.1
+CACHE_WRITE_RATE = 1.25
+NO_CACHE_WRITE_PREMIUM = ("us.amazon.nova-",)
+
+
+def estimate_cost(model_id, input_tokens, output_tokens, cache_read_tokens=0, cache_write_tokens=0):
+    # input_tokens 는 캐시를 거치지 않은 입력 토큰 (Bedrock usage.inputTokens 와 같다)
+    input_price, output_price = MODEL_PRICING.get(model_id, (0.0, 0.0))
+    write_rate = 1.0 if str(model_id).startswith(NO_CACHE_WRITE_PREMIUM) else CACHE_WRITE_RATE
+    return ((input_tokens or 0) + (cache_read_tokens or 0) * CACHE_READ_RATE
+            + (cache_write_tokens or 0) * write_rate) / 1000 * input_price + (output_tokens or 0) / 1000 * output_price
+
+
+def response_cost(response):
+    usage = response.usage or {}
+    return estimate_cost(response.model_id, usage.get("inputTokens"), usage.get("outputTokens"),
+                         usage.get("cacheReadInputTokens"), usage.get("cacheWriteInputTokens"))
+
+
+def article_key(text):
+    # 같은 원문에 대한 호출을 한 기사로 묶기 위한 키
+    return hashlib.sha256(text.strip().encode("utf-8")).hexdigest()[:16]
+
+
+class UsageStore:
+    def __init__(self, db_path=USAGE_DB_PATH):
+        if db_path and db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.db_path = db_path or ":memory:"
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        if self.db_path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS calls ("
+            "timestamp REAL NOT NULL, session_id TEXT, article_id TEXT, task TEXT, model_id TEXT, "
+            "input_tokens INTEGER, output_tokens INTEGER, latency_ms REAL, ttft_ms REAL, "
+            "streamed INTEGER, cached INTEGER, cost_usd REAL, cache_read_tokens INTEGER, cache_write_tokens INTEGER)"
+        )
+        # 프롬프트 캐시 열이 없던 예전 기록 파일
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(calls)")}
+        for column in ("cache_read_tokens", "cache_write_tokens"):
+            if column not in columns:
+                self._db.execute(f"ALTER TABLE calls ADD COLUMN {column} INTEGER")
+        self._db.execute("CREATE INDEX IF NOT EXISTS calls_timestamp ON calls (timestamp)")
+        self._db.commit()
+
+    def record(self, request, response, ttft_ms=None, total_ms=None, streamed=False):
+        usage = response.usage or {}
+        input_tokens = usage.get("inputTokens", 0)
+        output_tokens = usage.get("outputTokens", 0)
+        row = (
+            time.time(),
+            request.session_id,
+            request.article_id,
+            request.task,
+            response.model_id,
+            input_tokens,
+            output_tokens,
+            total_ms if total_ms is not None else response.latency_ms,
+            ttft_ms,
+            int(streamed),
+            int(response.cached),
+            response_cost(response),
+            usage.get("cacheReadInputTokens", 0),
+            usage.get("cacheWriteInputTokens", 0),
+        )
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO calls (timestamp, session_id, article_id, task, model_id, input_tokens, output_tokens, "
+                "latency_ms, ttft_ms, streamed, cached, cost_usd, cache_read_tokens, cache_write_tokens) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                row,
+            )
+            self._db.commit()
+
+    def dataframe(self, since=None, session_id=None):
+        import pandas as pd
+
+        query = "SELECT * FROM calls WHERE timestamp >= ?"
+        params = [since or 0]
+        if session_id:
+            query += " AND session_id = ?"
+            params.append(session_id)
+        with self._lock:
+            df = pd.read_sql_query(query, self._db, params=params)
+        df["timestamp"] = pd.to_datetime(df["timestamp"], unit="s")
+        return df
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_usage_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = UsageStore()
+    return _store
+
+
+def record_usage(request, response, ttft_ms=None, total_ms=None, streamed=False):
+    # 기록 실패가 모델 호출 결과를 막지 않도록 한다
+    try:
+        get_usage_store().record(request, response, ttft_ms, total_ms, streamed)
+    except sqlite3.Error as e:
+        logger.warning("사용량 기록 실패: %s", e)
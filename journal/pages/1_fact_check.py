@@ -1,104 +1,17 @@
-import streamlit as st
-import boto3
-import json
-from PIL import Image
-import io
-
-def get_bedrock_client():
-    return boto3.client(
-        service_name="bedrock-runtime",
-        region_name='us-east-1'
-    )
-
-def process_image_for_bedrock(image):
-    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
-        background = Image.new('RGB', image.size, (255, 255, 255))
-        if image.mode == 'P':
-            
-            image = image.convert('RGBA')
-        background.paste(image, mask=image.split()[-1])
-        image = background
-    elif image.mode != 'RGB':
-        image = image.convert('RGB')
-
-    buffered = io.BytesIO()
-    image.save(buffered, format="JPEG")
-    img_bytes = buffered.getvalue()
-    return img_bytes
-
-def invoke_model(client, prompt, image_b64=None, model_id="us.anthropic.claude-3-5-sonnet-20241022-v2:0"):
-    try:
-        bedrock_runtime = boto3.client(
-            service_name="bedrock-runtime",
-            region_name='us-east-1'
-        )
-
-        system_prompt = f"""[분석 요청]
-당신은 팩트체크 전문가입니다. 주어진 내용의 사실관계를 철저히 검증해주세요."""
-
-        content = [{"text": prompt}]
-        
-        if image_b64:
-            content.append({
-                "image": {
-                    "format": "jpeg",
-                    "source": {
-                        "bytes": image_b64
-                    }
-                }
-            })
+import time
 
-        response = bedrock_runtime.converse(
-            modelId=model_id,
-            system=[{"text": system_prompt}],
-            messages=[{
-                "role": "user",
-                "content": content
-            }],
-            inferenceConfig={
-                "maxTokens": 3000,
-                "temperature": 0.3,
-            }
-        )
-
-        try:
-            response_text = response['output']['content'][0]['text']
-        except:
-            try:
-                response_text = response['output']['content']['text']
-            except:
-                try:
-                    response_text = response['output']['message']['content'][0]['text']
-                except:
-                    try:
-                        response_text = response['output']['message']['text']
-                    except:
-                        response_text = str(response)
-
-        return response_text
-            
-    except Exception as e:
-        st.error(f"모델 호출 중 오류 발생: {str(e)}")
-        print(f"상세 오류: {str(e)}")
-        return None
+import streamlit as st
 
-def check_facts(text, image_b64=None):
-    client = get_bedrock_client()
-    prompt = f"""
-    다음 텍스트의 사실 관계를 검증하고 신뢰할 수 있는 정보와 검증이 필요한 정보를 구분해서 분석해주세요:
-    
-    {text}
-    
-    [분석 형식]
-    1. 신뢰할 수 있는 정보:
-    - (정보 1)
-    - (정보 2)
-    
-    2. 검증이 필요한 정보:
-    - (정보 1): (검증 필요 이유)
-    - (정보 2): (검증 필요 이유)
-    """
-    return invoke_model(client, prompt, image_b64)
+from inference import check_facts, check_facts_indexed, check_facts_long, get_claim_index, is_long_document
+from inference.models import MODEL_CHOICES, model_label, selected_model_id
+from inference.ui import (
+    render_job_list,
+    render_stream,
+    render_structured,
+    report_model_error,
+    run_chunked,
+    session_options,
+)
 
 def main():
     st.set_page_config(page_title="팩트 체크", layout="wide")
@@ -146,7 +59,7 @@ def main():
     # 서브 메뉴
     col1, col2 = st.columns(2)
     with col1:
-        model = st.selectbox("모델", ["Nova-Pro"], label_visibility="collapsed")
+        model_id = selected_model_id(st.selectbox("모델", MODEL_CHOICES, format_func=model_label, label_visibility="collapsed"))
 
     # 메인 콘텐츠 영역
     col_left, col_right = st.columns(2)
@@ -159,31 +72,51 @@ def main():
             key="text_input"
         )
         
-        if st.button("분석하기", use_container_width=True):
-            if text_input.strip():
-                with st.spinner('처리 중...'):
-                    result = check_facts(text_input)
-                    if result:
-                        st.session_state.fact_check_result = result
-                        st.rerun()
+        structured = st.toggle("주장별 표로 보기", value=True)
+        run_clicked = st.button("분석하기", use_container_width=True)
     
     with col_right:
+        if run_clicked and text_input.strip() and is_long_document(text_input):
+            # 긴 문서는 문단/문장 단위로 나눠 동시에 처리한 뒤 합친다
+            result, caption = run_chunked(check_facts_long, text_input, model_id=model_id)
+            if result:
+                st.session_state.fact_check_result = result
+                st.session_state.latency_caption = caption
+                st.rerun()
+        elif run_clicked and text_input.strip() and structured:
+            with st.spinner('처리 중...'):
+                start = time.perf_counter()
+                # 이미 검증한 문장은 로컬 색인에서 답하고 처음 보는 문장만 모델에 보낸다
+                result = check_facts_indexed(text_input, on_error=report_model_error, model_id=model_id, **session_options())
+                if result:
+                    hit_rate = get_claim_index().stats()["hit_rate"]
+                    st.session_state.fact_check_result = result
+                    st.session_state.latency_caption = (
+                        f"문장 {result.sentences}개 중 {result.from_index}개 색인에서 답함 · "
+                        f"색인 적중률 {hit_rate:.0%} · 전체 {time.perf_counter() - start:.2f}초"
+                    )
+                    st.rerun()
+        elif run_clicked and text_input.strip():
+            with st.spinner('처리 중...'):
+                # 결과 영역에 토큰이 도착하는 대로 출력한 뒤 최종 레이아웃으로 다시 그린다
+                stream = check_facts(text_input, stream=True, on_error=report_model_error, model_id=model_id, **session_options())
+                result = render_stream(stream)
+                if result:
+                    st.session_state.fact_check_result = result
+                    st.session_state.latency_caption = stream.latency_caption()
+                    st.rerun()
         if st.session_state.fact_check_result:
-            st.markdown("### 검증 가능성: 0")
-            st.write(st.session_state.fact_check_result)
-            st.markdown("### 검증 가능성 이유:")
-            st.markdown("### 가능한 이유:")
-            st.write("해당 문장은 객관적으로 평가할 사실이나 주장이 있음.")
-            st.markdown("### 불가능한 이유:")
-            st.write("검증이 필요한 구체적인 정보나 주장이 포함되어 있음.")
-            st.markdown("### 수집된 증거:")
-            st.write("관련 데이터 및 참고자료")
-            st.markdown("### 분야별 고려사항:")
-            st.write("각 분야별 전문성이 필요한 부분 분석")
+            if st.session_state.get('latency_caption'):
+                st.caption(st.session_state.latency_caption)
+            render_structured(st.session_state.fact_check_result)
 
     # 글자 수 카운터
     current_chars = len(text_input)
-    st.markdown(f'<p class="word-counter">{current_chars}자/3,000자</p>', unsafe_allow_html=True)
+    long_note = " · 긴 문서는 나눠서 처리합니다" if is_long_document(text_input) else ""
+    st.markdown(f'<p class="word-counter">{current_chars}자/3,000자{long_note}</p>', unsafe_allow_html=True)
+
+    # 기사 작성에서 걸어 둔 백그라운드 작업 진행 상황
+    render_job_list()
 
 if __name__ == "__main__":
     main()
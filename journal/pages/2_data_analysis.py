@@ -1,112 +1,13 @@
-import streamlit as st
-import boto3
-import json
-from PIL import Image
-import io
-
-def get_bedrock_client():
-    return boto3.client(
-        service_name="bedrock-runtime",
-        region_name='us-east-1'
-    )
-
-def process_image_for_bedrock(image):
-    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
-        background = Image.new('RGB', image.size, (255, 255, 255))
-        if image.mode == 'P':
-            image = image.convert('RGBA')
-        background.paste(image, mask=image.split()[-1])
-        image = background
-    elif image.mode != 'RGB':
-        image = image.convert('RGB')
-
-    buffered = io.BytesIO()
-    image.save(buffered, format="JPEG")
-    img_bytes = buffered.getvalue()
-    return img_bytes
-
-def invoke_model(client, prompt, image_b64=None, model_id="us.anthropic.claude-3-sonnet-20240229-v1:0"):
-    try:
-        bedrock_runtime = boto3.client(
-            service_name="bedrock-runtime",
-            region_name='us-east-1'
-        )
-
-        system_prompt = f"""[분석 요청]
-당신은 데이터 분석 전문가입니다. 주어진 텍스트에서 핵심 키워드를 추출하고 내용을 요약해주세요."""
-
-        content = [{"text": prompt}]
-        
-        if image_b64:
-            content.append({
-                "image": {
-                    "format": "jpeg",
-                    "source": {
-                        "bytes": image_b64
-                    }
-                }
-            })
+import time
 
-        response = bedrock_runtime.converse(
-            modelId=model_id,
-            system=[{"text": system_prompt}],
-            messages=[{
-                "role": "user",
-                "content": content
-            }],
-            inferenceConfig={
-                "maxTokens": 3000,
-                "temperature": 0.3,
-            }
-        )
+import streamlit as st
 
-        try:
-            response_text = response['output']['content'][0]['text']
-        except:
-            try:
-                response_text = response['output']['content']['text']
-            except:
-                try:
-                    response_text = response['output']['message']['content'][0]['text']
-                except:
-                    try:
-                        response_text = response['output']['message']['text']
-                    except:
-                        response_text = str(response)
+from inference import analyze_content, analyze_content_local, analyze_content_structured, content_insights
+from inference.models import MODEL_CHOICES, model_label, selected_model_id
+from inference.ui import render_job_list, render_stream, render_structured, report_model_error, session_options
 
-        return response_text
-            
-    except Exception as e:
-        st.error(f"모델 호출 중 오류 발생: {str(e)}")
-        print(f"상세 오류: {str(e)}")
-        return None
-
-def analyze_content(text, image_b64=None):
-    client = get_bedrock_client()
-    prompt = f"""
-    다음 텍스트를 분석하여 핵심 키워드를 추출하고 내용을 요약해주세요:
-    
-    {text}
-    
-    [분석 형식]
-    1. 핵심 키워드 (중요도 순):
-    - 키워드1: (관련 문맥)
-    - 키워드2: (관련 문맥)
-    - 키워드3: (관련 문맥)
-    
-    2. 주요 주제:
-    - (주제 1)
-    - (주제 2)
-    
-    3. 내용 요약:
-    (300자 이내로 핵심 내용 요약)
-    
-    4. 추가 분석:
-    - 글의 톤과 스타일:
-    - 주요 논점:
-    - 데이터/통계 정보:
-    """
-    return invoke_model(client, prompt, image_b64)
+# 분석 방식: 키워드/요약/통계는 기본으로 로컬 엔진이 바로 계산하고, 모델은 서술형 추가 분석에만 쓴다
+ENGINES = ["로컬 분석", "모델 구조화 출력", "모델 서술형"]
 
 def main():
     st.set_page_config(page_title="데이터 분석", layout="wide")
@@ -138,6 +39,8 @@ def main():
         st.session_state.current_text = ""
     if 'analysis_result' not in st.session_state:
         st.session_state.analysis_result = None
+    if 'analysis_insights' not in st.session_state:
+        st.session_state.analysis_insights = None
 
     # 상단 탭 (현재 탭 활성화)
     tabs = ["기사 작성", "팩트 체크", "데이터 분석", "맞춤법 교정", "SEO 제목"]
@@ -154,9 +57,11 @@ def main():
     # 서브 메뉴
     col1, col2, col3 = st.columns(3)
     with col1:
-        model = st.selectbox("모델", ["Nova-Pro"], label_visibility="collapsed")
+        model_id = selected_model_id(st.selectbox("모델", MODEL_CHOICES, format_func=model_label, label_visibility="collapsed"))
     with col2:
         style = st.selectbox("스타일", ["데이터 인사이트 추출"], label_visibility="collapsed")
+    with col3:
+        engine = st.selectbox("분석 방식", ENGINES, label_visibility="collapsed")
 
     # 메인 콘텐츠 영역
     col_left, col_right = st.columns(2)
@@ -169,21 +74,61 @@ def main():
             key="text_input"
         )
         
-        if st.button("분석하기", use_container_width=True):
-            if text_input.strip():
-                with st.spinner('처리 중...'):
-                    result = analyze_content(text_input)
-                    if result:
-                        st.session_state.analysis_result = result
-                        st.rerun()
+        insights = st.toggle("모델 인사이트 추가", value=True, disabled=engine != "로컬 분석")
+        run_clicked = st.button("분석하기", use_container_width=True)
     
     with col_right:
+        if run_clicked and text_input.strip() and engine == "로컬 분석":
+            start = time.perf_counter()
+            result = analyze_content_local(text_input)
+            st.session_state.analysis_result = result
+            st.session_state.analysis_insights = None
+            st.session_state.latency_caption = f"로컬 분석 · {(time.perf_counter() - start) * 1000:.0f}ms"
+            if insights:
+                # 로컬 결과를 먼저 보여 주고 그 아래에 모델의 추가 분석을 이어서 받는다
+                st.caption(st.session_state.latency_caption)
+                render_structured(result)
+                st.markdown("### 추가 분석")
+                stream = content_insights(text_input, result, stream=True, on_error=report_model_error,
+                                          model_id=model_id, **session_options())
+                text = render_stream(stream)
+                if text:
+                    st.session_state.analysis_insights = text
+                    st.session_state.latency_caption += f" · 인사이트 {stream.latency_caption()}"
+            st.rerun()
+        elif run_clicked and text_input.strip() and engine == "모델 구조화 출력":
+            with st.spinner('처리 중...'):
+                start = time.perf_counter()
+                result = analyze_content_structured(text_input, on_error=report_model_error, model_id=model_id, **session_options())
+                if result:
+                    st.session_state.analysis_result = result
+                    st.session_state.analysis_insights = None
+                    st.session_state.latency_caption = f"구조화 출력 · 전체 {time.perf_counter() - start:.2f}초"
+                    st.rerun()
+        elif run_clicked and text_input.strip():
+            with st.spinner('처리 중...'):
+                # 결과 영역에 토큰이 도착하는 대로 출력한 뒤 최종 레이아웃으로 다시 그린다
+                stream = analyze_content(text_input, stream=True, on_error=report_model_error, model_id=model_id, **session_options())
+                result = render_stream(stream)
+                if result:
+                    st.session_state.analysis_result = result
+                    st.session_state.analysis_insights = None
+                    st.session_state.latency_caption = stream.latency_caption()
+                    st.rerun()
         if st.session_state.analysis_result:
-            st.write(st.session_state.analysis_result)
+            if st.session_state.get('latency_caption'):
+                st.caption(st.session_state.latency_caption)
+            render_structured(st.session_state.analysis_result)
+            if st.session_state.analysis_insights:
+                st.markdown("### 추가 분석")
+                st.markdown(st.session_state.analysis_insights)
 
     # 글자 수 카운터
     current_chars = len(text_input)
     st.markdown(f'<p class="word-counter">{current_chars}자/3,000자</p>', unsafe_allow_html=True)
 
+    # 기사 작성에서 걸어 둔 백그라운드 작업 진행 상황
+    render_job_list()
+
 if __name__ == "__main__":
     main()
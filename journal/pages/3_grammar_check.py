@@ -1,117 +1,72 @@
-import streamlit as st
-import boto3
-import json
-from PIL import Image
-import io
-
-def get_bedrock_client():
-    return boto3.client(
-        service_name="bedrock-runtime",
-        region_name='us-east-1'
-    )
-
-def process_image_for_bedrock(image):
-    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
-        background = Image.new('RGB', image.size, (255, 255, 255))
-        if image.mode == 'P':
-            image = image.convert('RGBA')
-        background.paste(image, mask=image.split()[-1])
-        image = background
-    elif image.mode != 'RGB':
-        image = image.convert('RGB')
-
-    buffered = io.BytesIO()
-    image.save(buffered, format="JPEG")
-    img_bytes = buffered.getvalue()
-    return img_bytes
-
-def invoke_model(client, prompt, image_b64=None, model_id="us.anthropic.claude-3-sonnet-20240229-v1:0"):
-    try:
-        bedrock_runtime = boto3.client(
-            service_name="bedrock-runtime",
-            region_name='us-east-1'
-        )
-
-        system_prompt = f"""[분석 요청]
-당신은 한국어 맞춤법과 문법 전문가입니다. 주어진 텍스트의 맞춤법과 문법을 철저히 검토하고 개선점을 제안해주세요."""
+import time
 
-        content = [{"text": prompt}]
-        
-        if image_b64:
-            content.append({
-                "image": {
-                    "format": "jpeg",
-                    "source": {
-                        "bytes": image_b64
-                    }
-                }
-            })
-
-        response = bedrock_runtime.converse(
-            modelId=model_id,
-            system=[{"text": system_prompt}],
-            messages=[{
-                "role": "user",
-                "content": content
-            }],
-            inferenceConfig={
-                "maxTokens": 3000,
-                "temperature": 0.3,
-            }
-        )
+import streamlit as st
 
-        try:
-            response_text = response['output']['content'][0]['text']
-        except:
-            try:
-                response_text = response['output']['content']['text']
-            except:
-                try:
-                    response_text = response['output']['message']['content'][0]['text']
-                except:
-                    try:
-                        response_text = response['output']['message']['text']
-                    except:
-                        response_text = str(response)
-
-        return response_text
-            
+from inference import (
+    IncrementalGrammarChecker,
+    apply_corrections,
+    check_grammar,
+    check_grammar_long,
+    check_grammar_structured,
+    check_spelling,
+    is_long_document,
+)
+from inference.models import MODEL_CHOICES, model_label, selected_model_id
+from inference.ui import (
+    current_session_id,
+    render_job_list,
+    render_stream,
+    render_structured,
+    report_model_error,
+    run_cancel_token,
+    run_chunked,
+    session_options,
+)
+
+
+def run_incremental(text, **options):
+    # 이전 검사 이후 바뀐 문단만 다시 검사하고 나머지는 세션에 기억해 둔 결과를 쓴다
+    checker = st.session_state.grammar_checker
+    progress = st.progress(0.0, text="바뀐 문단을 검사하는 중...")
+
+    def on_progress(done, total):
+        progress.progress(done / total, text=f"{done}/{total} 문단 완료")
+
+    start = time.perf_counter()
+    try:
+        result = checker.check(text, on_progress=on_progress, session_id=current_session_id(),
+                               cancel_token=run_cancel_token(), **options)
     except Exception as e:
-        st.error(f"모델 호출 중 오류 발생: {str(e)}")
-        print(f"상세 오류: {str(e)}")
-        return None
-
-def check_grammar(text, image_b64=None):
-    client = get_bedrock_client()
-    prompt = f"""
-    다음 텍스트의 맞춤법과 문법을 검사하고 상세한 분석과 수정 사항을 제안해주세요:
-    
-    [원문]
-    {text}
-    
-    [분석 요청사항]
-    1. 맞춤법 오류:
-    - 오류 단어 → 올바른 표현
-    - 오류 이유 설명
-    
-    2. 문법적 개선사항:
-    - 어색한 문장 구조
-    - 조사 사용의 적절성
-    - 문장 호응 관계
-    
-    3. 문체 및 스타일:
-    - 일관성 있는 어조 사용
-    - 적절한 존댓말/반말 사용
-    - 전문용어 사용의 적절성
-    
-    4. 수정된 전체 텍스트:
-    (모든 수정사항이 반영된 최종본)
-    
-    5. 추가 제안사항:
-    - 가독성 향상을 위한 제안
-    - 문장 구조 개선 제안
-    """
-    return invoke_model(client, prompt, image_b64)
+        report_model_error(e)
+        return None, ""
+    finally:
+        progress.empty()
+    caption = f"{result.paragraphs}개 문단 중 {result.checked}개만 다시 검사 · 전체 {time.perf_counter() - start:.2f}초"
+    if result.failed:
+        caption += f" · {result.failed}개 문단 실패"
+    return result.report, caption
+
+
+def apply_spelling(corrections):
+    # 위젯이 그려지기 전에 (버튼 콜백에서) 입력창 내용을 수정본으로 바꾼다
+    st.session_state.text_input = apply_corrections(st.session_state.text_input, corrections)
+
+
+def render_spelling(spelling):
+    # 로컬 사전 검사 결과: 입력할 때마다 모델 호출 없이 바로 보여준다.
+    # 자동 수정은 그대로 반영하고, 제안은 체크한 것만 반영한다. 반영할 수정 목록을 돌려준다
+    with st.expander(f"기본 맞춤법 자동 수정 {len(spelling.corrections)}건 · 제안 {len(spelling.flags)}건"):
+        ordered = sorted(spelling.corrections + spelling.flags, key=lambda c: c.start)
+        rows = [{"반영": c in spelling.corrections, "원문": c.original, "수정": c.corrected, "이유": c.reason,
+                 "분류": c.category, "적용": "자동" if c in spelling.corrections else "제안"}
+                for c in ordered]
+        edited = st.data_editor(rows, use_container_width=True, hide_index=True,
+                                disabled=["원문", "수정", "이유", "분류", "적용"])
+        # 자동 수정은 체크를 풀 수 없다
+        accepted = [c for c, row in zip(ordered, edited) if row["반영"] or c in spelling.corrections]
+        st.button("입력창에 반영", on_click=apply_spelling, args=(accepted,), use_container_width=True)
+    return accepted
+
 
 def main():
     st.set_page_config(page_title="맞춤법 교정", layout="wide")
@@ -143,6 +98,8 @@ def main():
         st.session_state.current_text = ""
     if 'grammar_result' not in st.session_state:
         st.session_state.grammar_result = None
+    if 'grammar_checker' not in st.session_state:
+        st.session_state.grammar_checker = IncrementalGrammarChecker()
 
     # 상단 탭 (현재 탭 활성화)
     tabs = ["기사 작성", "팩트 체크", "데이터 분석", "맞춤법 교정", "SEO 제목"]
@@ -159,9 +116,9 @@ def main():
     # 서브 메뉴
     col1, col2 = st.columns(2)
     with col1:
-        model = st.selectbox("모델", ["Nova_pro"], label_visibility="collapsed")
+        model_id = selected_model_id(st.selectbox("모델", MODEL_CHOICES, format_func=model_label, label_visibility="collapsed"))
     with col2:
-        model = st.selectbox("언어", ["한국어"], label_visibility="collapsed")
+        language = st.selectbox("언어", ["한국어"], label_visibility="collapsed")
 
     # 메인 콘텐츠 영역
     col_left, col_right = st.columns(2)
@@ -174,21 +131,69 @@ def main():
             key="text_input"
         )
         
-        if st.button("검사하기", use_container_width=True):
-            if text_input.strip():
-                with st.spinner('처리 중...'):
-                    result = check_grammar(text_input)
-                    if result:
-                        st.session_state.grammar_result = result
-                        st.rerun()
+        incremental = st.toggle("변경된 문단만 다시 검사", value=True)
+        structured = st.toggle("수정 사항을 표로 보기", value=False,
+                               help="짧은 글을 한 번에 검사해 수정 위치와 함께 표로 보여줍니다")
+        prepass = st.toggle("기본 맞춤법은 바로 고치기", value=True,
+                            help="사전에 있는 틀린 표기는 모델 없이 고치고, 띄어쓰기/되·돼/안·않 등은 제안으로 보여줍니다")
+        spelling = check_spelling(text_input) if prepass and text_input.strip() else None
+        accepted = spelling.corrections if spelling else []
+        if spelling and (spelling.corrections or spelling.flags):
+            accepted = render_spelling(spelling)
+        run_clicked = st.button("검사하기", use_container_width=True)
+
+    if run_clicked and spelling:
+        # 모델에는 자동 수정과 받아들인 제안만 반영한 텍스트를 보낸다
+        text_input = apply_corrections(text_input, accepted)
+        st.session_state.prepass_note = f"로컬 수정 {len(accepted)}건 반영 후 검사"
+    elif run_clicked:
+        st.session_state.prepass_note = None
     
     with col_right:
+        if run_clicked and text_input.strip() and structured and not is_long_document(text_input):
+            with st.spinner('처리 중...'):
+                start = time.perf_counter()
+                result = check_grammar_structured(text_input, on_error=report_model_error, model_id=model_id, **session_options())
+                if result:
+                    st.session_state.grammar_result = result
+                    st.session_state.latency_caption = f"구조화 출력 · 전체 {time.perf_counter() - start:.2f}초"
+                    st.rerun()
+        elif run_clicked and text_input.strip() and incremental:
+            result, caption = run_incremental(text_input, model_id=model_id)
+            if result:
+                st.session_state.grammar_result = result
+                st.session_state.latency_caption = caption
+                st.rerun()
+        elif run_clicked and text_input.strip() and is_long_document(text_input):
+            # 긴 문서는 문단/문장 단위로 나눠 동시에 처리한 뒤 합친다
+            result, caption = run_chunked(check_grammar_long, text_input, model_id=model_id)
+            if result:
+                st.session_state.grammar_result = result
+                st.session_state.latency_caption = caption
+                st.rerun()
+        elif run_clicked and text_input.strip():
+            with st.spinner('처리 중...'):
+                # 결과 영역에 토큰이 도착하는 대로 출력한 뒤 최종 레이아웃으로 다시 그린다
+                stream = check_grammar(text_input, stream=True, on_error=report_model_error, model_id=model_id, **session_options())
+                result = render_stream(stream)
+                if result:
+                    st.session_state.grammar_result = result
+                    st.session_state.latency_caption = stream.latency_caption()
+                    st.rerun()
         if st.session_state.grammar_result:
-            st.write(st.session_state.grammar_result)
+            if st.session_state.get('latency_caption'):
+                st.caption(st.session_state.latency_caption)
+            if st.session_state.get('prepass_note'):
+                st.caption(st.session_state.prepass_note)
+            render_structured(st.session_state.grammar_result)
 
     # 글자 수 카운터
     current_chars = len(text_input)
-    st.markdown(f'<p class="word-counter">{current_chars}자/3,000자</p>', unsafe_allow_html=True)
+    long_note = " · 긴 문서는 나눠서 처리합니다" if is_long_document(text_input) else ""
+    st.markdown(f'<p class="word-counter">{current_chars}자/3,000자{long_note}</p>', unsafe_allow_html=True)
+
+    # 기사 작성에서 걸어 둔 백그라운드 작업 진행 상황
+    render_job_list()
 
 if __name__ == "__main__":
     main()
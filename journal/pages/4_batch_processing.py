@@ -0,0 +1,76 @@
+import hashlib
+
+import streamlit as st
+
+from inference import STYLES
+from inference.batch import OPERATIONS, default_output_path, detect_format, read_articles, run_batch
+from inference.models import MODEL_CHOICES, model_label, selected_model_id
+
+def main():
+    st.set_page_config(page_title="일괄 처리", layout="wide")
+    
+    # Custom CSS
+    st.markdown("""
+        <style>
+        .stButton button {
+            background-color: #4C7BF4;
+            color: white;
+            border-radius: 5px;
+            padding: 0.5rem 2rem;
+        }
+        </style>
+    """, unsafe_allow_html=True)
+
+    if st.button("← 기사 작성으로"):
+        st.switch_page("app.py")
+
+    # 서브 메뉴
+    col1, col2, col3, col4, col5 = st.columns(5)
+    with col1:
+        operation = st.selectbox("작업", list(OPERATIONS), format_func=OPERATIONS.get)
+    with col2:
+        style = st.selectbox("스타일 (재작성)", STYLES, disabled=operation != "rewrite")
+    with col3:
+        concurrency = st.number_input("동시 실행 수", min_value=1, max_value=16, value=4)
+    with col4:
+        rpm = st.number_input("분당 요청 수", min_value=1, max_value=600, value=60)
+    with col5:
+        model = st.selectbox("모델", MODEL_CHOICES, format_func=model_label)
+
+    uploaded = st.file_uploader("기사 파일 업로드 (CSV 또는 JSONL, 'text' 열 필수 / 'id' 열 선택)",
+                                type=["csv", "jsonl", "json"])
+    if not uploaded:
+        return
+
+    # 같은 파일·작업으로 다시 실행하면 이전 결과 파일에서 이어서 처리한다
+    upload_key = hashlib.sha256(uploaded.getvalue()).hexdigest()[:16]
+    output_path = default_output_path(upload_key, operation)
+    st.caption(f"결과 파일: {output_path}")
+
+    if st.button("일괄 처리 시작", use_container_width=True):
+        counts = {"processed": 0, "failed": 0, "skipped": 0}
+        status = st.empty()
+        failures = st.container()
+        articles = read_articles(uploaded, fmt=detect_format(uploaded.name))
+        try:
+            for record in run_batch(articles, operation, output_path, concurrency=int(concurrency),
+                                    requests_per_minute=int(rpm), style=style,
+                                    model_id=selected_model_id(model)):
+                if record.get("skipped"):
+                    counts["skipped"] += 1
+                else:
+                    counts["processed"] += 1
+                    if record["error"]:
+                        counts["failed"] += 1
+                        failures.error(f"{record['id']}: {record['error']}")
+                status.info(f"처리 {counts['processed']}건 · 실패 {counts['failed']}건 · 건너뜀 {counts['skipped']}건")
+        except ValueError as e:
+            st.error(str(e))
+            return
+        st.success(f"완료: 처리 {counts['processed']}건 · 실패 {counts['failed']}건 · 건너뜀 {counts['skipped']}건")
+
+        with open(output_path, "rb") as f:
+            st.download_button("결과 다운로드 (JSONL)", f, file_name=f"{upload_key}_{operation}.jsonl")
+
+if __name__ == "__main__":
+    main()
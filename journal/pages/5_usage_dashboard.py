@@ -0,0 +1,89 @@
+import time
+
+import streamlit as st
+
+from inference import TASKS, get_usage_store
+from inference.ui import current_session_id
+
+PERIODS = {"오늘": 24 * 60 * 60, "최근 7일": 7 * 24 * 60 * 60, "최근 30일": 30 * 24 * 60 * 60, "전체": None}
+
+def p50(series):
+    return series.quantile(0.5)
+
+def p95(series):
+    return series.quantile(0.95)
+
+def main():
+    st.set_page_config(page_title="사용량", layout="wide")
+
+    if st.button("← 기사 작성으로"):
+        st.switch_page("app.py")
+
+    # 서브 메뉴
+    col1, col2 = st.columns(2)
+    with col1:
+        period = st.selectbox("기간", list(PERIODS), label_visibility="collapsed")
+    with col2:
+        only_session = st.toggle("현재 세션만 보기")
+
+    since = time.time() - PERIODS[period] if PERIODS[period] else None
+    df = get_usage_store().dataframe(since=since, session_id=current_session_id() if only_session else None)
+    if df.empty:
+        st.info("기록된 모델 호출이 없습니다.")
+        return
+
+    calls = df[df["cached"] == 0]
+    cols = st.columns(6)
+    cols[0].metric("호출 수", f"{len(calls):,}", f"캐시 {int(df['cached'].sum()):,}", delta_color="off")
+    cols[1].metric("입력 토큰", f"{int(calls['input_tokens'].sum()):,}")
+    cols[2].metric("출력 토큰", f"{int(calls['output_tokens'].sum()):,}")
+    cols[3].metric("비용 (USD)", f"${calls['cost_usd'].sum():,.4f}")
+    # 프롬프트 캐시: 입력 중 캐시에서 읽은 비율
+    cache_read, cache_write = int(calls["cache_read_tokens"].sum()), int(calls["cache_write_tokens"].sum())
+    prompt_tokens = int(calls["input_tokens"].sum()) + cache_read + cache_write
+    cols[4].metric("캐시 읽기 토큰", f"{cache_read:,}",
+                   f"입력의 {cache_read / prompt_tokens:.0%} · 쓰기 {cache_write:,}" if prompt_tokens else None,
+                   delta_color="off")
+    cols[5].metric("첫 토큰 p50 / p95", f"{p50(calls['ttft_ms']) / 1000:.1f}초 / {p95(calls['ttft_ms']) / 1000:.1f}초")
+
+    # 작업별 토큰/지연/비용
+    st.markdown("### 작업별")
+    labels = {name: task.label for name, task in TASKS.items()}
+    by_task = calls.groupby("task").agg(
+        호출=("task", "size"),
+        입력_토큰=("input_tokens", "sum"),
+        출력_토큰=("output_tokens", "sum"),
+        캐시_읽기_토큰=("cache_read_tokens", "sum"),
+        캐시_쓰기_토큰=("cache_write_tokens", "sum"),
+        지연_p50_ms=("latency_ms", p50),
+        지연_p95_ms=("latency_ms", p95),
+        첫토큰_p50_ms=("ttft_ms", p50),
+        비용_USD=("cost_usd", "sum"),
+    )
+    by_task["호출당_비용_USD"] = by_task["비용_USD"] / by_task["호출"]
+    by_task.index = by_task.index.map(lambda name: labels.get(name, name))
+    st.dataframe(by_task.sort_values("비용_USD", ascending=False).round(4), use_container_width=True)
+
+    # 기사별 비용: 가장 비싼 흐름 찾기
+    st.markdown("### 기사별 비용")
+    by_article = calls.dropna(subset=["article_id"]).groupby("article_id").agg(
+        작업=("task", lambda tasks: ", ".join(sorted({labels.get(t, t) for t in tasks}))),
+        호출=("task", "size"),
+        토큰=("input_tokens", "sum"),
+        비용_USD=("cost_usd", "sum"),
+        마지막_호출=("timestamp", "max"),
+    )
+    if not by_article.empty:
+        st.caption(f"기사당 평균 비용 ${by_article['비용_USD'].mean():.4f} · 기사 {len(by_article):,}건")
+        st.dataframe(by_article.sort_values("비용_USD", ascending=False).head(20).round({"비용_USD": 4}),
+                     use_container_width=True)
+
+    # 일별 작업별 비용
+    st.markdown("### 일별 비용")
+    daily = calls.assign(날짜=calls["timestamp"].dt.date).pivot_table(
+        index="날짜", columns="task", values="cost_usd", aggfunc="sum", fill_value=0
+    ).rename(columns=labels)
+    st.bar_chart(daily)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+import argparse
+
+from inference.api import API_CONCURRENCY, create_app
+
+# CMS 연동용 HTTP API 서버 (Streamlit 앱과 따로 실행)
+#   python server.py --port 8000
+#   curl -X POST localhost:8000/v1/grammar -d '{"text": "..."}'
+#   curl -N -X POST localhost:8000/v1/rewrite -d '{"text": "...", "style": "르포 기사체", "stream": true}'
+# uvicorn 으로 직접 띄울 수도 있다: uvicorn server:app --port 8000
+
+app = create_app()
+
+
+def main(argv=None):
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="기사 작성 도구 HTTP API 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--concurrency", type=int, default=API_CONCURRENCY, help="동시에 실행하는 모델 호출 수")
+    args = parser.parse_args(argv)
+    uvicorn.run(create_app(args.concurrency), host=args.host, port=args.port, log_level="info")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+# 테스트는 디스크의 사용량 / 주장 / 키워드 / 편집 기록 저장소를 건드리지 않는다 (빈 값이면 메모리에만 유지)
+for name in ("USAGE_DB_PATH", "CLAIM_INDEX_PATH", "KEYWORD_INDEX_PATH", "HISTORY_DB_PATH", "RESPONSE_CACHE_PATH"):
+    os.environ[name] = ""
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _wait_for(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+@pytest.fixture
+def wait_for():
+    # 다른 스레드에서 일어나는 일을 condition() 이 참이 될 때까지 (최대 timeout 초) 기다린다
+    return _wait_for
+
+
+@pytest.fixture
+def fresh_calls(monkeypatch):
+    # 요청 제한기는 끄고 (스로틀링 재시도도 기다리지 않는다) 응답 캐시는 비운 채로 시작한다
+    from inference import ratelimit
+    from inference.cache import get_response_cache
+
+    monkeypatch.setattr(ratelimit, "_limiter", ratelimit.RateLimiter(0, 0))
+    monkeypatch.setattr(ratelimit, "BACKOFF_BASE", 0)
+    get_response_cache().clear()
+    yield
+    get_response_cache().clear()
+
+
+@pytest.fixture
+def synthetic_backend(fresh_calls):
+    # 실제 Bedrock 대신 지연 없는 합성 응답을 쓴다. 테스트에는 합성 백엔드 호출 수를 돌려주는 함수를 넘긴다
+    from inference import client
+    from inference.backends import backend_stats, configure_backend
+
+    previous = client.BEDROCK_BACKEND
+    configure_backend("synthetic", ttft_ms=0, tokens_per_second=1e6, jitter=0, seed=0)
+    yield lambda: backend_stats()["requests"]
+    configure_backend(previous)
+
+
+class StubClient:
+    # converse / converse_stream 요청을 기록하고 정해 둔 응답을 차례로 돌려준다.
+    # 응답은 텍스트, converse 응답 dict, 예외 (던진다) 중 하나이고 모델 ID 별로 따로 줄 수 있다. 마지막 응답은 계속 되풀이한다
+    def __init__(self):
+        self.requests = []
+        self._replies = {}
+        self._lock = threading.Lock()
+
+    def reply(self, *replies, model=None):
+        self._replies.setdefault(model, []).extend(replies)
+
+    @property
+    def models(self):
+        return [request["modelId"] for request in self.requests]
+
+    def _next(self, converse_request):
+        with self._lock:
+            self.requests.append(converse_request)
+            replies = self._replies.get(converse_request["modelId"]) or self._replies.get(None) or ["응답"]
+            reply = replies.pop(0) if len(replies) > 1 else replies[0]
+        if isinstance(reply, Exception):
+            raise reply
+        if isinstance(reply, str):
+            reply = {"output": {"message": {"role": "assistant", "content": [{"text": reply}]}},
+                     "stopReason": "end_turn", "usage": {"inputTokens": 10, "outputTokens": 5, "totalTokens": 15}}
+        return reply
+
+    def converse(self, **converse_request):
+        return self._next(converse_request)
+
+    def converse_stream(self, **converse_request):
+        from inference.backends import EventStream, text_events
+        from inference.core import extract_text
+
+        response = self._next(converse_request)
+        events = text_events(extract_text(response), response["usage"], response["stopReason"], 0, 1e6)
+        return {"stream": EventStream(events)}
+
+
+@pytest.fixture
+def stub_client(fresh_calls, monkeypatch):
+    # 모든 모델 호출이 StubClient 로 간다 (BEDROCK_BACKEND 는 live 로 두고 실제 클라이언트만 바꾼다)
+    from inference import client
+
+    stub = StubClient()
+    monkeypatch.setattr(client, "BEDROCK_BACKEND", "live")
+    monkeypatch.setattr(client, "get_live_client", lambda *args, **kwargs: stub)
+    return stub
@@ -0,0 +1,103 @@
+import base64
+import json
+
+import pytest
+from botocore.exceptions import ClientError
+from starlette.testclient import TestClient
+
+from inference import api
+from inference.api import API_MAX_TEXT_CHARS, create_app
+from inference.cancel import DeadlineExceeded
+
+ARTICLE = "서울시는 3일 내년 예산안 48조 원을 발표했다."
+
+
+@pytest.fixture
+def client(stub_client):
+    with TestClient(create_app(concurrency=4)) as client:
+        yield client
+
+
+def events(response):
+    # text/event-stream 본문 -> [(이벤트, 데이터), ...]
+    parsed = []
+    for block in response.text.strip().split("\n\n"):
+        event, data = block.split("\n")
+        parsed.append((event.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return parsed
+
+
+def test_health(client):
+    response = client.get("/health")
+    assert response.status_code == 200
+    assert response.json()["tools"] == list(api.TOOLS)
+
+
+def test_tool_returns_the_model_result(client, stub_client):
+    stub_client.reply("[수정 사항]\n없음")
+    response = client.post("/v1/grammar", json={"text": ARTICLE, "model": "nova-lite"})
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["tool"], body["result"]) == ("grammar", "[수정 사항]\n없음")
+    assert body["model_id"] == stub_client.models[0] == "us.amazon.nova-lite-v1:0"
+    assert body["usage"]["totalTokens"] == 15
+
+
+def test_structured_result_is_json(client, stub_client):
+    stub_client.reply('{"claims": [{"claim": "예산은 48조 원이다", "verdict": "사실"}]}')
+    response = client.post("/v1/fact-check", json={"text": ARTICLE, "structured": True})
+    assert response.status_code == 200
+    claims = response.json()["result"]["claims"]
+    assert [(c["claim"], c["verdict"]) for c in claims] == [("예산은 48조 원이다", "사실")]
+    assert "toolConfig" in stub_client.requests[0]
+
+
+def test_stream_sends_tokens_then_done(client, stub_client):
+    stub_client.reply("다시 쓴 기사 본문입니다")
+    response = client.post("/v1/rewrite", json={"text": ARTICLE, "stream": True})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    parsed = events(response)
+    assert {event for event, _ in parsed[:-1]} == {"token"}
+    assert "".join(data["text"] for _, data in parsed[:-1]) == "다시 쓴 기사 본문입니다"
+    assert parsed[-1][0] == "done" and parsed[-1][1]["text"] == "다시 쓴 기사 본문입니다"
+
+
+@pytest.mark.parametrize("tool, body", [
+    ("grammar", {"text": " "}),
+    ("grammar", {"text": "가" * (API_MAX_TEXT_CHARS + 1)}),
+    ("grammar", {"text": ARTICLE, "model": "gpt"}),
+    ("grammar", {"text": ARTICLE, "image": "이미지가 아님"}),
+    ("grammar", {"text": ARTICLE, "image": base64.b64encode(b"not an image").decode()}),
+    ("grammar", {"text": ARTICLE, "structured": True, "stream": True}),
+    ("rewrite", {"text": ARTICLE, "structured": True}),
+    ("rewrite", {"text": ARTICLE, "style": "없는 스타일"}),
+    ("grammar", ["text"]),
+])
+def test_invalid_requests_are_rejected(client, stub_client, tool, body):
+    response = client.post(f"/v1/{tool}", json=body)
+    assert response.status_code == 400
+    assert response.json()["error"]
+    assert stub_client.requests == []
+
+
+def test_bad_json_unknown_tool_and_auth(client, monkeypatch):
+    assert client.post("/v1/grammar", content=b"{text").status_code == 400
+    assert client.post("/v1/translate", json={"text": ARTICLE}).status_code == 404
+    monkeypatch.setattr(api, "API_KEY", "secret")
+    assert client.post("/v1/grammar", json={"text": ARTICLE}).status_code == 401
+    assert client.post("/v1/grammar", json={"text": ARTICLE}, headers={"X-API-Key": "secret"}).status_code == 200
+
+
+@pytest.mark.parametrize("error, status", [
+    (ClientError({"Error": {"Code": "ThrottlingException", "Message": "느리게"}}, "ConverseStream"), 429),
+    (ClientError({"Error": {"Code": "ValidationException", "Message": "잘못된 요청"}}, "ConverseStream"), 502),
+    (DeadlineExceeded("모델 응답 제한 시간을 넘겼습니다"), 504),
+])
+def test_backend_failures_are_mapped_to_status(client, stub_client, error, status):
+    stub_client.reply(error)
+    response = client.post("/v1/seo-title", json={"text": ARTICLE})
+    assert response.status_code == status
+    assert response.json()["error"]
+    streamed = events(client.post("/v1/seo-title", json={"text": ARTICLE, "stream": True}))
+    assert streamed[-1][0] == "error" and streamed[-1][1]["status"] == status
@@ -0,0 +1,85 @@
+import pytest
+from botocore.exceptions import ClientError, ReadTimeoutError
+
+from inference.backends import (
+    RecordBackend,
+    RecordingNotFound,
+    RecordingStore,
+    ReplayBackend,
+    SyntheticBackend,
+    estimate_usage,
+    response_from_events,
+    schema_example,
+)
+from inference.ratelimit import is_throttling_error
+
+REQUEST = {"modelId": "us.amazon.nova-lite-v1:0",
+           "messages": [{"role": "user", "content": [{"text": "서울시 예산안을 요약해주세요"}]}],
+           "inferenceConfig": {"maxTokens": 50}}
+
+
+def fast(**options):
+    return SyntheticBackend(ttft_ms=0, tokens_per_second=1e6, jitter=0, seed=0, **options)
+
+
+def text_of(response):
+    return response["output"]["message"]["content"][0]["text"]
+
+
+def test_synthetic_is_deterministic():
+    first, second = fast().converse(**REQUEST), fast().converse(**REQUEST)
+    assert text_of(first) == text_of(second)
+    assert first["usage"]["outputTokens"] <= 50
+    streamed = "".join(event["contentBlockDelta"]["delta"]["text"]
+                       for event in fast().converse_stream(**REQUEST)["stream"] if "contentBlockDelta" in event)
+    assert streamed == text_of(first)
+
+
+def test_synthetic_throttling_and_timeout():
+    with pytest.raises(ClientError) as error:
+        fast(throttle_rate=1).converse(**REQUEST)
+    assert is_throttling_error(error.value)
+    with pytest.raises(ReadTimeoutError):
+        SyntheticBackend(ttft_ms=200, jitter=0, seed=0, read_timeout=0.05).converse(**REQUEST)
+
+
+def test_synthetic_tool_use_matches_schema():
+    schema = {"type": "object", "properties": {
+        "verdict": {"type": "string", "enum": ["사실", "거짓"]},
+        "confidence": {"type": "number", "minimum": 0, "maximum": 1},
+        "claims": {"type": "array", "items": {"type": "string"}}}}
+    assert schema_example(schema, iter(["가", "나"])) == {"verdict": "사실", "confidence": 0.5, "claims": ["가", "나"]}
+    tool = {"tools": [{"toolSpec": {"name": "submit", "inputSchema": {"json": schema}}}]}
+    response = fast().converse(**REQUEST, toolConfig=tool)
+    assert response["stopReason"] == "tool_use"
+    assert response["output"]["message"]["content"][0]["toolUse"]["input"]["verdict"] == "사실"
+
+
+def test_cache_point_usage():
+    request = {**REQUEST, "system": [{"text": "가" * 100}, {"cachePoint": {"type": "default"}}]}
+    seen = set()
+    assert estimate_usage(request, 10, seen)["cacheWriteInputTokens"] == 50
+    assert estimate_usage(request, 10, seen)["cacheReadInputTokens"] == 50
+    assert "cacheReadInputTokens" not in estimate_usage(REQUEST, 10, seen)
+
+
+def test_record_then_replay(tmp_path):
+    store = RecordingStore(str(tmp_path))
+    recorder = RecordBackend(fast(), store)
+    recorded = recorder.converse(**REQUEST)
+    streamed = list(recorder.converse_stream(**{**REQUEST, "inferenceConfig": {"maxTokens": 20}})["stream"])
+    assert len(store) == 2
+
+    replay = ReplayBackend(store, speed=0)
+    assert replay.converse(**REQUEST) == recorded
+    # 스트림으로 녹화한 응답은 일반 호출로, 일반 호출로 녹화한 응답은 스트림으로도 재생한다
+    short = {**REQUEST, "inferenceConfig": {"maxTokens": 20}}
+    assert replay.converse(**short) == response_from_events([(0.0, event) for event in streamed])
+    replayed = "".join(event["contentBlockDelta"]["delta"]["text"]
+                       for event in replay.converse_stream(**REQUEST)["stream"] if "contentBlockDelta" in event)
+    assert replayed == text_of(recorded)
+
+
+def test_replay_without_recording(tmp_path):
+    with pytest.raises(RecordingNotFound):
+        ReplayBackend(RecordingStore(str(tmp_path)), speed=0).converse(**REQUEST)
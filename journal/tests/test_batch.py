@@ -0,0 +1,37 @@
+import io
+import json
+
+from inference.batch import completed_ids, read_articles, run_batch
+
+
+def test_read_csv_and_jsonl():
+    csv = io.StringIO("id,text\na1,첫 기사\na2,둘째 기사\n")
+    assert list(read_articles(csv, fmt="csv")) == [("a1", "첫 기사"), ("a2", "둘째 기사")]
+    jsonl = io.StringIO('{"text": "첫 기사"}\n{"text": "둘째 기사"}\n')
+    # id 열이 없으면 행 번호를 쓴다 (청크가 나뉘어도 이어진다)
+    assert list(read_articles(jsonl, fmt="jsonl", chunksize=1)) == [("0", "첫 기사"), ("1", "둘째 기사")]
+
+
+def test_completed_ids_skips_failures_and_truncated_line(tmp_path):
+    path = tmp_path / "out.jsonl"
+    path.write_text(
+        json.dumps({"id": "a1", "result": "ok", "error": None}) + "\n"
+        + json.dumps({"id": "a2", "result": None, "error": "실패"}) + "\n"
+        + '{"id": "a3", "resu',
+        encoding="utf-8",
+    )
+    assert completed_ids(str(path)) == {"a1"}
+    assert completed_ids(str(tmp_path / "없음.jsonl")) == set()
+
+
+def test_resume_skips_finished_articles(tmp_path, synthetic_backend):
+    path = str(tmp_path / "out.jsonl")
+    articles = [("a1", "서울시 예산안 발표 기사"), ("a2", "부산시 교통 대책 기사"), ("a3", " ")]
+    first = list(run_batch(articles[:1], "seo_title", path, requests_per_minute=0))
+    assert first[0]["id"] == "a1" and first[0]["error"] is None
+
+    records = list(run_batch(articles, "seo_title", path, requests_per_minute=0))
+    skipped = sorted(r["id"] for r in records if r.get("skipped"))
+    assert skipped == ["a1", "a3"]
+    assert [r["id"] for r in records if not r.get("skipped")] == ["a2"]
+    assert completed_ids(path) == {"a1", "a2"}
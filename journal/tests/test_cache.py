@@ -0,0 +1,60 @@
+import time
+
+from inference.cache import ResponseCache, cache_key
+
+
+def request(prompt="기사를 요약해주세요", model="m", image=None, max_tokens=100):
+    content = [{"text": prompt}]
+    if image is not None:
+        content.append({"image": {"format": "png", "source": {"bytes": image}}})
+    return {"modelId": model, "system": [{"text": "기자"}], "messages": [{"role": "user", "content": content}],
+            "inferenceConfig": {"maxTokens": max_tokens}}
+
+
+def test_key_depends_on_every_input():
+    base = cache_key(request())
+    assert base == cache_key(request())
+    assert base != cache_key(request(prompt="기사를 요약해 주세요"))
+    assert base != cache_key(request(model="other"))
+    assert base != cache_key(request(max_tokens=200))
+    assert cache_key(request(image=b"a")) != cache_key(request(image=b"b"))
+    assert cache_key(request(image=b"a")) == cache_key(request(image=b"a"))
+
+
+def test_key_depends_on_tool_config():
+    # 같은 프롬프트라도 구조화 출력 (도구 강제) 과 일반 호출은 다른 항목이다
+    tool_config = {"tools": [{"toolSpec": {"name": "fact_check"}}], "toolChoice": {"tool": {"name": "fact_check"}}}
+    structured = {**request(), "toolConfig": tool_config}
+    assert cache_key(structured) != cache_key(request())
+    assert cache_key(structured) == cache_key({**request(), "toolConfig": dict(tool_config)})
+
+
+def test_entries_expire():
+    cache = ResponseCache(ttl=0.05)
+    cache.set("k", "응답")
+    assert cache.get("k") == "응답"
+    time.sleep(0.1)
+    assert cache.get("k") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_is_evicted():
+    cache = ResponseCache(max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1" and cache.get("c") == "3"
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    db_path = str(tmp_path / "responses.sqlite3")
+    ResponseCache(db_path=db_path).set("k", "응답")
+    cache = ResponseCache(db_path=db_path)
+    assert cache.get("k") == "응답"
+    assert cache.stats()["disk_hits"] == 1
+    # 한 번 읽으면 메모리 계층으로 올라온다
+    assert cache.get("k") == "응답"
+    assert cache.stats()["disk_hits"] == 1
+    assert ResponseCache(db_path=db_path, ttl=0).get("k") is None
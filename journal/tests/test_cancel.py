@@ -0,0 +1,78 @@
+import threading
+import time
+
+import pytest
+
+from inference import ratelimit
+from inference.cancel import CallCancelled, CancelToken, call_cancellable
+from inference.ratelimit import RateLimiter, call_with_rate_limit
+
+REQUEST = {"modelId": "m", "messages": [{"role": "user", "content": [{"text": "안녕하세요"}]}],
+           "inferenceConfig": {"maxTokens": 100}}
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    limiter = RateLimiter(60, 60000)
+    monkeypatch.setattr(ratelimit, "_limiter", limiter)
+    return limiter
+
+
+def cancel_later(token, delay=0.2):
+    threading.Timer(delay, token.cancel).start()
+
+
+def test_cancelled_before_start_does_not_run():
+    token = CancelToken()
+    token.cancel()
+    ran, abandoned = [], []
+    with pytest.raises(CallCancelled):
+        call_cancellable(lambda: ran.append(1), token, abandoned.append)
+    assert ran == []
+    assert len(abandoned) == 1 and abandoned[0].cancelled()
+
+
+def test_abandoned_after_call_finishes(wait_for):
+    finish = threading.Event()
+    token = CancelToken()
+    cancel_later(token)
+    abandoned = []
+    with pytest.raises(CallCancelled):
+        call_cancellable(lambda: finish.wait(5) and "늦은 결과", token, abandoned.append)
+    assert abandoned == []
+    finish.set()
+    assert wait_for(lambda: abandoned)
+    assert abandoned[0].result() == "늦은 결과"
+
+
+def test_cancelled_call_keeps_reservation_until_finished(limiter, wait_for):
+    finish = threading.Event()
+    token = CancelToken()
+    cancel_later(token)
+    closed = []
+
+    def call():
+        finish.wait(5)
+        return {"usage": {"totalTokens": 40}}
+
+    with pytest.raises(CallCancelled):
+        call_with_rate_limit(call, REQUEST, cancel_token=token, on_abandoned=closed.append)
+    reserved = limiter._tokens.tokens
+    assert reserved < limiter._tokens.capacity
+    # 호출 스레드가 아직 돌고 있는 동안에는 예약을 돌려주지 않는다
+    time.sleep(0.2)
+    assert limiter._tokens.tokens == pytest.approx(reserved, abs=5)
+    finish.set()
+    assert wait_for(lambda: closed)
+    time.sleep(0.05)
+    assert closed == [{"usage": {"totalTokens": 40}}]
+    # 실제로 쓴 40 토큰만 빼고 돌려받는다
+    assert limiter._tokens.tokens == pytest.approx(limiter._tokens.capacity - 40, abs=5)
+
+
+def test_cancelled_before_call_returns_reservation(limiter):
+    token = CancelToken()
+    token.cancel()
+    with pytest.raises(CallCancelled):
+        call_with_rate_limit(lambda: {}, REQUEST, cancel_token=token)
+    assert limiter._tokens.tokens == pytest.approx(limiter._tokens.capacity, abs=5)
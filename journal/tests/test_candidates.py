@@ -0,0 +1,34 @@
+from inference.backends import configure_backend
+from inference.candidates import RewriteCandidates
+from inference.tools import STYLES
+
+ARTICLE = "서울시는 3일 내년 예산안 48조 원을 발표했다."
+
+
+def test_budget_limits_candidates():
+    candidates = RewriteCandidates(ARTICLE, budget_usd=0)
+    assert len(candidates.candidates) == 1
+    assert candidates.skipped == len(STYLES) * 2 - 1
+    unlimited = RewriteCandidates(ARTICLE, budget_usd=100)
+    assert len(unlimited.candidates) == len(STYLES) * 2
+    assert unlimited.max_cost == unlimited.cost_per_candidate * len(STYLES) * 2
+
+
+def test_all_styles_are_generated(synthetic_backend, wait_for):
+    candidates = RewriteCandidates(ARTICLE, styles=STYLES[:2], emoji_variants=(False,), budget_usd=100).start()
+    assert wait_for(lambda: candidates.finished, timeout=5)
+    assert all(c.text and c.error is None for c in candidates.candidates)
+    assert synthetic_backend() == 2
+
+
+def test_pick_cancels_the_rest(synthetic_backend, wait_for):
+    # 천천히 생성되게 해서 고를 때 나머지가 아직 생성 중이거나 대기 중이게 한다
+    configure_backend("synthetic", ttft_ms=0, tokens_per_second=20, jitter=0, seed=0)
+    candidates = RewriteCandidates(ARTICLE, styles=STYLES[:2], concurrency=1, budget_usd=100).start()
+    first = candidates.candidates[0]
+    assert wait_for(lambda: first.text, timeout=5)
+    text = candidates.pick(0)
+    assert candidates.picked is first and text
+    assert wait_for(lambda: candidates.finished, timeout=2)
+    assert all(c.cancelled for c in candidates.candidates[1:])
+    assert synthetic_backend() == 1
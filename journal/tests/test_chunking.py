@@ -0,0 +1,59 @@
+from inference.chunking import (
+    chunk_text,
+    dedupe_claims,
+    parse_grammar_chunk,
+    split_sentences,
+    split_whitespace,
+)
+
+ARTICLE = ("서울시는 3일 내년 예산안 48조 원을 발표했다. 성장률은 3.5%로 예상된다.\n\n"
+           "시의회는 다음 달 본회의에서 예산안을 심의할 예정이다!\n\n" * 20)
+
+
+def test_chunks_join_back_to_original():
+    chunks = chunk_text(ARTICLE, max_chars=200)
+    assert "".join(chunks) == ARTICLE
+    assert all(len(chunk) <= 200 for chunk in chunks)
+    # 문단 경계에서 자른다
+    assert all(chunk.endswith("\n\n") for chunk in chunks)
+
+
+def test_long_sentence_is_split_by_characters():
+    text = "가" * 50
+    assert chunk_text(text, max_chars=20) == ["가" * 20, "가" * 20, "가" * 10]
+
+
+def test_decimal_point_is_not_a_sentence_end():
+    assert split_sentences("성장률은 3.5%다. 물가는 2%다.") == ["성장률은 3.5%다. ", "물가는 2%다."]
+
+
+def test_split_whitespace_keeps_edges():
+    assert split_whitespace("\n  본문 \n\n") == ("\n  ", "본문", " \n\n")
+    assert split_whitespace("\n\n") == ("\n\n", "", "")
+
+
+def test_parse_grammar_chunk():
+    result = "[수정 사항]\n- 됬다 → 됐다: 준말\n\n[수정된 텍스트]\n결론이 됐다."
+    assert parse_grammar_chunk(result, "결론이 됬다.") == (["- 됬다 → 됐다: 준말"], "결론이 됐다.")
+    # 형식이 틀리면 원문을 유지한다
+    assert parse_grammar_chunk("모르겠습니다", "원문") == ([], "원문")
+
+
+def test_dedupe_claims_across_chunks():
+    items = [
+        "서울시 예산은 48조 원이다: 발표 자료와 일치",
+        "서울시 예산은 48조원이다 : 중복",
+        "서울시 내년 예산은 48조 원이다: 다른 주장",
+        ": 내용 없음",
+    ]
+    assert dedupe_claims(items) == [items[0], items[2]]
+
+
+def test_longer_or_renumbered_claims_survive():
+    items = [
+        "매출이 10% 늘었다: 발표 자료와 일치",
+        "매출이 10% 늘었다고 밝혔지만 영업이익은 줄었다: 뒷부분은 확인 필요",
+        "매출이 12% 늘었다: 다른 수치",
+        "매출이 1.0% 늘었다: 소수점",
+    ]
+    assert dedupe_claims(items) == items
@@ -0,0 +1,48 @@
+import time
+
+from inference.claims import ClaimIndex, normalize_claim
+from inference.structured import Claim
+
+
+def indexed(sentence, verdict="사실"):
+    index = ClaimIndex(db_path="")
+    index.add(sentence, [Claim(claim=sentence, verdict=verdict, reason="", confidence=0.9)])
+    return index
+
+
+def test_same_sentence_with_other_spacing_hits():
+    index = indexed("보건복지부는 3일 내년 예산을 12% 늘린다고 발표했다.")
+    claims = index.lookup("보건복지부는  3일 내년 예산을 12% 늘린다고 발표했다")
+    assert claims is not None
+    assert claims[0].verdict == "사실"
+    assert claims[0].source == "색인"
+
+
+def test_different_ministry_misses():
+    index = indexed("보건복지부는 3일 내년 예산을 12% 늘린다고 발표했다.")
+    assert index.lookup("기획재정부는 3일 내년 예산을 12% 늘린다고 발표했다.") is None
+
+
+def test_different_person_misses():
+    index = indexed("김철수 장관은 3일 내년 예산을 12% 늘린다고 발표했다.")
+    assert index.lookup("김영희 장관은 3일 내년 예산을 12% 늘린다고 발표했다.") is None
+
+
+def test_different_predicate_misses():
+    index = indexed("보건복지부는 3일 내년 예산을 12% 늘린다고 발표했다.")
+    assert index.lookup("보건복지부는 3일 내년 예산을 12% 늘린다는 보도를 부인했다.") is None
+    assert index.lookup("보건복지부는 3일 내년 예산을 12% 늘린다고 부인했다.") is None
+
+
+def test_decimal_point_is_kept():
+    assert normalize_claim("성장률은 3.5%였다") != normalize_claim("성장률은 35%였다")
+    index = indexed("올해 성장률은 3.5%로 집계됐다.")
+    assert index.lookup("올해 성장률은 35%로 집계됐다.") is None
+
+
+def test_expired_verdict_misses():
+    index = indexed("보건복지부는 3일 내년 예산을 12% 늘린다고 발표했다.")
+    index.ttl = 0
+    time.sleep(0.01)
+    assert index.lookup("보건복지부는 3일 내년 예산을 12% 늘린다고 발표했다.") is None
+    assert index.stats()["misses"] == 1
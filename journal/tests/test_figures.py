@@ -0,0 +1,74 @@
+import pandas as pd
+
+from inference.figures import extract_figures, format_value
+from inference.tools import analyze_data
+
+
+def rows(text):
+    return extract_figures(text).set_index("원문")
+
+
+def test_korean_units_are_combined():
+    df = rows("올해 예산은 3조 5천억원이다.")
+    assert df.loc["3조 5천억원", "값"] == 3.5e12
+    assert format_value(3.5e12) == "3조 5,000억"
+
+
+def test_before_after_pair_is_change_not_share():
+    df = rows("지하철 기본요금은 1,400원에서 1,550원으로 오른다.")
+    assert df.loc["1,550원", "변화율"] == 10.7
+    assert df["비중"].isna().all()
+
+
+def test_two_periods_in_one_sentence():
+    df = rows("매출은 2023년 3조5천억원, 2024년 4조원을 기록했다.")
+    assert list(df["기간"]) == ["2023", "2024"]
+    assert df.loc["4조원", "변화율"] == 14.3
+    assert df["비중"].isna().all()
+
+
+def test_periods_listed_respectively():
+    df = rows("2023년과 2024년 매출은 각각 3조5천억원, 4조원이었다.")
+    assert list(df["기간"]) == ["2023", "2024"]
+    assert df.loc["4조원", "변화율"] == 14.3
+
+
+def test_no_share_without_a_total():
+    df = rows("수출은 500억 달러, 수입은 300억 달러로 집계됐다.")
+    assert df["비중"].isna().all()
+    assert df["순위"].isna().all()
+
+
+def test_share_of_stated_total():
+    df = rows("전체 예산 100억원 가운데 교육 40억원, 복지 30억원이다.")
+    assert pd.isna(df.loc["100억원", "비중"])
+    assert df.loc["40억원", "비중"] == 40.0
+    assert df.loc["30억원", "비중"] == 30.0
+    assert list(df["순위"].dropna()) == [1, 2]
+
+
+def test_share_of_listed_total():
+    df = rows("지역별 인구는 서울 100명, 부산 50명, 대구 30명 등 모두 180명이다.")
+    assert df.loc["100명", "비중"] == 55.6
+    assert pd.isna(df.loc["180명", "비중"])
+
+
+def test_rank_only_compares_same_item():
+    df = extract_figures("사과 3개를 샀다. 자동차 2대가 섰다. 버스 10대가 지났다.")
+    assert df["순위"].isna().all()
+    df = rows("2023년 매출은 3조원이었다. 2024년 매출은 4조원이었다.")
+    assert df.loc["4조원", "순위"] == 1
+    assert df.loc["3조원", "순위"] == 2
+
+
+def test_text_without_figures():
+    for text in ["", "숫자가 없다.", "2024년 3월 5일 발표."]:
+        df = extract_figures(text)
+        assert df.empty
+        assert {"변화율", "순위", "비중", "이상치"} <= set(df.columns)
+
+
+def test_data_analysis_without_figures(stub_client):
+    stub_client.reply("분석 결과")
+    assert analyze_data("숫자가 없는 기사다.") == "분석 결과"
+    assert "숫자가 없는 기사다." in stub_client.requests[0]["messages"][0]["content"][0]["text"]
@@ -0,0 +1,71 @@
+import time
+
+from inference.history import EditHistory, HistoryStore, apply_patch, document_key, make_patch
+
+
+def test_patch_round_trip():
+    old = "서울시는 3일 예산안을 발표했다.\n시의회는 심의할 예정이다."
+    new = "서울시는 4일 내년 예산안을 발표했다.\n시의회는 다음 달 심의한다."
+    assert apply_patch(old, make_patch(old, new)) == new
+
+
+def test_undo_redo_and_trim():
+    history = EditHistory(max_versions=3)
+    for text in ["하나", "둘", "셋", "넷"]:
+        history.push(text)
+    assert len(history) == 3 and history.dropped == 1
+    assert history.undo() == "셋"
+    assert history.undo() == "둘"
+    assert not history.can_undo
+    assert history.redo() == "셋"
+    # 되돌린 뒤 고치면 다시 실행할 버전은 버린다
+    history.push("다섯")
+    assert not history.can_redo
+    assert [history.text(i) for i in range(len(history))] == ["둘", "셋", "다섯"]
+
+
+def test_document_key_is_stable():
+    assert document_key(title=" 예산  기사 ") == document_key(title="예산 기사")
+    assert document_key(text="본문") == document_key(text="본문")
+    assert document_key(text="본문") != document_key(text="본문 2")
+    assert document_key(title="예산 기사", text="본문") == document_key(title="예산 기사")
+
+
+def test_reload_finds_document_by_latest_text(tmp_path):
+    db_path = str(tmp_path / "history.sqlite3")
+    store = HistoryStore(db_path=db_path)
+    owner = document_key(text="초안")
+    history = store.get(owner)
+    history.push("초안")
+    history.push("고친 글")
+    store.save(owner)
+    assert store.find("고친 글") == owner
+    assert store.find("초안") is None
+
+    # 재시작 (새 세션) 뒤에도 같은 글이면 기록을 이어 쓴다
+    reloaded = HistoryStore(db_path=db_path)
+    assert reloaded.find("고친 글") == owner
+    assert reloaded.get(owner).undo() == "초안"
+
+
+def test_unused_documents_expire(tmp_path):
+    db_path = str(tmp_path / "history.sqlite3")
+    store = HistoryStore(db_path=db_path, ttl=0.05)
+    owner = document_key(title="기사")
+    store.get(owner).push("본문")
+    store.save(owner)
+    time.sleep(0.1)
+    store.get("다른 문서")
+    assert store.stats()["documents"] == 1
+    assert store.find("본문") is None
+    assert len(HistoryStore(db_path=db_path, ttl=0.05).get(owner)) == 0
+
+
+def test_memory_keeps_recent_documents():
+    store = HistoryStore(max_documents=2)
+    for owner in ["a", "b", "c"]:
+        store.get(owner).push(owner)
+        store.save(owner)
+    assert store.stats()["documents"] == 2
+    assert store.find("a") is None
+    assert store.find("c") == "c"
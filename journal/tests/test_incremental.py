@@ -0,0 +1,31 @@
+from inference.incremental import IncrementalGrammarChecker
+
+PARAGRAPHS = ["서울시는 3일 예산안을 발표했다.", "시의회는 다음 달 심의한다.", "시민 단체는 반발했다."]
+
+
+def test_only_edited_paragraphs_are_rechecked(synthetic_backend):
+    checker = IncrementalGrammarChecker()
+    first = checker.check("\n\n".join(PARAGRAPHS))
+    assert (first.paragraphs, first.checked, first.reused) == (3, 3, 0)
+    assert synthetic_backend() == 3
+
+    edited = "\n\n".join(PARAGRAPHS[:2] + ["시민 단체는 크게 반발했다."])
+    second = checker.check(edited)
+    assert (second.paragraphs, second.checked, second.reused) == (3, 1, 2)
+    assert synthetic_backend() == 4
+    assert "시민 단체는 크게 반발했다." in second.report
+
+
+def test_repeated_paragraph_is_sent_once(synthetic_backend):
+    checker = IncrementalGrammarChecker()
+    result = checker.check("\n\n".join([PARAGRAPHS[0], PARAGRAPHS[1], PARAGRAPHS[0]]))
+    assert (result.paragraphs, result.checked) == (3, 2)
+    assert synthetic_backend() == 2
+
+
+def test_changing_model_rechecks(synthetic_backend):
+    checker = IncrementalGrammarChecker()
+    checker.check(PARAGRAPHS[0])
+    result = checker.check(PARAGRAPHS[0], model_id="us.amazon.nova-lite-v1:0")
+    assert result.checked == 1
+    assert synthetic_backend() == 2
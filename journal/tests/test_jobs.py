@@ -0,0 +1,79 @@
+import threading
+
+from botocore.exceptions import ClientError
+
+from inference.jobs import CANCELLED, DONE, FAILED, QUEUED, RUNNING, JobQueue
+from inference.streaming import TextStream
+from inference.tools import STYLES, rewrite_text
+
+ARTICLE = "서울시는 3일 내년 예산안 48조 원을 발표했다."
+STYLE = STYLES[0]
+
+
+def wait_on(cancel_token, started=None):
+    # 취소될 때까지 기다리는 작업
+    if started is not None:
+        started.set()
+    cancel_token.sleep(5)
+    return "끝까지 돌았다"
+
+
+def test_streamed_job_runs_to_done(stub_client, wait_for):
+    stub_client.reply("다시 쓴 기사")
+    jobs = JobQueue(workers=2)
+    job = jobs.submit("세션", "rewrite", rewrite_text, ARTICLE, STYLE, stream=True, label="재작성")
+    assert wait_for(lambda: job.finished)
+    assert (job.status, job.result, job.text, job.error) == (DONE, "다시 쓴 기사", "다시 쓴 기사", None)
+    assert isinstance(job.stream, TextStream)
+    assert jobs.get(job.id) is job
+    assert jobs.latest("세션", ["rewrite"]) is job
+    assert jobs.latest("다른 세션") is None
+    assert ARTICLE in stub_client.requests[0]["messages"][0]["content"][0]["text"]
+
+
+def test_same_input_reuses_the_job_until_it_is_consumed(stub_client, wait_for):
+    jobs = JobQueue(workers=2)
+    job = jobs.submit("세션", "rewrite", rewrite_text, ARTICLE, STYLE, stream=True)
+    assert jobs.submit("세션", "rewrite", rewrite_text, ARTICLE, STYLE, stream=True) is job
+    assert jobs.submit("다른 세션", "rewrite", rewrite_text, ARTICLE, STYLE, stream=True) is not job
+    assert wait_for(lambda: job.finished)
+    job.consumed = True
+    assert jobs.submit("세션", "rewrite", rewrite_text, ARTICLE, STYLE, stream=True) is not job
+    assert jobs.stats()["submitted"] == 3 and jobs.stats()["reused"] == 1
+
+
+def test_model_error_marks_the_job_failed(stub_client, wait_for):
+    stub_client.reply(ClientError({"Error": {"Code": "ValidationException", "Message": "잘못된 요청"}}, "Converse"))
+    jobs = JobQueue(workers=1)
+    job = jobs.submit("세션", "rewrite", rewrite_text, ARTICLE, STYLE, stream=True)
+    assert wait_for(lambda: job.finished)
+    assert job.status == FAILED
+    assert isinstance(job.error, ClientError)
+    assert job.result is None
+
+
+def test_cancel_running_and_queued_jobs(wait_for):
+    jobs = JobQueue(workers=1)
+    started = threading.Event()
+    running = jobs.submit("세션", "rewrite", wait_on, started=started)
+    queued = jobs.submit("세션", "regenerate", wait_on)
+    assert started.wait(2)
+    assert (running.status, queued.status) == (RUNNING, QUEUED)
+    assert jobs.stats()["running"] == 1 and jobs.stats()["queued"] == 1
+
+    jobs.cancel(queued.id)
+    jobs.cancel(running.id)
+    assert wait_for(lambda: running.finished and queued.finished)
+    assert (running.status, queued.status) == (CANCELLED, CANCELLED)
+    # 대기 중에 취소된 작업은 시작하지 않는다
+    assert queued.started_at is None
+    assert running.result is None
+
+
+def test_old_finished_jobs_are_pruned(wait_for):
+    jobs = JobQueue(workers=1, per_owner=2)
+    submitted = [jobs.submit("세션", "rewrite", lambda text, cancel_token: text, str(i)) for i in range(3)]
+    assert wait_for(lambda: all(job.finished for job in submitted))
+    jobs.submit("세션", "rewrite", lambda text, cancel_token: text, "3")
+    assert jobs.get(submitted[0].id) is None
+    assert [job.result for job in jobs.jobs("세션")[1:]] == ["2", "1"]
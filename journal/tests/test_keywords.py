@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from inference.keywords import CORPUS_MIN_DOCUMENTS, CorpusIndex, analyze_content_local, textrank, tokenize
+
+ARTICLE = """서울시는 3일 내년 예산안을 발표했다. 서울시 예산안은 48조 원 규모다.
+
+시의회는 예산안을 다음 달 심의한다. 시의회 예산 심의는 12월에 끝난다.
+
+시민 단체는 복지 예산이 줄었다고 비판했다. 복지 예산 삭감에 시민 단체가 반발했다."""
+
+
+def analyze(text, index=None):
+    return analyze_content_local(text, index=index or CorpusIndex(db_path=""))
+
+
+def test_tokenize_keeps_noun_stems():
+    # 조사와 활용 어미를 떼고, 숫자 (단위 포함) / 불용어 / 서술어는 뺀다
+    assert tokenize("서울시는 3일 예산안을 발표했다. 시의회에서는 1,400원에서 심의한다") == [
+        "서울시", "예산안", "발표", "시의회", "심의"]
+    assert tokenize("그리고 기자는 밝혔다") == []
+
+
+def test_textrank_favors_the_hub():
+    scores = textrank(np.array([[0, 1, 1], [1, 0, 0], [1, 0, 0]], dtype=float))
+    assert scores.sum() == pytest.approx(1)
+    assert scores[0] > scores[1] == pytest.approx(scores[2])
+    assert len(textrank(np.zeros((0, 0)))) == 0
+
+
+def test_keywords_topics_and_summary():
+    result = analyze(ARTICLE)
+    keywords = [keyword.keyword for keyword in result.keywords]
+    weights = [keyword.weight for keyword in result.keywords]
+    assert keywords[:2] == ["예산", "예산안"]
+    assert {"서울시", "시의회", "심의", "시민", "단체", "복지"} <= set(keywords)
+    assert weights[0] == 1.0 and weights == sorted(weights, reverse=True)
+    assert result.keywords[0].context == "서울시는 3일 내년 예산안을 발표했다."
+    assert result.topics == ["서울시 예산안", "시민 단체", "복지 예산"]
+    assert result.summary == "서울시는 3일 내년 예산안을 발표했다. 서울시 예산안은 48조 원 규모다. 시의회는 예산안을 다음 달 심의한다."
+    assert result.stats["문장 수"] == 6
+    assert result.source == "로컬"
+
+
+def test_ranking_is_deterministic():
+    first, second = analyze(ARTICLE), analyze(ARTICLE)
+    assert [(k.keyword, k.weight) for k in first.keywords] == [(k.keyword, k.weight) for k in second.keywords]
+    assert first.summary == second.summary
+
+
+def test_corpus_idf_demotes_common_terms():
+    index = CorpusIndex(db_path="")
+    for i in range(CORPUS_MIN_DOCUMENTS):
+        index.add(f"기사 {i}", ["예산", "예산안"])
+    keywords = [keyword.keyword for keyword in analyze(ARTICLE, index).keywords]
+    assert keywords.index("예산") > keywords.index("시민")
+    assert index.stats() == {"documents": CORPUS_MIN_DOCUMENTS + 1, "terms": 13}
+    # 같은 기사를 다시 분석해도 문서 빈도는 한 번만 센다
+    analyze(ARTICLE, index)
+    assert index.stats()["documents"] == CORPUS_MIN_DOCUMENTS + 1
+
+
+def test_empty_and_one_word_input():
+    empty = analyze("")
+    assert (empty.keywords, empty.topics, empty.summary) == ([], [], "")
+    assert empty.stats["문장 수"] == 0
+    assert analyze("그리고 밝혔다.").keywords == []
+    one = analyze("예산")
+    assert [(k.keyword, k.weight) for k in one.keywords] == [("예산", 1.0)]
+    assert one.summary == "예산"
+    assert one.topics == []
@@ -0,0 +1,88 @@
+import pytest
+from botocore.exceptions import ClientError
+
+from inference.core import InferenceRequest, invoke
+from inference.models import (
+    FALLBACK_AFTER_THROTTLES,
+    fallback_request,
+    get_model,
+    selected_model_id,
+    tier_model_id,
+)
+from inference.streaming import invoke_stream
+from inference.tasks import get_task
+
+SONNET = get_model("claude-3-5-sonnet").model_id
+HAIKU = get_model("claude-3-5-haiku").model_id
+HAIKU_3 = get_model("claude-3-haiku").model_id
+
+
+def error(code):
+    return ClientError({"Error": {"Code": code, "Message": code}}, "Converse")
+
+
+def request(prompt="위 원문의 사실 관계를 검증해주세요", **options):
+    return InferenceRequest(task="fact_check", prompt=prompt, prefix="예산은 48조 원이다.", **options)
+
+
+def without_model(converse_request):
+    return {key: value for key, value in converse_request.items() if key != "modelId"}
+
+
+def test_tasks_use_their_tier_model_unless_one_is_selected():
+    assert get_task("fact_check").model_id == tier_model_id("quality") == SONNET
+    assert get_task("grammar").model_id == HAIKU
+    assert get_task("seo_title").model_id == HAIKU_3
+    assert request().resolved_model_id == SONNET
+    assert selected_model_id("auto") is None
+    assert request(model_id=selected_model_id("nova-lite")).resolved_model_id == "us.amazon.nova-lite-v1:0"
+    with pytest.raises(ValueError):
+        selected_model_id("gpt")
+
+
+def test_fallback_request_only_for_throttling_and_timeouts():
+    fallback = fallback_request(request(), error("ThrottlingException"))
+    assert fallback.model_id == HAIKU
+    assert (fallback.prompt, fallback.prefix, fallback.task) == (request().prompt, request().prefix, "fact_check")
+    assert fallback_request(request(), error("ServiceUnavailableException")).model_id == HAIKU
+    assert fallback_request(request(), error("ValidationException")) is None
+    assert fallback_request(request(allow_fallback=False), error("ThrottlingException")) is None
+    # 가장 작은 모델에서는 더 넘어갈 곳이 없다
+    assert fallback_request(request(model_id=HAIKU_3), error("ThrottlingException")) is None
+
+
+def test_throttled_primary_falls_back_with_the_same_request(stub_client):
+    stub_client.reply(error("ThrottlingException"), model=SONNET)
+    stub_client.reply("작은 모델의 답", model=HAIKU)
+    response = invoke(request())
+    assert response.text == "작은 모델의 답"
+    assert (response.model_id, response.fallback_from) == (HAIKU, SONNET)
+    assert stub_client.models == [SONNET] * FALLBACK_AFTER_THROTTLES + [HAIKU]
+    assert without_model(stub_client.requests[-1]) == without_model(stub_client.requests[0])
+
+
+def test_fallback_goes_down_the_chain(stub_client):
+    stub_client.reply(error("ModelNotReadyException"), model=SONNET)
+    stub_client.reply(error("ServiceUnavailableException"), model=HAIKU)
+    stub_client.reply("가장 작은 모델의 답", model=HAIKU_3)
+    response = invoke(request())
+    assert (response.model_id, response.fallback_from) == (HAIKU_3, SONNET)
+    # 둘 다 일시적인 오류라 넘어가기 전에 정해진 횟수만큼 다시 시도한다
+    assert stub_client.models == [SONNET] * FALLBACK_AFTER_THROTTLES + [HAIKU] * FALLBACK_AFTER_THROTTLES + [HAIKU_3]
+
+
+def test_request_errors_do_not_fall_back(stub_client):
+    stub_client.reply(error("ValidationException"), model=SONNET)
+    with pytest.raises(ClientError, match="ValidationException"):
+        invoke(request())
+    assert stub_client.models == [SONNET]
+
+
+def test_stream_falls_back_before_the_first_token(stub_client):
+    stub_client.reply(error("ThrottlingException"), model=SONNET)
+    stub_client.reply("작은 모델의 스트림", model=HAIKU)
+    stream = invoke_stream(request())
+    assert "".join(stream) == "작은 모델의 스트림"
+    assert stream.fallback_from == SONNET
+    assert stub_client.models[-1] == HAIKU
+    assert without_model(stub_client.requests[-1]) == without_model(stub_client.requests[0])
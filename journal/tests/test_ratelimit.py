@@ -0,0 +1,105 @@
+import threading
+import time
+from collections import deque
+
+import pytest
+
+from inference.cancel import CallCancelled, CancelToken
+from inference.ratelimit import (
+    BACKOFF_CAP,
+    RateLimiter,
+    Ticket,
+    TokenBucket,
+    backoff_delay,
+    estimate_tokens,
+    is_throttling_error,
+)
+
+
+class FakeThrottle(Exception):
+    response = {"Error": {"Code": "ThrottlingException"}}
+
+
+def test_token_bucket_waits_for_refill():
+    bucket = TokenBucket(60, burst_seconds=1)  # 초당 1개, 용량 1
+    now = bucket.updated
+    assert bucket.wait_time(1, now) == 0
+    bucket.take(1)
+    assert bucket.wait_time(1, now) == pytest.approx(1.0)
+    # 허용 속도가 절반이면 두 배 기다린다
+    assert bucket.wait_time(1, now, scale=0.5) == pytest.approx(2.0)
+
+
+def test_release_refunds_unused_tokens():
+    limiter = RateLimiter(requests_per_minute=0, tokens_per_minute=600, burst_seconds=1)  # 용량 10 토큰
+    ticket = limiter.acquire("a", tokens=8)
+    limiter.release(ticket, used_tokens=3)
+    assert limiter._tokens.tokens == pytest.approx(7, abs=0.1)
+
+
+def test_position_is_round_robin_across_sessions():
+    limiter = RateLimiter()
+    a = [Ticket("a", 0) for _ in range(3)]
+    b = Ticket("b", 0)
+    limiter._queues["a"] = deque(a)
+    limiter._queues["b"] = deque([b])
+    # 세션 a 가 먼저 세 건을 넣어도 b 는 a 의 두 번째 요청보다 앞선다
+    assert [limiter._position(t) for t in a] == [0, 2, 3]
+    assert limiter._position(b) == 1
+
+
+def test_aimd_scale():
+    limiter = RateLimiter()
+    limiter.report_throttle()
+    assert limiter.scale == 0.5
+    for _ in range(10):
+        limiter.report_throttle()
+    assert limiter.scale == 0.1
+    limiter.report_success()
+    assert limiter.scale == pytest.approx(0.15)
+    for _ in range(100):
+        limiter.report_success()
+    assert limiter.scale == 1.0
+
+
+def test_on_queue_runs_without_holding_the_lock():
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=0, burst_seconds=1)
+    limiter.acquire("busy")  # 버킷을 비워서 다음 요청이 기다리게 한다
+    other_session_done = []
+
+    def on_queue(position, wait):
+        if position is None:
+            return
+        # 콜백이 느린 동안 다른 세션이 제한기를 쓸 수 있어야 한다
+        worker = threading.Thread(target=lambda: other_session_done.append(limiter.stats()))
+        worker.start()
+        worker.join(timeout=1)
+
+    limiter.acquire("waiting", on_queue=on_queue)
+    assert other_session_done
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=0, burst_seconds=1)
+    limiter.acquire("busy")
+    token = CancelToken(timeout=0.2)
+    start = time.monotonic()
+    with pytest.raises(CallCancelled):
+        limiter.acquire("waiting", cancel_token=token)
+    assert time.monotonic() - start < 0.8
+    assert limiter.queue_length() == 0
+
+
+def test_estimate_tokens_counts_text_image_and_max_tokens():
+    request = {
+        "system": [{"text": "가" * 100}],
+        "messages": [{"role": "user", "content": [{"text": "나" * 200}, {"image": {}}]}],
+        "inferenceConfig": {"maxTokens": 500},
+    }
+    assert estimate_tokens(request) == (100 + 200 + 3000) // 2 + 500
+
+
+def test_backoff_and_throttling_detection():
+    assert all(0 <= backoff_delay(attempt) <= BACKOFF_CAP for attempt in range(20))
+    assert is_throttling_error(FakeThrottle())
+    assert not is_throttling_error(ValueError())
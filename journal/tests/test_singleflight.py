@@ -0,0 +1,104 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from inference.cancel import CallCancelled, CancelToken
+from inference.core import InferenceResponse
+from inference.singleflight import SingleFlight, flight_key
+
+
+class Producer:
+    # 조각 두 개를 내보내고 release 될 때까지 기다렸다가 응답을 돌려주는 호출
+    def __init__(self):
+        self.calls = 0
+        self.release = threading.Event()
+        self.cancelled = threading.Event()
+
+    def __call__(self, token, on_queue):
+        self.calls += 1
+        yield "첫 "
+        yield "조각"
+        while not self.release.wait(0.01):
+            if token.cancelled:
+                self.cancelled.set()
+                raise CallCancelled("취소")
+        return InferenceResponse("첫 조각", "m", usage={"totalTokens": 10})
+
+
+def test_flight_key_includes_tool_config():
+    request = {"modelId": "m", "messages": [{"role": "user", "content": [{"text": "안녕"}]}]}
+    assert flight_key(request) == flight_key(dict(request))
+    assert flight_key(request) != flight_key({**request, "toolConfig": {"tools": []}})
+
+
+def test_concurrent_calls_share_one_flight(wait_for):
+    flights, produce = SingleFlight(), Producer()
+    with ThreadPoolExecutor(4) as executor:
+        futures = [executor.submit(flights.call, "k", produce, None, CancelToken()) for _ in range(4)]
+        assert wait_for(lambda: flights.stats()["joined"] == 3)
+        produce.release.set()
+        responses = [future.result(timeout=2) for future in futures]
+    assert produce.calls == 1
+    assert sorted(r.shared for r in responses) == [False, True, True, True]
+    # 함께 받은 쪽은 비용이 들지 않았다
+    assert [r.usage for r in responses if r.shared] == [{}, {}, {}]
+    assert flights.stats()["saved_tokens"] == 30
+    assert flights.stats()["in_flight"] == 0
+
+
+def test_follower_receives_chunks_sent_before_it_joined():
+    flights, produce = SingleFlight(), Producer()
+    leader = flights.run("k", produce, None, CancelToken())
+    assert next(leader) == "첫 "
+    follower = flights.run("k", produce, None, CancelToken())
+    produce.release.set()
+    assert list(leader) == ["조각"]
+    assert list(follower) == ["첫 ", "조각"]
+
+
+def test_leader_leaving_does_not_stop_followers(wait_for):
+    flights, produce = SingleFlight(), Producer()
+    leader_token = CancelToken()
+    with ThreadPoolExecutor(2) as executor:
+        leader = executor.submit(flights.call, "k", produce, None, leader_token)
+        assert wait_for(lambda: flights.stats()["in_flight"] == 1)
+        follower = executor.submit(flights.call, "k", produce, None, CancelToken())
+        assert wait_for(lambda: flights.stats()["joined"] == 1)
+        leader_token.cancel()
+        with pytest.raises(CallCancelled):
+            leader.result(timeout=2)
+        produce.release.set()
+        assert follower.result(timeout=2).text == "첫 조각"
+    assert not produce.cancelled.is_set()
+
+
+def test_flight_is_cancelled_when_everyone_leaves(wait_for):
+    flights, produce = SingleFlight(), Producer()
+    token = CancelToken()
+    with ThreadPoolExecutor(1) as executor:
+        future = executor.submit(flights.call, "k", produce, None, token)
+        assert wait_for(lambda: flights.stats()["in_flight"] == 1)
+        token.cancel()
+        with pytest.raises(CallCancelled):
+            future.result(timeout=2)
+    assert produce.cancelled.wait(2)
+    assert flights.stats()["in_flight"] == 0
+
+
+def test_error_reaches_every_subscriber(wait_for):
+    flights = SingleFlight()
+    release = threading.Event()
+
+    def produce(token, on_queue):
+        release.wait(2)
+        raise RuntimeError("모델 오류")
+        yield
+
+    with ThreadPoolExecutor(2) as executor:
+        futures = [executor.submit(flights.call, "k", produce, None, CancelToken()) for _ in range(2)]
+        assert wait_for(lambda: flights.stats()["joined"] == 1)
+        release.set()
+        for future in futures:
+            with pytest.raises(RuntimeError, match="모델 오류"):
+                future.result(timeout=2)
@@ -0,0 +1,50 @@
+import pytest
+
+from inference.spelling import apply_corrections, check_spelling
+
+
+@pytest.mark.parametrize("text", [
+    "물가가 크게 올랐다.",
+    "국제 유가가 내렸다.",
+    "주가가 반등했다.",
+    "평가가 엇갈린다.",
+    "습도도 높다.",
+    "회의의 결론이 나왔다.",
+    "단지 안은 조용했다.",
+    "부지 안에 공장을 짓는다.",
+])
+def test_correct_korean_is_left_alone(text):
+    result = check_spelling(text)
+    assert result.text == text
+    assert result.corrections == []
+    assert result.flags == []
+
+
+def test_whole_token_dictionary_hit_is_fixed():
+    result = check_spelling("회의는 금새 끝났고 결론이 됬다.")
+    assert result.text == "회의는 금세 끝났고 결론이 됐다."
+    assert [c.original for c in result.corrections] == ["금새", "됬다"]
+
+
+def test_partial_dictionary_hit_is_only_suggested():
+    result = check_spelling("그의 역활을 맡았다.")
+    assert result.text == "그의 역활을 맡았다."
+    assert [(c.original, c.corrected) for c in result.flags] == [("역활", "역할")]
+
+
+def test_rules_are_suggestions():
+    text = "잘 할수있다. 그것을을 먹지 안았다."
+    result = check_spelling(text)
+    assert result.text == text
+    assert result.corrections == []
+    fixed = {c.original: c.corrected for c in result.flags}
+    assert fixed["할수있"] == "할 수 있"
+    assert fixed["것을을"] == "것을"
+    assert fixed["지 안았"] == "지 않았"
+
+
+def test_accepted_suggestions_are_applied():
+    text = "잘 할수있다. 금새 끝났다."
+    result = check_spelling(text)
+    accepted = result.corrections + [c for c in result.flags if c.original == "할수있"]
+    assert apply_corrections(text, accepted) == "잘 할 수 있다. 금세 끝났다."
@@ -0,0 +1,94 @@
+import json
+
+import pytest
+
+from inference.structured import (
+    FACT_CHECK_SCHEMA,
+    check_facts_structured,
+    check_grammar_structured,
+    load_json,
+    parse_content_analysis,
+    parse_fact_check,
+    parse_grammar,
+    tool_config,
+)
+
+ARTICLE = "서울시는 3일 내년 예산안 48조 원을 발표했다."
+
+
+def tool_use(name, tool_input):
+    return {"output": {"message": {"role": "assistant", "content": [
+        {"toolUse": {"toolUseId": "t1", "name": name, "input": tool_input}}]}},
+        "stopReason": "tool_use", "usage": {"inputTokens": 10, "outputTokens": 5, "totalTokens": 15}}
+
+
+def test_tool_config_forces_the_one_tool():
+    config = tool_config("submit_fact_check", "설명", FACT_CHECK_SCHEMA)
+    assert [tool["toolSpec"]["name"] for tool in config["tools"]] == ["submit_fact_check"]
+    assert config["tools"][0]["toolSpec"]["inputSchema"] == {"json": FACT_CHECK_SCHEMA}
+    assert config["toolChoice"] == {"tool": {"name": "submit_fact_check"}}
+
+
+def test_load_json_reads_text_around_the_object():
+    assert load_json('{"claims": []}') == {"claims": []}
+    assert load_json('결과입니다.\n```json\n{"claims": []}\n```') == {"claims": []}
+    assert load_json('분석 결과: {"summary": "요약"} 이상입니다.') == {"summary": "요약"}
+    with pytest.raises(ValueError):
+        load_json("도구를 쓰지 않고 서술형으로 답했다.")
+    with pytest.raises(ValueError):
+        load_json("[1, 2]")
+
+
+def test_fact_check_fills_defaults_and_drops_bad_items():
+    result = parse_fact_check(json.dumps({"claims": [
+        {"claim": "예산은 48조 원이다", "verdict": "사실", "reason": "발표 자료", "confidence": 1.5, "extra": 1},
+        {"claim": "성장률은 3%다", "verdict": "아마도", "confidence": "높음"},
+        {"verdict": "사실"},
+        "문자열 항목",
+    ], "note": "무시"}, ensure_ascii=False))
+    assert [(c.claim, c.verdict, c.confidence) for c in result.claims] == [
+        ("예산은 48조 원이다", "사실", 1.0), ("성장률은 3%다", "판단 불가", None)]
+    assert result.claims[1].reason == ""
+    assert parse_fact_check('{"claims": "없음"}').claims == []
+
+
+def test_content_analysis_sorts_keywords_and_skips_empty_ones():
+    result = parse_content_analysis(json.dumps({"keywords": [
+        {"keyword": "예산", "weight": 0.4}, {"keyword": "서울시", "weight": 0.9, "context": "주체"},
+        {"keyword": " ", "weight": 1}, {"keyword": "시의회"}], "topics": ["행정", 3, ""]}, ensure_ascii=False))
+    assert [(k.keyword, k.weight) for k in result.keywords] == [("서울시", 0.9), ("예산", 0.4), ("시의회", 0.0)]
+    assert result.topics == ["행정"]
+    assert result.summary == ""
+
+
+def test_grammar_finds_positions_in_the_original():
+    original = "결론이 됬다. 다시 됬다."
+    result = parse_grammar(json.dumps({"corrections": [
+        {"original": "됬다", "corrected": "됐다"}, {"original": "됬다", "corrected": "됐다"},
+        {"original": "없는 말", "corrected": "다른 말"}, {"original": "결론", "corrected": "결론"}]},
+        ensure_ascii=False), original)
+    assert [(c.start, c.end) for c in result.corrections] == [(4, 6), (11, 13), (None, None)]
+    # 수정된 전체 텍스트가 없으면 원문을 유지한다
+    assert result.corrected_text == original
+
+
+def test_structured_call_sends_tool_config_and_reads_tool_use(stub_client):
+    stub_client.reply(tool_use("submit_fact_check", {"claims": [{"claim": "예산은 48조 원이다", "verdict": "사실"}]}))
+    result = check_facts_structured(ARTICLE)
+    assert [(c.claim, c.verdict) for c in result.claims] == [("예산은 48조 원이다", "사실")]
+    request = stub_client.requests[0]
+    assert request["toolConfig"]["toolChoice"] == {"tool": {"name": "submit_fact_check"}}
+
+
+def test_text_reply_instead_of_tool_use(stub_client):
+    stub_client.reply('도구 대신 글로 답합니다.\n```json\n{"corrections": [], "corrected_text": "고친 글"}\n```')
+    assert check_grammar_structured(ARTICLE).corrected_text == "고친 글"
+
+
+def test_unreadable_reply_goes_to_on_error(stub_client):
+    stub_client.reply("죄송하지만 분석할 수 없습니다.")
+    errors = []
+    assert check_facts_structured(ARTICLE, on_error=errors.append) is None
+    assert isinstance(errors[0], ValueError)
+    with pytest.raises(ValueError):
+        check_facts_structured(ARTICLE + " ")